@@ -10,6 +10,9 @@ class Settings(BaseSettings):
     frontend_url: str = "http://localhost:3000"
     cors_origins: str = ""  # Comma-separated origins; falls back to defaults
     api_key: str = ""  # If set, all non-health endpoints require this key
+    # Larger request bodies are refused before they are read. Uploads are
+    # capped at 50 MB; the extra megabyte covers multipart framing.
+    max_request_body_bytes: int = 51 * 1024 * 1024
     anthropic_api_key: str = Field(min_length=1)
     agent_model: str = "claude-sonnet-4-5-20250929"
 
@@ -22,6 +25,55 @@ class Settings(BaseSettings):
     embedding_model: str = "text-embedding-3-small"
     embedding_dimensions: int = 1536
 
+    # SQLite connection pool
+    db_read_connections: int = 4
+    db_busy_timeout_ms: int = 5000
+    db_cache_size_kib: int = 16_384
+    db_mmap_size: int = 256 * 1024 * 1024
+    # Group commit: writes share a transaction for up to this long / this many
+    # writer blocks (a window of 0 commits every block on its own)
+    db_group_commit_window_ms: float = 2.0
+    db_group_commit_max_ops: int = 64
+
+    # Background jobs
+    job_workers: int = 4
+    job_poll_interval: float = 1.0  # seconds between idle queue polls
+    job_retry_base_delay: float = 2.0  # seconds; doubles per attempt
+    # Seconds a claimed job stays leased to its process; renewed every third
+    job_lease_seconds: float = 60.0
+    job_ingest_concurrency: int = 2
+    job_verify_concurrency: int = 3
+    job_ehp_concurrency: int = 2
+    job_summary_concurrency: int = 1
+
+    # Max concurrent Claude calls for bulk document verification
+    bulk_verify_concurrency: int = 4
+
+    # Shared LLM/embedding HTTP connection pools
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 10
+    llm_keepalive_expiry: float = 30.0
+
+    # Conversation replay: default token budget (see MODEL_HISTORY_BUDGETS),
+    # messages always replayed verbatim, and how many extra unsummarized
+    # messages trigger a background summary refresh
+    history_token_budget: int = 16_000
+    history_keep_recent: int = 12
+    history_summarize_batch: int = 8
+    # Most recent chat messages loaded per turn before the token budget applies
+    history_window_messages: int = 100
+
+    # Seconds the LLM usage ledger batches records before writing them
+    usage_flush_interval: float = 2.0
+    # Days of usage /api/usage reports when no ``since`` is given
+    usage_default_window_days: int = 30
+
+    # Anthropic prompt caching for static agent prompts and tool schemas
+    prompt_caching: bool = True
+
+    # LLM result cache TTL in seconds (0 = never expires)
+    llm_cache_ttl: int = 30 * 24 * 3600
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
     @field_validator("app_env")
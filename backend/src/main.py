@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -5,21 +6,36 @@ from contextlib import asynccontextmanager
 from fastapi import APIRouter, FastAPI
 
 from src.middleware.auth import require_api_key
+from src.middleware.body_limit import add_body_limit
 from src.middleware.cors import add_cors
+from src.middleware.usage import add_usage_context
 from src.routes.client_documents import router as client_documents_router
 from src.routes.clients import router as clients_router
 from src.routes.consult import router as consult_router
 from src.routes.ehp import router as ehp_router
 from src.routes.health import router as health_router
+from src.routes.jobs import router as jobs_router
 from src.routes.kb import router as kb_router
 from src.routes.onboard import router as onboard_router
-from src.services import client_store, ehp_store, rag_service
+from src.routes.search import router as search_router
+from src.routes.usage import router as usage_router
+from src.services import (
+    client_store,
+    db,
+    ehp_store,
+    job_queue,
+    llm_cache,
+    llm_clients,
+    rag_service,
+    usage_ledger,
+)
 from src.services.demo_seeder import seed_demo_documents
 from src.services.document_ingestion import (
     seed_client_docs,
     seed_internal_knowledge,
     seed_regulatory_docs,
 )
+from src.services.file_lock import FileLock
 
 logger = logging.getLogger(__name__)
 
@@ -33,36 +49,82 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     await client_store.init_db()
     logger.info("Client database initialized")
 
-    await client_store.seed_demo_client()
-    logger.info("Demo client seeded")
+    # Persistent WAL-mode SQLite connections shared by all stores
+    pool = db._default_pool  # noqa: SLF001
+    app.state.db_pool = pool
+    await pool.open()
+
+    # One worker (whichever locks the file first) runs the startup seeding
+    # and rebuilds; the others serve straight away and read what it writes.
+    leader = FileLock(db.DB_PATH.parent / "startup.lock")
+    app.state.startup_leader = leader.try_acquire()
+    backfill: asyncio.Task[int] | None = None
+    if leader.held:
+        # Move legacy client blobs into the normalized tables while serving
+        backfill = asyncio.create_task(
+            client_store.backfill_normalized(), name="client-backfill"
+        )
+
+        await client_store.seed_demo_client()
+        logger.info("Demo client seeded")
+
+        await seed_demo_documents()
+        logger.info("Demo documents seeded")
 
-    await seed_demo_documents()
-    logger.info("Demo documents seeded")
+        await ehp_store.seed_demo_ehp_comments()
+        logger.info("Demo EHP comments seeded")
 
-    await ehp_store.seed_demo_ehp_comments()
-    logger.info("Demo EHP comments seeded")
+        purged = await llm_cache.purge_expired()
+        logger.info("Purged %d expired LLM cache entries", purged)
+    else:
+        logger.info("Another worker leads startup; skipping seeding")
+
+    # Long-lived, pooled LLM and embedding clients shared by all services
+    clients = llm_clients._default_clients  # noqa: SLF001
+    app.state.llm_clients = clients
 
     try:
-        await rag_service.init()
+        await rag_service.init(openai_client=clients.openai)
         logger.info("RAG service initialized")
-        await seed_regulatory_docs()
-        logger.info("Regulatory docs seeded")
-        await seed_client_docs()
-        logger.info("Client documents indexed")
-        await seed_internal_knowledge()
-        logger.info("Internal knowledge seeded")
+        if leader.held:
+            await seed_regulatory_docs()
+            logger.info("Regulatory docs seeded")
+            await seed_client_docs()
+            logger.info("Client documents indexed")
+            await seed_internal_knowledge()
+            logger.info("Internal knowledge seeded")
     except Exception:
         logger.exception("Failed to initialize RAG service (Qdrant may not be running)")
 
     # Store default RAGService instance on app state for DI
     app.state.rag_service = rag_service._default_instance  # noqa: SLF001
 
+    ledger = usage_ledger._default_ledger  # noqa: SLF001
+    app.state.usage_ledger = ledger
+    await ledger.start()
+
+    queue = job_queue._default_queue  # noqa: SLF001
+    app.state.job_queue = queue
+    await queue.start()
+
     yield
 
+    await queue.stop()
+    await ledger.stop()
+    await clients.aclose()
+    if backfill is not None:
+        backfill.cancel()
+        await asyncio.gather(backfill, return_exceptions=True)
+    await pool.close()
+    leader.release()
+
 
 app = FastAPI(title="FINMA Comply API", version="0.3.0", lifespan=lifespan)
 
+# Added first so it runs inside CORS and its 413s carry CORS headers
+add_body_limit(app)
 add_cors(app)
+add_usage_context(app)
 
 # Health check at root (no versioning)
 app.include_router(health_router)
@@ -75,6 +137,9 @@ v1_router.include_router(kb_router)
 v1_router.include_router(consult_router)
 v1_router.include_router(client_documents_router)
 v1_router.include_router(ehp_router)
+v1_router.include_router(jobs_router)
+v1_router.include_router(usage_router)
+v1_router.include_router(search_router)
 app.include_router(v1_router)
 
 # Backwards-compatible unversioned routes (also require API key)
@@ -85,4 +150,7 @@ compat_router.include_router(kb_router)
 compat_router.include_router(consult_router)
 compat_router.include_router(client_documents_router)
 compat_router.include_router(ehp_router)
+compat_router.include_router(jobs_router)
+compat_router.include_router(usage_router)
+compat_router.include_router(search_router)
 app.include_router(compat_router)
@@ -0,0 +1,78 @@
+"""Refuse oversized request bodies before the app reads them."""
+
+import contextlib
+
+from fastapi import FastAPI
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import settings
+
+
+class _BodyTooLargeError(Exception):
+    pass
+
+
+class BodySizeLimitMiddleware:
+    """Answer 413 for bodies over ``settings.max_request_body_bytes``.
+
+    Starlette spools a whole multipart body before a route sees its
+    ``UploadFile``, so this is the only place an oversized upload can be
+    refused without receiving it. A declared ``Content-Length`` is checked
+    up front; chunked bodies are counted as they arrive.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        max_bytes = settings.max_request_body_bytes
+        headers = dict(scope["headers"])
+        declared = headers.get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > max_bytes:
+            await _reject(scope, receive, send, max_bytes)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    exceeded = True
+                    raise _BodyTooLargeError
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            # Once the limit is hit, the app's error response is replaced.
+            if exceeded and not response_started:
+                return
+            response_started = response_started or (
+                message["type"] == "http.response.start"
+            )
+            await send(message)
+
+        with contextlib.suppress(_BodyTooLargeError):
+            await self.app(scope, limited_receive, guarded_send)
+        if exceeded and not response_started:
+            await _reject(scope, receive, send, max_bytes)
+
+
+async def _reject(scope: Scope, receive: Receive, send: Send, max_bytes: int) -> None:
+    response = JSONResponse(
+        {"detail": f"Request body too large (max {max_bytes // (1024 * 1024)} MB)"},
+        status_code=413,
+    )
+    await response(scope, receive, send)
+
+
+def add_body_limit(app: FastAPI) -> None:
+    app.add_middleware(BodySizeLimitMiddleware)
@@ -0,0 +1,24 @@
+"""Attribute LLM usage records to the request that caused them."""
+
+from fastapi import FastAPI
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.services import usage_ledger
+
+
+class UsageContextMiddleware:
+    """Start a fresh usage-ledger context for every HTTP request."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            # The router fills in scope["route"] and path params later; the
+            # ledger reads them when a call is recorded.
+            usage_ledger.new_context(scope=scope)
+        await self.app(scope, receive, send)
+
+
+def add_usage_context(app: FastAPI) -> None:
+    app.add_middleware(UsageContextMiddleware)
@@ -11,5 +11,20 @@ class ChatSession(BaseModel):
     client_id: str | None = None
     title: str = "New conversation"
     messages: list[dict[str, Any]] = Field(default_factory=list)
+    message_count: int = 0
+    # Rolling summary of the first ``summarized_messages`` messages
+    summary: str = ""
+    summarized_messages: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class ChatSessionSummary(BaseModel):
+    """List-view projection of a chat session: no messages or summary."""
+
+    id: str
+    client_id: str | None = None
+    title: str = "New conversation"
+    message_count: int = 0
+    created_at: datetime
+    updated_at: datetime
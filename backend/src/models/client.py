@@ -1,7 +1,7 @@
 """Client models for Swiss financial licensing applications."""
 
-from datetime import UTC, datetime
-from typing import Literal
+from datetime import UTC, date, datetime
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field
 
@@ -95,6 +95,28 @@ class Client(BaseModel):
     checklist: list[ChecklistItem] = Field(default_factory=list)
     flags: list[FlaggedItem] = Field(default_factory=list)
     conversation_history: list[dict[str, str]] = Field(default_factory=list)
+    # Rolling summary of the first ``summarized_messages`` history entries
+    conversation_summary: str = ""
+    summarized_messages: int = 0
+    # Row version, bumped on every save; used for optimistic concurrency
+    version: int = 0
+
+
+class ClientSummary(BaseModel):
+    """List-view projection of a client, maintained alongside it."""
+
+    id: str
+    company_name: str
+    status: str
+    pathway: str | None
+    finma_license_type: str | None = None
+    contact_name: str = ""
+    contact_email: str = ""
+    current_stage_index: int = 0
+    created_at: datetime
+    updated_at: datetime
+    completed_items: int = 0
+    total_items: int = 0
 
 
 class Gap(BaseModel):
@@ -113,6 +135,19 @@ class NextStep(BaseModel):
     regulatory_reference: str | None = None
 
 
+class ChecklistTimeline(BaseModel):
+    """Critical-path schedule of the open checklist items."""
+
+    remaining_days: int
+    earliest_completion: date
+    # Item ids, first to last; any delay along it moves earliest_completion
+    critical_path: list[str] = Field(default_factory=list)
+    # Not-started item ids whose dependencies are all done
+    unblocked: list[str] = Field(default_factory=list)
+    # Item ids on a dependency cycle, left out of the schedule
+    unschedulable: list[str] = Field(default_factory=list)
+
+
 class GapAnalysis(BaseModel):
     client_id: str
     pathway: str
@@ -122,6 +157,7 @@ class GapAnalysis(BaseModel):
     gaps: list[Gap]
     next_steps: list[NextStep]
     critical_blockers: list[str]
+    timeline: ChecklistTimeline
 
 
 class ClientDocument(BaseModel):
@@ -136,3 +172,13 @@ class ClientDocument(BaseModel):
     verification_result: str | None = None
     uploaded_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     verified_at: datetime | None = None
+    content_hash: str | None = None  # sha256 of the stored file bytes
+    verified_hash: str | None = None  # content_hash at last verification
+
+
+class DocumentText(BaseModel):
+    content_hash: str
+    text: str
+    page_offsets: list[int] = Field(default_factory=list)  # char offset per page
+    metadata: dict[str, Any] = Field(default_factory=dict)
+    extracted_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
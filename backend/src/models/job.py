@@ -0,0 +1,29 @@
+"""Background job models."""
+
+from datetime import UTC, datetime
+from typing import Any, Literal
+
+from pydantic import BaseModel, Field
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    payload: dict[str, Any] = Field(default_factory=dict)
+    status: JobStatus = "queued"
+    priority: int = 0
+    attempts: int = 0
+    max_attempts: int = 3
+    idempotency_key: str | None = None
+    client_id: str | None = None
+    progress: float = 0.0
+    progress_message: str | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    run_after: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -8,7 +8,9 @@ T = TypeVar("T")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):  # noqa: UP046
+    """One page of a listing; pass ``next_cursor`` back to get the next page."""
+
     items: list[T]
     total: int
-    skip: int
     limit: int
+    next_cursor: str | None = None
@@ -0,0 +1,21 @@
+"""Full-text search models."""
+
+from typing import Literal
+
+from pydantic import BaseModel
+
+SearchKind = Literal["chat", "ehp_comment", "document"]
+
+
+class SearchHit(BaseModel):
+    kind: SearchKind
+    # Chat session id, EHP comment id or client document id
+    id: str
+    client_id: str | None = None
+    title: str
+    # Matching excerpt; matched terms are wrapped in ** **
+    snippet: str
+    # Higher is better (negated FTS5 bm25)
+    score: float
+    # Message position within the session, for chat hits
+    seq: int | None = None
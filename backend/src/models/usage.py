@@ -0,0 +1,39 @@
+"""LLM usage ledger models."""
+
+from datetime import UTC, datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+UsageGroupBy = Literal["client", "endpoint", "operation", "model", "tool"]
+
+
+class UsageRecord(BaseModel):
+    provider: Literal["anthropic", "openai"]
+    model: str
+    operation: str  # e.g. consultant_turn, verify_document, embedding
+    endpoint: str | None = None  # "POST /api/consult/chat" or "job:<kind>"
+    client_id: str | None = None
+    tool_name: str | None = None
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    latency_ms: int = 0
+    retries: int = 0
+    success: bool = True
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class UsageAggregate(BaseModel):
+    key: str | None
+    calls: int
+    errors: int
+    retries: int
+    input_tokens: int
+    output_tokens: int
+    cache_read_tokens: int
+    cache_write_tokens: int
+    latency_p50_ms: int
+    latency_p95_ms: int
+    total_latency_ms: int
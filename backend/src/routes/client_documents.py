@@ -1,16 +1,33 @@
 """Client document upload, listing, download, delete, and verification endpoints."""
 
+import json
 import logging
+import time
+from collections.abc import AsyncGenerator
+from contextlib import aclosing
 from pathlib import Path
 
-from fastapi import APIRouter, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from sse_starlette.sse import EventSourceResponse
+from starlette.requests import Request
 
 from src.models.client import ClientDocument
+from src.models.job import Job
+from src.models.pagination import PaginatedResponse
 from src.services import document_store
-from src.services.document_ingestion import ingest_client_document
-from src.services.document_verifier import verify_document
+from src.services.document_verifier import verify_documents
+from src.services.job_handlers import (
+    INGEST_DOCUMENT,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    VERIFY_DOCUMENT,
+)
+from src.services.job_queue import JobQueue, get_job_queue
+from src.services.keyset import InvalidCursorError
+from src.services.llm_clients import LLMClients, get_llm_clients
+from src.services.uploads import FileTooLargeError
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +47,7 @@ class DocumentResponse(BaseModel):
     verification_result: str | None
     uploaded_at: str
     verified_at: str | None
+    ingest_job_id: str | None = None
 
 
 class DeleteResponse(BaseModel):
@@ -37,7 +55,9 @@ class DeleteResponse(BaseModel):
     document_id: str
 
 
-def _doc_to_response(doc: ClientDocument) -> DocumentResponse:
+def _doc_to_response(
+    doc: ClientDocument, ingest_job_id: str | None = None
+) -> DocumentResponse:
     return DocumentResponse(
         id=doc.id,
         client_id=doc.client_id,
@@ -49,6 +69,7 @@ def _doc_to_response(doc: ClientDocument) -> DocumentResponse:
         verification_result=doc.verification_result,
         uploaded_at=doc.uploaded_at.isoformat(),
         verified_at=doc.verified_at.isoformat() if doc.verified_at else None,
+        ingest_job_id=ingest_job_id,
     )
 
 
@@ -57,6 +78,7 @@ async def upload_document(
     client_id: str,
     file: UploadFile,
     document_id: str = "",
+    queue: JobQueue = Depends(get_job_queue),
 ) -> DocumentResponse:
     """Upload a document for a client's license application."""
     if not file.filename:
@@ -64,32 +86,103 @@ async def upload_document(
     if not document_id:
         raise HTTPException(status_code=400, detail="document_id is required")
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large (max 50 MB)")
+    try:
+        doc = await document_store.store_upload(
+            client_id=client_id,
+            document_id=document_id,
+            upload=file,
+            content_type=file.content_type or "",
+            max_bytes=MAX_FILE_SIZE,
+        )
+    except FileTooLargeError as err:
+        raise HTTPException(status_code=413, detail=str(err)) from err
 
-    doc = await document_store.store_file(
+    # Index into knowledge base in the background
+    job = await queue.enqueue(
+        INGEST_DOCUMENT,
+        {"client_id": client_id, "document_id": document_id},
+        priority=PRIORITY_BACKGROUND,
+        idempotency_key=f"ingest:{client_id}:{document_id}:{doc.content_hash}",
         client_id=client_id,
-        document_id=document_id,
-        file_name=file.filename,
-        content=content,
-        content_type=file.content_type or "",
     )
+    return _doc_to_response(doc, ingest_job_id=job.id)
 
-    # Index into knowledge base
-    try:
-        await ingest_client_document(doc)
-    except Exception:
-        logger.warning("Failed to index document %s into KB", document_id)
 
-    return _doc_to_response(doc)
+@router.post("/{client_id}/verify-all")
+async def verify_all_documents(
+    request: Request,
+    client_id: str,
+    refresh: bool = False,
+    llm: LLMClients = Depends(get_llm_clients),
+) -> EventSourceResponse:
+    """Verify all pending, errored or changed documents for a client.
+
+    Documents are verified concurrently and each result is streamed as an SSE
+    ``document`` event as soon as it is ready. A ``summary`` event closes the
+    stream. ``refresh=true`` bypasses the LLM result cache.
+    """
+    docs = await document_store.list_documents_needing_verification(client_id)
+
+    async def event_generator() -> AsyncGenerator[str, None]:
+        start = time.monotonic()
+        counts = {"verified": 0, "rejected": 0, "error": 0}
+        cache_hits = 0
+        yield json.dumps({"type": "start", "total": len(docs)})
+        results_iter = verify_documents(
+            docs, use_cache=not refresh, api_client=llm.anthropic
+        )
+        async with aclosing(results_iter) as results:
+            async for doc, cached in results:
+                counts[doc.status] = counts.get(doc.status, 0) + 1
+                cache_hits += cached
+                yield json.dumps(
+                    {
+                        "type": "document",
+                        "document": _doc_to_response(doc).model_dump(),
+                        "cached": cached,
+                    }
+                )
+                if await request.is_disconnected():
+                    return
+        yield json.dumps(
+            {
+                "type": "summary",
+                "total": len(docs),
+                **counts,
+                "cache_hits": cache_hits,
+                "elapsed_ms": round((time.monotonic() - start) * 1000),
+            }
+        )
+
+    return EventSourceResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @router.get("/{client_id}")
-async def list_documents(client_id: str) -> list[DocumentResponse]:
-    """List all uploaded documents for a client."""
-    docs = await document_store.list_documents(client_id)
-    return [_doc_to_response(d) for d in docs]
+async def list_documents(
+    client_id: str,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+) -> PaginatedResponse[DocumentResponse]:
+    """List a client's uploaded documents, newest first."""
+    try:
+        docs, total, next_cursor = await document_store.list_documents_page(
+            client_id, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return PaginatedResponse(
+        items=[_doc_to_response(d) for d in docs],
+        total=total,
+        limit=limit,
+        next_cursor=next_cursor,
+    )
 
 
 @router.get("/{client_id}/{document_id}")
@@ -128,12 +221,37 @@ async def download_document(client_id: str, document_id: str) -> FileResponse:
     )
 
 
-@router.post("/{client_id}/{document_id}/verify")
-async def verify_doc(client_id: str, document_id: str) -> DocumentResponse:
-    """Trigger AI verification of an uploaded document."""
+@router.post("/{client_id}/{document_id}/verify", status_code=202)
+async def verify_doc(
+    client_id: str,
+    document_id: str,
+    refresh: bool = False,
+    queue: JobQueue = Depends(get_job_queue),
+) -> Job:
+    """Queue AI verification of an uploaded document.
+
+    Returns the job immediately; poll ``/api/jobs/{job_id}`` for the outcome.
+    An unchanged document is answered from the LLM result cache unless
+    ``refresh=true``.
+    """
     doc = await document_store.get_document(client_id, document_id)
     if doc is None:
         raise HTTPException(status_code=404, detail="Document not found")
 
-    updated = await verify_document(doc, expected_name=document_id)
-    return _doc_to_response(updated)
+    return await queue.enqueue(
+        VERIFY_DOCUMENT,
+        {
+            "client_id": client_id,
+            "document_id": document_id,
+            "expected_name": document_id,
+            "refresh": refresh,
+        },
+        priority=PRIORITY_INTERACTIVE,
+        # A refresh must not fold into a queued cached run, so it gets its
+        # own key.
+        idempotency_key=(
+            f"verify:{client_id}:{document_id}:{doc.content_hash}"
+            + (":refresh" if refresh else "")
+        ),
+        client_id=client_id,
+    )
@@ -1,15 +1,19 @@
 """Client CRUD endpoints."""
 
 import uuid
-from datetime import UTC, datetime
 from typing import Any, Literal
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from pydantic import BaseModel, ConfigDict
 
 from src.models.client import Client
 from src.models.pagination import PaginatedResponse
 from src.services import client_store
+from src.services.client_store import (
+    ClientItemNotFoundError,
+    ClientVersionConflictError,
+)
+from src.services.keyset import InvalidCursorError
 
 router = APIRouter(prefix="/api/clients", tags=["clients"])
 
@@ -83,62 +87,97 @@ class ChecklistItemUpdate(BaseModel):
     notes: str | None = None
 
 
+class FlagUpdate(BaseModel):
+    resolved: bool = True
+    resolution_notes: str | None = None
+
+
+def _set_etag(response: Response, version: int) -> None:
+    response.headers["ETag"] = f'"{version}"'
+
+
+def _expected_version(if_match: str | None) -> int | None:
+    """Client version from an ``If-Match`` header (as sent back from ETag)."""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    try:
+        return int(if_match.strip().removeprefix("W/").strip('"'))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Invalid If-Match header") from exc
+
+
+def _conflict(exc: ClientVersionConflictError) -> HTTPException:
+    return HTTPException(
+        status_code=409,
+        detail=f"{exc}; reload the client and retry",
+    )
+
+
 @router.post("")
-async def create_client(body: ClientCreateRequest) -> Client:
+async def create_client(body: ClientCreateRequest, response: Response) -> Client:
     """Create a new client with optional initial data."""
     client_id = str(uuid.uuid4())
     data: dict[str, Any] = {"id": client_id}
     data.update(body.model_dump(exclude_unset=True))
     client = Client.model_validate(data)
     await client_store.save_client(client)
+    _set_etag(response, client.version)
     return client
 
 
 @router.get("")
 async def list_clients(
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
 ) -> PaginatedResponse[ClientListItem]:
-    """List all clients."""
-    clients, total = await client_store.list_clients(skip=skip, limit=limit)
+    """List clients, most recently updated first."""
+    try:
+        summaries, total, next_cursor = await client_store.list_client_summaries(
+            limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     items = [
         ClientListItem(
-            id=c.id,
-            company_name=c.company_name,
-            status=c.status,
-            pathway=c.pathway,
-            finma_license_type=c.finma_license_type,
-            contact_name=c.contact_name,
-            contact_email=c.contact_email,
-            current_stage_index=c.current_stage_index,
-            created_at=c.created_at.isoformat(),
-            updated_at=c.updated_at.isoformat(),
-            completed_items=sum(
-                1 for item in c.checklist if item.status == "complete"
-            ),
-            total_items=len(c.checklist),
+            **s.model_dump(exclude={"created_at", "updated_at"}),
+            created_at=s.created_at.isoformat(),
+            updated_at=s.updated_at.isoformat(),
         )
-        for c in clients
+        for s in summaries
     ]
-    return PaginatedResponse(items=items, total=total, skip=skip, limit=limit)
+    return PaginatedResponse(
+        items=items, total=total, limit=limit, next_cursor=next_cursor
+    )
 
 
 @router.get("/{client_id}")
-async def get_client(client_id: str) -> Client:
-    """Get full client detail."""
+async def get_client(client_id: str, response: Response) -> Client:
+    """Get full client detail. The ETag carries the client's version."""
     client = await client_store.get_client(client_id)
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
+    _set_etag(response, client.version)
     return client
 
 
 @router.patch("/{client_id}")
-async def update_client(client_id: str, body: ClientUpdateRequest) -> Client:
-    """Update client fields."""
+async def update_client(
+    client_id: str,
+    body: ClientUpdateRequest,
+    response: Response,
+    if_match: str | None = Header(None),
+) -> Client:
+    """Update client fields; 409 if the client changed since ``If-Match``."""
     updates = body.model_dump(exclude_unset=True)
-    client = await client_store.update_client(client_id, updates)
+    try:
+        client = await client_store.update_client(
+            client_id, updates, expected_version=_expected_version(if_match)
+        )
+    except ClientVersionConflictError as exc:
+        raise _conflict(exc) from exc
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
+    _set_etag(response, client.version)
     return client
 
 
@@ -153,18 +192,61 @@ async def delete_client(client_id: str) -> dict[str, bool]:
 
 @router.patch("/{client_id}/checklist/{item_id}")
 async def update_checklist_item(
-    client_id: str, item_id: str, body: ChecklistItemUpdate
+    client_id: str,
+    item_id: str,
+    body: ChecklistItemUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
 ) -> Client:
-    """Update a checklist item status."""
-    client = await client_store.get_client(client_id)
+    """Update a checklist item status in place.
+
+    Without ``If-Match`` the update applies on top of concurrent edits; with
+    it, a stale version gets a 409.
+    """
+    try:
+        version = await client_store.update_checklist_item(
+            client_id,
+            item_id,
+            body.status,
+            body.notes,
+            expected_version=_expected_version(if_match),
+        )
+    except ClientVersionConflictError as exc:
+        raise _conflict(exc) from exc
+    except ClientItemNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Checklist item not found") from exc
+    return await _updated_client(client_id, version, response)
+
+
+@router.patch("/{client_id}/flags/{flag_id}")
+async def update_flag(
+    client_id: str,
+    flag_id: str,
+    body: FlagUpdate,
+    response: Response,
+    if_match: str | None = Header(None),
+) -> Client:
+    """Resolve or reopen a flag in place; same concurrency rules as checklist."""
+    try:
+        version = await client_store.resolve_flag(
+            client_id,
+            flag_id,
+            body.resolution_notes,
+            resolved=body.resolved,
+            expected_version=_expected_version(if_match),
+        )
+    except ClientVersionConflictError as exc:
+        raise _conflict(exc) from exc
+    except ClientItemNotFoundError as exc:
+        raise HTTPException(status_code=404, detail="Flag not found") from exc
+    return await _updated_client(client_id, version, response)
+
+
+async def _updated_client(
+    client_id: str, version: int | None, response: Response
+) -> Client:
+    client = await client_store.get_client(client_id) if version is not None else None
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
-    for item in client.checklist:
-        if item.id == item_id:
-            item.status = body.status
-            if body.notes is not None:
-                item.notes = body.notes
-            client.updated_at = datetime.now(UTC)
-            await client_store.save_client(client)
-            return client
-    raise HTTPException(status_code=404, detail="Checklist item not found")
+    _set_etag(response, client.version)
+    return client
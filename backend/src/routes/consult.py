@@ -4,16 +4,26 @@ import json as _json
 from collections.abc import AsyncGenerator
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
 
-from src.models.chat_session import ChatSession
+from src.config import settings
+from src.models.chat_session import ChatSession, ChatSessionSummary
 from src.models.client import GapAnalysis, NextStep
-from src.services import chat_store, client_store
+from src.models.pagination import PaginatedResponse
+from src.services import (
+    chat_store,
+    client_store,
+    gap_store,
+    history_manager,
+    usage_ledger,
+)
 from src.services.consultant_agent import run_consultant_turn
 from src.services.gap_analyzer import analyze_gaps
+from src.services.keyset import InvalidCursorError
+from src.services.llm_clients import LLMClients, get_llm_clients
 
 router = APIRouter(prefix="/api/consult", tags=["consult"])
 
@@ -55,9 +65,25 @@ async def create_session(
 
 
 @router.get("/sessions")
-async def list_sessions(client_id: str | None = None) -> list[ChatSession]:
-    """List chat sessions, optionally filtered by client."""
-    return await chat_store.list_sessions(client_id)
+async def list_sessions(
+    client_id: str | None = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
+) -> PaginatedResponse[ChatSessionSummary]:
+    """List chat sessions, most recently updated first, optionally by client.
+
+    Items carry ``message_count`` but no messages; fetch a session by id for
+    its transcript.
+    """
+    try:
+        sessions, total, next_cursor = await chat_store.list_sessions(
+            client_id, limit=limit, cursor=cursor
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return PaginatedResponse(
+        items=sessions, total=total, limit=limit, next_cursor=next_cursor
+    )
 
 
 @router.get("/sessions/{session_id}")
@@ -83,30 +109,41 @@ async def delete_session(session_id: str) -> dict[str, str]:
 
 @router.post("/chat")
 async def consult_chat(
-    request: Request, body: ConsultChatRequest
+    request: Request,
+    body: ConsultChatRequest,
+    llm: LLMClients = Depends(get_llm_clients),
 ) -> EventSourceResponse:
     """Stream a consultant conversation turn. Optionally scoped to a client."""
     # Resolve client_id: only keep it if the client exists in the backend DB.
     resolved_client_id = body.client_id
     if body.client_id:
-        client = await client_store.get_client(body.client_id)
+        client = await client_store.get_client(body.client_id, include_history=False)
         if client is None:
             resolved_client_id = None
 
-    # If session_id is provided, load conversation history from session
-    session_messages: list[dict[str, Any]] = []
+    usage_ledger.bind(client_id=resolved_client_id)
+
+    # If session_id is provided, replay the session's recent, unsummarized
+    # messages instead of the client-supplied history
+    session_messages: list[dict[str, Any]] | None = None
+    history_summary = ""
+    summarized_messages = 0
+    message_count = 0
     if body.session_id:
-        session = await chat_store.get_session(body.session_id)
-        if session:
-            session_messages = session.messages
-            # Append user message to session
-            session_messages.append({"role": "user", "content": body.message})
-            await chat_store.update_session(body.session_id, messages=session_messages)
+        loaded = await chat_store.get_session_tail(
+            body.session_id, settings.history_window_messages
+        )
+        if loaded:
+            session, session_messages = loaded
+            history_summary = session.summary
+            summarized_messages = session.summarized_messages
+            count = await chat_store.append_messages(
+                body.session_id, [{"role": "user", "content": body.message}]
+            )
+            message_count = count or 0
 
     conversation_history = (
-        session_messages[:-1]
-        if session_messages
-        else body.conversation_history
+        session_messages if session_messages is not None else body.conversation_history
     )
 
     async def event_generator() -> AsyncGenerator[str, None]:
@@ -116,6 +153,9 @@ async def consult_chat(
             conversation_history,
             resolved_client_id,
             body.client_context,
+            api_client=llm.anthropic,
+            # The session tail already starts after the summarized messages
+            history_summary=history_summary,
         ):
             if await request.is_disconnected():
                 break
@@ -130,17 +170,18 @@ async def consult_chat(
             yield chunk
 
         # Persist assistant response to session
-        if body.session_id and assistant_text:
-            session_msgs = list(session_messages)
-            session_msgs.append({"role": "assistant", "content": assistant_text})
-            # Auto-title from first user message
+        if body.session_id and message_count and assistant_text:
+            # Auto-title from the first user message
             title = None
-            if len(session_msgs) == 2:
-                first_msg = session_msgs[0].get("content", "")
-                title = first_msg[:60] + ("..." if len(first_msg) > 60 else "")
-            await chat_store.update_session(
-                body.session_id, messages=session_msgs, title=title
+            if message_count == 1:
+                title = body.message[:60] + ("..." if len(body.message) > 60 else "")
+            count = await chat_store.append_messages(
+                body.session_id,
+                [{"role": "assistant", "content": assistant_text}],
+                title=title,
             )
+            if count and history_manager.needs_summary(count, summarized_messages):
+                await history_manager.schedule_summary("session", body.session_id)
 
     return EventSourceResponse(
         event_generator(),
@@ -158,16 +199,43 @@ async def consult_chat(
 @router.post("/analyze-gaps/{client_id}")
 async def consult_analyze_gaps(client_id: str) -> GapAnalysis:
     """Run a structured gap analysis for a client."""
-    client = await client_store.get_client(client_id)
+    client = await client_store.get_client(client_id, include_history=False)
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
     return analyze_gaps(client)
 
 
+@router.get("/portfolio/gaps")
+async def portfolio_gaps(
+    pathway: str | None = None,
+    status: str | None = None,
+    min_blockers: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+) -> PaginatedResponse[GapAnalysis]:
+    """Gap analyses for every client, most recently updated first.
+
+    Results are cached per client and recomputed only after it changes.
+    """
+    try:
+        analyses, total, next_cursor = await gap_store.list_gap_analyses(
+            pathway=pathway,
+            status=status,
+            min_blockers=min_blockers,
+            limit=limit,
+            cursor=cursor,
+        )
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    return PaginatedResponse(
+        items=analyses, total=total, limit=limit, next_cursor=next_cursor
+    )
+
+
 @router.post("/next-steps/{client_id}")
 async def consult_next_steps(client_id: str) -> NextStepsResponse:
     """Get prioritized next steps for a client."""
-    client = await client_store.get_client(client_id)
+    client = await client_store.get_client(client_id, include_history=False)
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
     analysis = analyze_gaps(client)
@@ -1,14 +1,16 @@
 """EHP (Electronic Hub Platform) comment endpoints."""
 
-from pathlib import Path
+import hashlib
+import json
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from src.models.ehp import EHPComment, EHPCommentCreate
-from src.services import document_store, ehp_store
-from src.services.document_ingestion import _parse_file
-from src.services.ehp_generator import generate_ehp_comments
+from src.models.job import Job
+from src.services import ehp_store
+from src.services.job_handlers import GENERATE_EHP_COMMENTS, PRIORITY_INTERACTIVE
+from src.services.job_queue import JobQueue, get_job_queue
 
 router = APIRouter(prefix="/api/ehp", tags=["ehp"])
 
@@ -45,31 +47,41 @@ async def toggle_resolve(comment_id: str) -> EHPComment:
 class GenerateRequest(BaseModel):
     document_name: str = ""
     document_description: str = ""
+    refresh: bool = False
 
 
-@router.post("/{client_id}/{document_id}/generate")
+@router.post("/{client_id}/{document_id}/generate", status_code=202)
 async def generate_comments(
-    client_id: str, document_id: str, body: GenerateRequest | None = None
-) -> list[EHPComment]:
-    """AI-generate realistic EHP review comments for a document."""
-    doc_name = body.document_name if body else document_id
-    doc_desc = body.document_description if body else ""
-
-    # Retrieve actual document text for context-aware generation
-    document_text: str | None = None
-    doc = await document_store.get_document(client_id, document_id)
-    if doc:
-        file_path = Path(doc.file_path)
-        if file_path.exists():
-            try:
-                document_text = _parse_file(file_path)
-            except Exception:
-                pass  # Fall back to generation without document text
-
-    return await generate_ehp_comments(
+    client_id: str,
+    document_id: str,
+    body: GenerateRequest | None = None,
+    queue: JobQueue = Depends(get_job_queue),
+) -> Job:
+    """Queue AI generation of realistic EHP review comments for a document.
+
+    The finished job's ``result.comments`` holds the generated comments;
+    ``result.cached`` is true when they came from the LLM result cache.
+    Set ``refresh`` to force a new exchange.
+    """
+    refresh = body.refresh if body else False
+    payload = {
+        "client_id": client_id,
+        "document_id": document_id,
+        "document_name": body.document_name if body else document_id,
+        "document_description": body.document_description if body else "",
+        "refresh": refresh,
+    }
+    # Requests with different inputs, or a refresh, must not fold into a
+    # queued run of another request.
+    inputs = hashlib.sha256(
+        json.dumps(
+            [payload["document_name"], payload["document_description"], refresh]
+        ).encode()
+    ).hexdigest()[:16]
+    return await queue.enqueue(
+        GENERATE_EHP_COMMENTS,
+        payload,
+        priority=PRIORITY_INTERACTIVE,
+        idempotency_key=f"ehp:{client_id}:{document_id}:{inputs}",
         client_id=client_id,
-        document_id=document_id,
-        document_name=doc_name,
-        document_description=doc_desc,
-        document_text=document_text,
     )
@@ -6,7 +6,7 @@ import time
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
-from src.services.db import get_db
+from src.services.db import DatabasePool, db_reader, get_db_pool
 from src.services.rag_service import RAGService, get_rag_service
 
 logger = logging.getLogger(__name__)
@@ -22,17 +22,16 @@ class ServiceStatus(BaseModel):
 class HealthResponse(BaseModel):
     status: str  # "healthy" | "degraded" | "unhealthy"
     services: dict[str, ServiceStatus]
+    # SQLite pool wait-time metrics, keyed by "read" / "write"
+    database_pool: dict[str, dict[str, float]] = {}
 
 
 async def _check_database() -> ServiceStatus:
     """Check SQLite connectivity with a simple query."""
     start = time.monotonic()
     try:
-        db = await get_db()
-        try:
+        async with db_reader() as db:
             await db.execute("SELECT 1")
-        finally:
-            await db.close()
         latency = (time.monotonic() - start) * 1000
         return ServiceStatus(status="up", latency_ms=round(latency, 2))
     except Exception:
@@ -70,6 +69,7 @@ async def _check_openai(rag: RAGService) -> ServiceStatus:
 @router.get("/health")
 async def health_check(
     rag: RAGService = Depends(get_rag_service),
+    pool: DatabasePool = Depends(get_db_pool),
 ) -> HealthResponse:
     """Comprehensive health check with per-service status."""
     db_status = await _check_database()
@@ -93,4 +93,4 @@ async def health_check(
     else:
         overall = "healthy"
 
-    return HealthResponse(status=overall, services=services)
+    return HealthResponse(status=overall, services=services, database_pool=pool.stats())
@@ -0,0 +1,31 @@
+"""Background job status and progress endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from src.models.job import Job, JobStatus
+from src.services.job_queue import JobQueue, get_job_queue
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+@router.get("")
+async def list_jobs(
+    client_id: str | None = None,
+    status: JobStatus | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    queue: JobQueue = Depends(get_job_queue),
+) -> list[Job]:
+    """List recent jobs, optionally filtered by client and status."""
+    return await queue.list_jobs(client_id=client_id, status=status, limit=limit)
+
+
+@router.get("/{job_id}")
+async def get_job(
+    job_id: str,
+    queue: JobQueue = Depends(get_job_queue),
+) -> Job:
+    """Get a job's status, progress and result."""
+    job = await queue.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -1,5 +1,6 @@
 """Knowledge base endpoints: search and document management."""
 
+import shutil
 import tempfile
 from pathlib import Path
 
@@ -7,8 +8,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile
 from pydantic import BaseModel
 
 from src.models.pagination import PaginatedResponse
-from src.services.document_ingestion import _parse_pdf
+from src.services import document_text_store
+from src.services.keyset import InvalidCursorError
 from src.services.rag_service import RAGService, content_hash, get_rag_service
+from src.services.uploads import FileTooLargeError, stream_to_file
 
 router = APIRouter(prefix="/api/kb", tags=["knowledge-base"])
 
@@ -84,28 +87,20 @@ async def upload_document(
             f"Allowed: {sorted(ALLOWED_EXTENSIONS)}",
         )
 
-    content = await file.read()
-    if len(content) > MAX_FILE_SIZE:
-        raise HTTPException(status_code=413, detail="File too large (max 50 MB)")
-
-    if ext == ".pdf":
-        tmp_path: Path | None = None
-        try:
-            with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
-                tmp.write(content)
-                tmp.flush()
-                tmp_path = Path(tmp.name)
-            text = _parse_pdf(tmp_path)
-        finally:
-            if tmp_path is not None:
-                tmp_path.unlink(missing_ok=True)
-    else:
-        try:
-            text = content.decode("utf-8")
-        except UnicodeDecodeError as err:
-            raise HTTPException(
-                status_code=400, detail="File is not valid UTF-8 text"
-            ) from err
+    tmp_dir = Path(tempfile.mkdtemp(prefix="kb-upload-"))
+    try:
+        streamed = await stream_to_file(file, tmp_dir / f"upload{ext}", MAX_FILE_SIZE)
+        doc_text = await document_text_store.extract_and_cache(
+            streamed.path, file.content_type or "", streamed.sha256
+        )
+    except FileTooLargeError as err:
+        raise HTTPException(status_code=413, detail=str(err)) from err
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    text = doc_text.text
+    if ext != ".pdf" and streamed.size and not text:
+        raise HTTPException(status_code=400, detail="File is not valid UTF-8 text")
 
     doc_id = content_hash(text)
     if not title:
@@ -118,23 +113,26 @@ async def upload_document(
 
 @router.get("/documents")
 async def list_documents(
-    skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: str | None = None,
     rag: RAGService = Depends(get_rag_service),
 ) -> PaginatedResponse[KBDocument]:
-    """List all indexed documents."""
-    docs = await rag.list_documents()
-    total = len(docs)
-    page = docs[skip : skip + limit]
+    """List indexed documents, most recently indexed first."""
+    try:
+        docs, total, next_cursor = await rag.list_documents_page(limit, cursor)
+    except InvalidCursorError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     items = [
         KBDocument(
             doc_id=d["doc_id"],
             title=d["title"],
             source=d["source"],
         )
-        for d in page
+        for d in docs
     ]
-    return PaginatedResponse(items=items, total=total, skip=skip, limit=limit)
+    return PaginatedResponse(
+        items=items, total=total, limit=limit, next_cursor=next_cursor
+    )
 
 
 @router.delete("/documents/{doc_id}")
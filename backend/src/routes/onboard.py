@@ -3,14 +3,15 @@
 import uuid
 from collections.abc import AsyncGenerator
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 from starlette.requests import Request
 
 from src.models.client import Client
-from src.services import client_store
+from src.services import client_store, usage_ledger
 from src.services.claude_agent import run_onboarding_turn
+from src.services.llm_clients import LLMClients, get_llm_clients
 
 router = APIRouter(prefix="/api/onboard", tags=["onboard"])
 
@@ -35,15 +36,20 @@ async def start_onboarding() -> OnboardStartResponse:
 
 @router.post("/chat")
 async def onboard_chat(
-    request: Request, body: OnboardChatRequest
+    request: Request,
+    body: OnboardChatRequest,
+    llm: LLMClients = Depends(get_llm_clients),
 ) -> EventSourceResponse:
     """Stream an onboarding conversation turn."""
     client = await client_store.get_client(body.client_id)
     if client is None:
         raise HTTPException(status_code=404, detail="Client not found")
+    usage_ledger.bind(client_id=client.id)
 
     async def event_generator() -> AsyncGenerator[str, None]:
-        async for chunk in run_onboarding_turn(client, body.message):
+        async for chunk in run_onboarding_turn(
+            client, body.message, api_client=llm.anthropic
+        ):
             if await request.is_disconnected():
                 break
             yield chunk
@@ -0,0 +1,26 @@
+"""Full-text search endpoint."""
+
+from fastapi import APIRouter, Query
+
+from src.models.search import SearchHit, SearchKind
+from src.services import full_text_search
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("")
+async def search(
+    q: str = Query(..., min_length=1, max_length=500),
+    client_id: str | None = None,
+    kind: list[SearchKind] | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+) -> list[SearchHit]:
+    """Search chat messages, EHP comments and uploaded document text.
+
+    Words must all match; wrap words in double quotes to match an exact
+    phrase. ``client_id`` restricts results to one client and ``kind`` (may
+    repeat) to some sources.
+    """
+    return await full_text_search.search(
+        q, client_id=client_id, kinds=kind, limit=limit
+    )
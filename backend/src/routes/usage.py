@@ -0,0 +1,36 @@
+"""LLM usage and latency reporting endpoints."""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends
+
+from src.models.usage import UsageAggregate, UsageGroupBy
+from src.services.usage_ledger import UsageLedger, get_usage_ledger
+
+router = APIRouter(prefix="/api/usage", tags=["usage"])
+
+
+@router.get("")
+async def get_usage(
+    group_by: UsageGroupBy = "endpoint",
+    since: datetime | None = None,
+    until: datetime | None = None,
+    client_id: str | None = None,
+    endpoint: str | None = None,
+    ledger: UsageLedger = Depends(get_usage_ledger),
+) -> list[UsageAggregate]:
+    """Aggregate LLM calls by client, endpoint, operation, model or tool.
+
+    Returns call, error and retry counts, token totals (including prompt
+    cache reads/writes) and p50/p95 latency for each group within the
+    ``since``/``until`` window, heaviest groups first. Without ``since`` the
+    window covers the last ``usage_default_window_days`` days.
+    """
+    await ledger.flush()
+    return await ledger.aggregate(
+        group_by=group_by,
+        since=since,
+        until=until,
+        client_id=client_id,
+        endpoint=endpoint,
+    )
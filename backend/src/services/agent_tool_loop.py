@@ -1,17 +1,155 @@
 """Shared tool-use loop for Claude agents (onboarding & consultant)."""
 
+import asyncio
 import json
 import logging
-from collections.abc import AsyncIterator, Awaitable, Callable
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable, Collection
 from typing import Any
 
 import anthropic
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.config import settings
+from src.services import usage_ledger
+from src.services.llm_clients import _default_clients
 
 logger = logging.getLogger(__name__)
 
+_EPHEMERAL: dict[str, str] = {"type": "ephemeral"}
+
+# A failed request is retried once, but only if nothing was streamed yet.
+_STREAM_ATTEMPTS = 2
+_RETRY_DELAY = 2.0
+
+_UNAVAILABLE = json.dumps(
+    {
+        "type": "error",
+        "message": (
+            "Our AI service is temporarily unavailable. Please try again in a moment."
+        ),
+        "code": "api_error",
+    }
+)
+
+
+def _system_blocks(
+    system: str, system_context: str | None, cache: bool
+) -> list[dict[str, Any]]:
+    """Static system text first (cached), volatile context after the breakpoint."""
+    blocks: list[dict[str, Any]] = [{"type": "text", "text": system}]
+    if cache:
+        blocks[0]["cache_control"] = _EPHEMERAL
+    if system_context:
+        blocks.append({"type": "text", "text": system_context})
+    return blocks
+
+
+def _cached_tools(
+    tools: list[anthropic.types.ToolParam], cache: bool
+) -> list[dict[str, Any]]:
+    """Mark the last tool so the whole tool list is part of the cached prefix."""
+    result: list[dict[str, Any]] = [dict(t) for t in tools]
+    if cache and result:
+        result[-1]["cache_control"] = _EPHEMERAL
+    return result
+
+
+def _with_message_breakpoint(
+    messages: list[anthropic.types.MessageParam],
+) -> list[dict[str, Any]]:
+    """Copy messages with a cache breakpoint on the final content block.
+
+    Each tool-use iteration then reads the conversation so far from cache
+    instead of paying for it again. The caller's list is not modified.
+    """
+    result: list[dict[str, Any]] = [dict(m) for m in messages]
+    if not result:
+        return result
+    last = result[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        blocks: list[dict[str, Any]] = [{"type": "text", "text": content}]
+    else:
+        blocks = [dict(b) for b in content]
+    if blocks:
+        blocks[-1]["cache_control"] = _EPHEMERAL
+        last["content"] = blocks
+    return result
+
+
+async def _execute_safely(
+    execute_tool: Callable[[str, dict[str, Any]], Awaitable[str]],
+    tool_name: str,
+    tool_input: dict[str, Any],
+    after: Collection[asyncio.Task[str]],
+) -> str:
+    """Run one tool call, turning failures into a result Claude can read.
+
+    The call first waits for the earlier tool calls in ``after`` so that
+    writes are applied in the order Claude requested them.
+    """
+    if after:
+        await asyncio.wait(after)
+    usage_ledger.set_tool(tool_name)
+    try:
+        return await execute_tool(tool_name, tool_input)
+    except Exception as exc:
+        logger.warning("Tool %s failed: %s", tool_name, exc)
+        return (
+            f"[TOOL ERROR] {tool_name} failed: "
+            f"{type(exc).__name__}: {exc}. "
+            "Please acknowledge this error to the user and continue."
+        )
+
+
+class _ToolBatch:
+    """Tool calls of one Claude response, started as their blocks complete.
+
+    Read-only calls run concurrently. A mutating call waits for every
+    earlier call, and later calls wait for it.
+    """
+
+    def __init__(
+        self,
+        execute_tool: Callable[[str, dict[str, Any]], Awaitable[str]],
+        mutating_tools: Collection[str] | None,
+    ) -> None:
+        self._execute_tool = execute_tool
+        self._mutating_tools = mutating_tools
+        self._calls: list[tuple[str, asyncio.Task[str]]] = []
+        self._last_write: asyncio.Task[str] | None = None
+        self._reads_since_write: list[asyncio.Task[str]] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._calls)
+
+    def start(self, tool_id: str, tool_name: str, tool_input: dict[str, Any]) -> None:
+        mutates = self._mutating_tools is None or tool_name in self._mutating_tools
+        after = [self._last_write] if self._last_write else []
+        if mutates:
+            after += self._reads_since_write
+        task = asyncio.create_task(
+            _execute_safely(self._execute_tool, tool_name, tool_input, after)
+        )
+        if mutates:
+            self._last_write = task
+            self._reads_since_write = []
+        else:
+            self._reads_since_write.append(task)
+        self._calls.append((tool_id, task))
+
+    async def results(self) -> list[dict[str, Any]]:
+        """Wait for all calls and return tool_result blocks in request order."""
+        outputs = await asyncio.gather(*(task for _, task in self._calls))
+        return [
+            {"type": "tool_result", "tool_use_id": tool_id, "content": output}
+            for (tool_id, _), output in zip(self._calls, outputs, strict=True)
+        ]
+
+    def cancel(self) -> None:
+        for _, task in self._calls:
+            task.cancel()
+
 
 async def run_tool_loop(
     *,
@@ -19,123 +157,160 @@ async def run_tool_loop(
     system: str,
     tools: list[anthropic.types.ToolParam],
     execute_tool: Callable[[str, dict[str, Any]], Awaitable[str]],
+    mutating_tools: Collection[str] | None = None,
+    system_context: str | None = None,
+    api_client: anthropic.AsyncAnthropic | None = None,
     model: str | None = None,
     max_tokens: int = 2048,
     max_iterations: int = 10,
+    operation: str = "agent_turn",
 ) -> AsyncIterator[str]:
     """Run the Claude tool-use loop, yielding SSE JSON events.
 
+    Responses are streamed: text deltas are forwarded as they arrive and each
+    ``tool_use`` block starts executing as soon as it is complete, while
+    Claude is still generating the rest of the response.
+
+    Read-only tool calls of one response run concurrently. A mutating call
+    waits for every earlier call, and later calls wait for it, so writes
+    stay ordered. Results are returned in ``tool_use`` order.
+
+    When ``settings.prompt_caching`` is on, cache breakpoints are placed on
+    the tool definitions, the static system prompt and the latest message,
+    so repeated iterations and turns reuse the cached prefix. Token usage,
+    including cache reads and writes, and the time to first token are
+    reported on the ``done`` event.
+
     Args:
         messages: Conversation messages for Claude.
-        system: System prompt.
+        system: Static system prompt (cached; keep it identical across turns).
         tools: Tool definitions.
         execute_tool: Async callback that takes (tool_name, tool_input) and
             returns a result string. The caller is responsible for any side
             effects (e.g. persisting client state).
+        mutating_tools: Names of tools that change state. ``None`` treats
+            every tool as mutating, so calls run one at a time.
+        system_context: Per-turn context (e.g. the current client), sent
+            after the cached system prefix so it does not invalidate it.
+        api_client: Shared Anthropic client. Defaults to the application's
+            pooled client.
         model: Claude model ID. Defaults to ``settings.agent_model``.
         max_tokens: Max tokens per Claude response.
         max_iterations: Max tool-use round trips.
+        operation: Name recorded for each Claude call in the usage ledger.
 
     Yields:
         JSON-encoded SSE event strings (text, tool_use, done).
     """
     resolved_model = model or settings.agent_model
+    cache = settings.prompt_caching
+    system_blocks = _system_blocks(system, system_context, cache)
+    tool_defs = _cached_tools(tools, cache)
+    usage = {
+        "input_tokens": 0,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 0,
+        "output_tokens": 0,
+    }
+    client = api_client or _default_clients.anthropic
+    started = time.monotonic()
+    ttft_ms: int | None = None
+    tool_calls = _ToolBatch(execute_tool, mutating_tools)
 
-    api_client = anthropic.AsyncAnthropic(
-        api_key=settings.anthropic_api_key, timeout=120.0
-    )
+    try:
+        for _ in range(max_iterations):
+            response: anthropic.types.Message | None = None
+            tool_calls = _ToolBatch(execute_tool, mutating_tools)
 
-    @retry(
-        stop=stop_after_attempt(2),
-        wait=wait_exponential(multiplier=1, min=2, max=8),
-        reraise=True,
-    )
-    async def _call_claude(
-        msgs: list[anthropic.types.MessageParam],
-    ) -> anthropic.types.Message:
-        return await api_client.messages.create(
-            model=resolved_model,
-            max_tokens=max_tokens,
-            system=system,
-            tools=tools,
-            messages=msgs,
-        )
+            for attempt in range(1, _STREAM_ATTEMPTS + 1):
+                emitted = False
+                try:
+                    with usage_ledger.track_anthropic(
+                        operation, resolved_model, retries=attempt - 1
+                    ) as call:
+                        async with client.messages.stream(
+                            model=resolved_model,
+                            max_tokens=max_tokens,
+                            system=system_blocks,  # type: ignore[arg-type]
+                            tools=tool_defs,  # type: ignore[arg-type]
+                            messages=_with_message_breakpoint(messages)  # type: ignore[arg-type]
+                            if cache
+                            else messages,
+                            timeout=120.0,
+                        ) as stream:
+                            async for event in stream:
+                                if event.type == "text":
+                                    if ttft_ms is None:
+                                        ttft_ms = round(
+                                            (time.monotonic() - started) * 1000
+                                        )
+                                    emitted = True
+                                    yield json.dumps(
+                                        {"type": "text", "content": event.text}
+                                    )
+                                elif (
+                                    event.type == "content_block_stop"
+                                    and event.content_block.type == "tool_use"
+                                ):
+                                    tool_block = event.content_block
+                                    emitted = True
+                                    yield json.dumps(
+                                        {
+                                            "type": "tool_use",
+                                            "tool": tool_block.name,
+                                            "input": tool_block.input,
+                                        }
+                                    )
+                                    tool_calls.start(
+                                        tool_block.id, tool_block.name, tool_block.input
+                                    )
+                            response = await stream.get_final_message()
+                            call.usage = response.usage
+                    break
+                except Exception as exc:
+                    if emitted or attempt == _STREAM_ATTEMPTS:
+                        logger.error("Claude API call failed: %s", exc)
+                        yield _UNAVAILABLE
+                        return
+                    logger.warning("Claude stream failed, retrying: %s", exc)
+                    await asyncio.sleep(_RETRY_DELAY)
+
+            assert response is not None
+            for key in usage:
+                usage[key] += getattr(response.usage, key, None) or 0
 
-    for _ in range(max_iterations):
-        try:
-            response = await _call_claude(messages)
-        except Exception as exc:
-            logger.error("Claude API call failed: %s", exc)
-            yield json.dumps(
-                {
-                    "type": "error",
-                    "message": (
-                        "Our AI service is temporarily unavailable."
-                        " Please try again in a moment."
-                    ),
-                    "code": "api_error",
-                }
-            )
-            return
-
-        assistant_text = ""
-        tool_calls: list[tuple[str, str, dict[str, Any]]] = []
-
-        for block in response.content:
-            if block.type == "text":
-                assistant_text += block.text
-                yield json.dumps({"type": "text", "content": block.text})
-            elif block.type == "tool_use":
-                tool_calls.append((block.id, block.name, block.input))
-                yield json.dumps(
-                    {
-                        "type": "tool_use",
-                        "tool": block.name,
-                        "input": block.input,
-                    }
-                )
-
-        if not tool_calls:
-            break
-
-        # Serialize content blocks to plain dicts so they survive
-        # a round-trip through the SDK without pydantic compat issues.
-        content_dicts: list[dict[str, Any]] = []
-        for block in response.content:
-            if block.type == "text":
-                content_dicts.append(
-                    {"type": "text", "text": block.text}
-                )
-            elif block.type == "tool_use":
-                content_dicts.append(
-                    {
-                        "type": "tool_use",
-                        "id": block.id,
-                        "name": block.name,
-                        "input": block.input,
-                    }
-                )
-        messages.append({"role": "assistant", "content": content_dicts})  # type: ignore[typeddict-item]
-
-        tool_results: list[dict[str, Any]] = []
-        for tool_id, tool_name, tool_input in tool_calls:
-            try:
-                result = await execute_tool(tool_name, tool_input)
-            except Exception as exc:
-                logger.warning("Tool %s failed: %s", tool_name, exc)
-                result = (
-                    f"[TOOL ERROR] {tool_name} failed: "
-                    f"{type(exc).__name__}: {exc}. "
-                    "Please acknowledge this error to the user and continue."
-                )
-            tool_results.append(
-                {
-                    "type": "tool_result",
-                    "tool_use_id": tool_id,
-                    "content": result,
-                }
-            )
-
-        messages.append({"role": "user", "content": tool_results})  # type: ignore[typeddict-item]
-
-    yield json.dumps({"type": "done"})
+            if not tool_calls:
+                break
+
+            # Serialize content blocks to plain dicts so they survive
+            # a round-trip through the SDK without pydantic compat issues.
+            content_dicts: list[dict[str, Any]] = []
+            for block in response.content:
+                if block.type == "text":
+                    content_dicts.append({"type": "text", "text": block.text})
+                elif block.type == "tool_use":
+                    content_dicts.append(
+                        {
+                            "type": "tool_use",
+                            "id": block.id,
+                            "name": block.name,
+                            "input": block.input,
+                        }
+                    )
+            messages.append({"role": "assistant", "content": content_dicts})  # type: ignore[typeddict-item]
+
+            tool_results = await tool_calls.results()
+            messages.append({"role": "user", "content": tool_results})  # type: ignore[typeddict-item]
+    finally:
+        tool_calls.cancel()
+
+    logger.info(
+        "Claude usage: %d input (%d cache read, %d cache write), %d output;"
+        " first token after %s ms",
+        usage["input_tokens"],
+        usage["cache_read_input_tokens"],
+        usage["cache_creation_input_tokens"],
+        usage["output_tokens"],
+        ttft_ms,
+    )
+    yield json.dumps({"type": "done", "usage": usage, "ttft_ms": ttft_ms})
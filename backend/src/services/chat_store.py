@@ -1,13 +1,20 @@
-"""SQLite-backed CRUD for chat sessions."""
+"""SQLite-backed CRUD for chat sessions.
+
+Messages live in ``chat_messages``, one row per message keyed by session and
+sequence number, so appending to a long conversation costs the same as
+appending to a short one.
+"""
 
-import json
 import uuid
+from collections.abc import Sequence
 from datetime import UTC, datetime
+from typing import Any
 
 import aiosqlite
 
-from src.models.chat_session import ChatSession
-from src.services.db import get_db
+from src.models.chat_session import ChatSession, ChatSessionSummary
+from src.services.db import db_reader, db_writer
+from src.services.keyset import fetch_page
 
 
 async def create_session(client_id: str | None = None) -> ChatSession:
@@ -17,97 +24,233 @@ async def create_session(client_id: str | None = None) -> ChatSession:
         created_at=datetime.now(UTC),
         updated_at=datetime.now(UTC),
     )
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         await db.execute(
             """INSERT INTO chat_sessions
-               (id, client_id, title, messages, created_at, updated_at)
-               VALUES (?, ?, ?, ?, ?, ?)""",
+               (id, client_id, title, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?)""",
             (
                 session.id,
                 session.client_id,
                 session.title,
-                json.dumps(session.messages),
                 session.created_at.isoformat(),
                 session.updated_at.isoformat(),
             ),
         )
         await db.commit()
-    finally:
-        await db.close()
     return session
 
 
-async def get_session(session_id: str) -> ChatSession | None:
-    db = await get_db()
-    try:
+async def get_session(
+    session_id: str, *, include_messages: bool = True
+) -> ChatSession | None:
+    async with db_reader() as db:
+        return await _get_session(db, session_id, include_messages)
+
+
+async def get_session_tail(
+    session_id: str, limit: int
+) -> tuple[ChatSession, list[dict[str, Any]]] | None:
+    """A session without its messages, plus its unsummarized recent messages.
+
+    Returns at most ``limit`` messages, oldest first, from those after the
+    session's rolling summary.
+    """
+    async with db_reader() as db:
+        session = await _get_session(db, session_id, include_messages=False)
+        if session is None:
+            return None
         cursor = await db.execute(
-            "SELECT * FROM chat_sessions WHERE id = ?", (session_id,)
+            "SELECT role, content FROM chat_messages"
+            " WHERE session_id = ? AND seq >= ? ORDER BY seq DESC LIMIT ?",
+            (session_id, session.summarized_messages, limit),
+        )
+        rows = list(await cursor.fetchall())
+    return session, [_row_to_message(r) for r in reversed(rows)]
+
+
+async def get_messages(
+    session_id: str, start: int = 0, stop: int | None = None
+) -> list[dict[str, Any]]:
+    """Messages ``start`` (inclusive) to ``stop`` (exclusive), oldest first."""
+    sql = "SELECT role, content FROM chat_messages WHERE session_id = ? AND seq >= ?"
+    params: list[Any] = [session_id, start]
+    if stop is not None:
+        sql += " AND seq < ?"
+        params.append(stop)
+    async with db_reader() as db:
+        cursor = await db.execute(sql + " ORDER BY seq", params)
+        rows = await cursor.fetchall()
+    return [_row_to_message(r) for r in rows]
+
+
+_SUMMARY_FIELDS = list(ChatSessionSummary.model_fields)
+
+
+async def list_sessions(
+    client_id: str | None = None, limit: int = 50, cursor: str | None = None
+) -> tuple[list[ChatSessionSummary], int, str | None]:
+    """A page of session summaries (most recently updated first), the total
+    count and the cursor for the next page.
+
+    Only the summary columns are read; use ``get_session`` for a transcript.
+    """
+    where, params = ("client_id = ?", (client_id,)) if client_id else ("", ())
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            f"SELECT {', '.join(_SUMMARY_FIELDS)} FROM chat_sessions",
+            sort="updated_at",
+            where=where,
+            params=params,
+            limit=limit,
+            cursor=cursor,
+        )
+        count = await db.execute(
+            "SELECT COUNT(*) FROM chat_sessions" + (f" WHERE {where}" if where else ""),
+            params,
+        )
+        total = await count.fetchone()
+    sessions = [ChatSessionSummary.model_validate(dict(r)) for r in rows]
+    return sessions, total[0] if total else 0, next_cursor
+
+
+async def append_messages(
+    session_id: str,
+    messages: Sequence[dict[str, Any]],
+    title: str | None = None,
+) -> int | None:
+    """Append messages (and optionally set the title) in one transaction.
+
+    Returns the session's new message count, or None if it does not exist.
+    """
+    now = datetime.now(UTC).isoformat()
+    async with db_writer() as db:
+        cursor = await db.execute(
+            """UPDATE chat_sessions
+               SET message_count = message_count + ?, updated_at = ?,
+                   title = COALESCE(?, title)
+               WHERE id = ?
+               RETURNING message_count""",
+            (len(messages), now, title, session_id),
         )
         row = await cursor.fetchone()
         if row is None:
             return None
-        return _row_to_session(row)
-    finally:
-        await db.close()
-
-
-async def list_sessions(client_id: str | None = None) -> list[ChatSession]:
-    db = await get_db()
-    try:
-        if client_id:
-            cursor = await db.execute(
-                "SELECT * FROM chat_sessions WHERE client_id = ?"
-                " ORDER BY updated_at DESC",
-                (client_id,),
-            )
-        else:
-            cursor = await db.execute(
-                "SELECT * FROM chat_sessions ORDER BY updated_at DESC"
-            )
-        rows = await cursor.fetchall()
-        return [_row_to_session(r) for r in rows]
-    finally:
-        await db.close()
+        count = int(row[0])
+        first = count - len(messages)
+        await _insert_messages(db, session_id, first, messages, now)
+        await db.commit()
+    return count
 
 
 async def update_session(
     session_id: str,
-    messages: list[dict[str, str]] | None = None,
+    messages: list[dict[str, Any]] | None = None,
     title: str | None = None,
 ) -> ChatSession | None:
-    session = await get_session(session_id)
-    if session is None:
-        return None
-    db = await get_db()
-    try:
-        now = datetime.now(UTC).isoformat()
+    """Replace a session's transcript and/or title.
+
+    Use ``append_messages`` to add to a conversation; this rewrites it.
+    """
+    now = datetime.now(UTC).isoformat()
+    async with db_writer() as db:
+        cursor = await db.execute(
+            """UPDATE chat_sessions
+               SET title = COALESCE(?, title), updated_at = ?,
+                   message_count = COALESCE(?, message_count)
+               WHERE id = ?""",
+            (title, now, len(messages) if messages is not None else None, session_id),
+        )
+        if cursor.rowcount == 0:
+            return None
         if messages is not None:
             await db.execute(
-                "UPDATE chat_sessions SET messages = ?, updated_at = ? WHERE id = ?",
-                (json.dumps(messages), now, session_id),
-            )
-        if title is not None:
-            await db.execute(
-                "UPDATE chat_sessions SET title = ?, updated_at = ? WHERE id = ?",
-                (title, now, session_id),
+                "DELETE FROM chat_messages WHERE session_id = ?", (session_id,)
             )
+            await _insert_messages(db, session_id, 0, messages, now)
+        await db.commit()
+        return await _get_session(db, session_id, include_messages=True)
+
+
+async def update_summary(
+    session_id: str, summary: str, summarized_messages: int
+) -> None:
+    async with db_writer() as db:
+        await db.execute(
+            "UPDATE chat_sessions SET summary = ?, summarized_messages = ?"
+            " WHERE id = ?",
+            (summary, summarized_messages, session_id),
+        )
         await db.commit()
-    finally:
-        await db.close()
-    return await get_session(session_id)
 
 
 async def delete_session(session_id: str) -> bool:
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         cursor = await db.execute(
             "DELETE FROM chat_sessions WHERE id = ?", (session_id,)
         )
+        await db.execute(
+            "DELETE FROM chat_messages WHERE session_id = ?", (session_id,)
+        )
         await db.commit()
         return cursor.rowcount > 0
-    finally:
-        await db.close()
+
+
+async def _get_session(
+    db: aiosqlite.Connection, session_id: str, include_messages: bool
+) -> ChatSession | None:
+    cursor = await db.execute("SELECT * FROM chat_sessions WHERE id = ?", (session_id,))
+    row = await cursor.fetchone()
+    if row is None:
+        return None
+    session = _row_to_session(row)
+    if include_messages:
+        await _attach_messages(db, [session])
+    return session
+
+
+async def _insert_messages(
+    db: aiosqlite.Connection,
+    session_id: str,
+    first_seq: int,
+    messages: Sequence[dict[str, Any]],
+    created_at: str,
+) -> None:
+    await db.executemany(
+        "INSERT INTO chat_messages (session_id, seq, role, content, created_at)"
+        " VALUES (?, ?, ?, ?, ?)",
+        [
+            (
+                session_id,
+                first_seq + i,
+                m.get("role", "user"),
+                m.get("content", ""),
+                created_at,
+            )
+            for i, m in enumerate(messages)
+        ],
+    )
+
+
+async def _attach_messages(
+    db: aiosqlite.Connection, sessions: list[ChatSession]
+) -> None:
+    if not sessions:
+        return
+    by_id = {s.id: s for s in sessions}
+    placeholders = ", ".join("?" for _ in by_id)
+    cursor = await db.execute(
+        "SELECT session_id, role, content FROM chat_messages"
+        f" WHERE session_id IN ({placeholders}) ORDER BY session_id, seq",
+        list(by_id),
+    )
+    for row in await cursor.fetchall():
+        by_id[row["session_id"]].messages.append(_row_to_message(row))
+
+
+def _row_to_message(row: aiosqlite.Row) -> dict[str, Any]:
+    return {"role": row["role"], "content": row["content"]}
 
 
 def _row_to_session(row: aiosqlite.Row) -> ChatSession:
@@ -115,7 +258,9 @@ def _row_to_session(row: aiosqlite.Row) -> ChatSession:
         id=row["id"],
         client_id=row["client_id"],
         title=row["title"],
-        messages=json.loads(row["messages"]),
+        message_count=row["message_count"],
+        summary=row["summary"],
+        summarized_messages=row["summarized_messages"],
         created_at=datetime.fromisoformat(row["created_at"]),
         updated_at=datetime.fromisoformat(row["updated_at"]),
     )
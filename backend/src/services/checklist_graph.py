@@ -0,0 +1,113 @@
+"""Checklist dependency graph: what can start now and what sets the end date.
+
+A client's checklist items name the items they depend on by id. The graph
+indexes them once, orders them topologically and runs a critical-path pass
+over ``estimated_days``, all in O(items + dependencies).
+"""
+
+from collections import deque
+from collections.abc import Sequence
+
+from src.models.client import ChecklistItem
+
+# Statuses that need no further work
+DONE_STATUSES = frozenset({"complete", "not_applicable"})
+
+
+class ChecklistGraph:
+    """A checklist compiled into a DAG with forward and reverse edges.
+
+    Dependencies on ids missing from the checklist keep an item from being
+    ready but are otherwise ignored. Items on a dependency cycle can never
+    be scheduled; they are listed in ``cyclic``.
+    """
+
+    def __init__(self, items: Sequence[ChecklistItem]) -> None:
+        self.items: dict[str, ChecklistItem] = {item.id: item for item in items}
+        self.dependencies: dict[str, list[str]] = {}
+        self.dependents: dict[str, list[str]] = {item_id: [] for item_id in self.items}
+        self.missing: dict[str, list[str]] = {}
+        for item_id, item in self.items.items():
+            deps = list(dict.fromkeys(item.depends_on))
+            self.dependencies[item_id] = [d for d in deps if d in self.items]
+            unknown = [d for d in deps if d not in self.items]
+            if unknown:
+                self.missing[item_id] = unknown
+            for dep in self.dependencies[item_id]:
+                self.dependents[dep].append(item_id)
+
+        # Kahn's algorithm, keeping checklist order among peers
+        indegree = {item_id: len(deps) for item_id, deps in self.dependencies.items()}
+        queue = deque(item_id for item_id, n in indegree.items() if n == 0)
+        self.order: list[str] = []
+        while queue:
+            item_id = queue.popleft()
+            self.order.append(item_id)
+            for dependent in self.dependents[item_id]:
+                indegree[dependent] -= 1
+                if indegree[dependent] == 0:
+                    queue.append(dependent)
+        ordered = set(self.order)
+        self.cyclic: list[str] = [i for i in self.items if i not in ordered]
+
+        self._schedule()
+
+    def is_done(self, item_id: str) -> bool:
+        return self.items[item_id].status in DONE_STATUSES
+
+    def _duration(self, item_id: str) -> int:
+        if self.is_done(item_id):
+            return 0
+        return self.items[item_id].estimated_days or 0
+
+    def _schedule(self) -> None:
+        # Forward pass: earliest finish, and which dependency gates the start
+        self.earliest_finish: dict[str, int] = {}
+        gate: dict[str, str | None] = {}
+        for item_id in self.order:
+            start, gating = 0, None
+            for dep in self.dependencies[item_id]:
+                if self.earliest_finish[dep] > start:
+                    start, gating = self.earliest_finish[dep], dep
+            self.earliest_finish[item_id] = start + self._duration(item_id)
+            gate[item_id] = gating
+        self.remaining_days = max(self.earliest_finish.values(), default=0)
+
+        # Reverse pass: how long each item can slip without moving the end
+        latest_finish: dict[str, int] = {}
+        for item_id in reversed(self.order):
+            latest_finish[item_id] = min(
+                (
+                    latest_finish[d] - self._duration(d)
+                    for d in self.dependents[item_id]
+                    if d in latest_finish
+                ),
+                default=self.remaining_days,
+            )
+        self.slack: dict[str, int] = {
+            item_id: latest_finish[item_id] - self.earliest_finish[item_id]
+            for item_id in self.order
+        }
+
+        # Walk back from the last item to finish along the gating dependencies
+        path: list[str] = []
+        if self.remaining_days > 0:
+            current: str | None = max(self.order, key=self.earliest_finish.__getitem__)
+            while current is not None:
+                if self._duration(current) > 0:
+                    path.append(current)
+                current = gate[current]
+        self.critical_path: list[str] = path[::-1]
+
+    def ready(self) -> list[ChecklistItem]:
+        """Not-started items whose dependencies are all done, most urgent
+        (least slack) first."""
+        ready = [
+            item_id
+            for item_id in self.order
+            if self.items[item_id].status == "not_started"
+            and item_id not in self.missing
+            and all(self.is_done(dep) for dep in self.dependencies[item_id])
+        ]
+        ready.sort(key=self.slack.__getitem__)
+        return [self.items[item_id] for item_id in ready]
@@ -1,16 +1,20 @@
 """Claude tool-use agent for client onboarding conversations."""
 
+import copy
+import json
 import logging
-from collections.abc import AsyncIterator
-from datetime import UTC, datetime
+from collections.abc import AsyncIterator, Callable
 from typing import Any
 
 import anthropic
+from pydantic import ValidationError
 
 from src.models.client import Client
-from src.services import client_store, rag_service
+from src.services import client_store, history_manager, rag_service
 from src.services.agent_tool_loop import run_tool_loop
 from src.services.checklist_templates import get_checklist_for_pathway
+from src.services.client_uow import ClientUnitOfWork
+from src.services.tool_memo import TurnMemo
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +68,48 @@ def _sanitize_field_value(field: str, value: Any) -> Any:
             return opt
     return value
 
+
+# Fields the agent may not overwrite.
+_READ_ONLY_FIELDS = {"id", "version"}
+
+
+def _validate_field_updates(
+    client: Client, updates: dict[str, Any]
+) -> tuple[dict[str, Any], dict[str, str]]:
+    """Sanitize and validate a batch of field updates in one pass.
+
+    Returns the validated values to apply and an error message for each
+    field that was rejected.
+    """
+    errors: dict[str, str] = {}
+    candidates: dict[str, Any] = {}
+    for field, value in updates.items():
+        if field not in Client.model_fields or field in _READ_ONLY_FIELDS:
+            errors[field] = "unknown field"
+        else:
+            candidates[field] = _sanitize_field_value(field, value)
+
+    data = client.model_dump()
+    while candidates:
+        try:
+            validated = Client.model_validate({**data, **candidates})
+        except ValidationError as exc:
+            rejected = {
+                str(error["loc"][0]): error["msg"]
+                for error in exc.errors()
+                if error["loc"] and error["loc"][0] in candidates
+            }
+            if not rejected:
+                # The stored profile itself is invalid; reject the batch.
+                rejected = dict.fromkeys(candidates, "invalid client profile")
+            for field, msg in rejected.items():
+                del candidates[field]
+                errors[field] = msg
+            continue
+        return {f: getattr(validated, f) for f in candidates}, errors
+    return {}, errors
+
+
 SYSTEM_PROMPT = """\
 You are the FINMA Comply onboarding assistant, a senior regulatory intake \
 specialist with deep expertise in Swiss financial regulation and FINMA \
@@ -179,7 +225,9 @@ CONVERSATION GUIDELINES
 - Ask 1-2 questions at a time, in a natural, professional tone
 - Explain WHY you're asking when it might seem unusual (regulatory context)
 - Show your expertise — reference specific legal articles when relevant
-- Use the tools to save information immediately as you collect it
+- Use the tools to save information immediately as you collect it. When a \
+reply contains several facts, save them all in ONE `update_client_fields` call \
+instead of calling `update_client_field` once per fact
 - Search the knowledge base when you need to verify specific requirements
 - When you have enough information to determine the pathway, do so — don't \
 over-ask when the answer is clear
@@ -273,6 +321,31 @@ TOOLS: list[anthropic.types.ToolParam] = [
             "required": ["field", "value"],
         },
     },
+    {
+        "name": "update_client_fields",
+        "description": (
+            "Update several fields on the client's intake profile in one"
+            " call. Prefer this over update_client_field whenever you have"
+            " more than one fact to save. Reports the outcome per field."
+        ),
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "fields": {
+                    "type": "object",
+                    "description": (
+                        "Map of field name to value, e.g."
+                        ' {"company_name": "Acme AG",'
+                        ' "legal_structure": "AG",'
+                        ' "handles_fiat": true}.'
+                        " Field names and value types are the"
+                        " same as for update_client_field."
+                    ),
+                },
+            },
+            "required": ["fields"],
+        },
+    },
     {
         "name": "flag_item",
         "description": (
@@ -373,26 +446,61 @@ TOOLS: list[anthropic.types.ToolParam] = [
     },
 ]
 
+# Tools that change client state; the rest may run concurrently.
+MUTATING_TOOLS = frozenset(
+    {
+        "update_client_field",
+        "update_client_fields",
+        "flag_item",
+        "set_pathway",
+        "mark_intake_complete",
+    }
+)
+
 
 async def _execute_tool(
-    client: Client, tool_name: str, tool_input: dict[str, Any]
-) -> tuple[Client, str]:
-    """Execute a tool call and return updated client + result string."""
-    if tool_name == "update_client_field":
+    uow: ClientUnitOfWork, client_id: str, tool_name: str, tool_input: dict[str, Any]
+) -> str:
+    """Execute a tool call against the onboarding client and return the result.
+
+    Client changes are applied through ``uow`` and saved when the turn ends.
+    """
+
+    async def _mutate(change: Callable[[Client], str]) -> str:
+        result = await uow.mutate(client_id, change)
+        return result if result is not None else f"Client {client_id} not found."
+
+    if tool_name in ("update_client_field", "update_client_fields"):
         try:
-            field = tool_input["field"]
-            value = _sanitize_field_value(field, tool_input["value"])
-            data = client.model_dump()
-            if field in data:
-                data[field] = value
-                data["updated_at"] = datetime.now(UTC)
-                client = Client.model_validate(data)
-                await client_store.save_client(client)
-                return client, f"Updated {field} successfully."
-            return client, f"Unknown field: {field}"
+            if tool_name == "update_client_field":
+                updates = {tool_input["field"]: tool_input["value"]}
+            else:
+                updates = dict(tool_input["fields"])
+            client = await uow.get(client_id)
+            if client is None:
+                return f"Client {client_id} not found."
+            values, errors = _validate_field_updates(client, updates)
+
+            def _set_fields(client: Client) -> None:
+                for field, value in values.items():
+                    setattr(client, field, copy.deepcopy(value))
+
+            if values:
+                await uow.mutate(client_id, _set_fields)
+            if tool_name == "update_client_field":
+                field = tool_input["field"]
+                if field in values:
+                    return f"Updated {field} successfully."
+                if errors[field] == "unknown field":
+                    return f"Unknown field: {field}"
+                return f"Failed to update {field}: {errors[field]}"
+            lines = [f"Updated {len(values)} of {len(updates)} fields."]
+            lines += [f"- {field}: updated" for field in values]
+            lines += [f"- {field}: {msg}" for field, msg in errors.items()]
+            return "\n".join(lines)
         except Exception as exc:
-            logger.warning("update_client_field failed: %s", exc)
-            return client, f"Failed to update {tool_input.get('field', '?')}: {exc}"
+            logger.warning("%s failed: %s", tool_name, exc)
+            return f"Failed to update client fields: {exc}"
 
     if tool_name == "flag_item":
         try:
@@ -407,75 +515,101 @@ async def _execute_tool(
                 reason=tool_input["reason"],
                 severity=severity,
             )
-            client.flags.append(flag)
-            client.updated_at = datetime.now(UTC)
-            await client_store.save_client(client)
-            return (
-                client,
-                f"Flagged {tool_input['field']}"
-                f" ({severity}):"
-                f" {tool_input['reason']}",
-            )
+
+            def _add_flag(client: Client) -> str:
+                client.flags.append(flag.model_copy())
+                return (
+                    f"Flagged {tool_input['field']}"
+                    f" ({severity}):"
+                    f" {tool_input['reason']}"
+                )
+
+            return await _mutate(_add_flag)
         except Exception as exc:
             logger.warning("flag_item failed: %s", exc)
-            return client, f"Failed to flag item: {exc}"
+            return f"Failed to flag item: {exc}"
 
     if tool_name == "search_knowledge_base":
         try:
             results = await rag_service.search(tool_input["query"], top_k=3)
             if not results:
-                return client, "No relevant results found in the knowledge base."
+                return "No relevant results found in the knowledge base."
             texts = []
             for r in results:
                 texts.append(f"[{r.get('title', 'Unknown')}]: {r.get('text', '')}")
-            return client, "\n\n---\n\n".join(texts)
+            return "\n\n---\n\n".join(texts)
         except Exception as exc:
             logger.warning("search_knowledge_base failed: %s", exc)
-            return client, f"Knowledge base search failed: {exc}"
+            return f"Knowledge base search failed: {exc}"
 
     if tool_name == "set_pathway":
         try:
             pathway = _sanitize_field_value("pathway", tool_input["pathway"])
-            client.pathway = pathway
-            client.checklist = get_checklist_for_pathway(pathway)
-            if pathway.startswith("finma"):
-                license_map = {
-                    "finma_banking": "banking",
-                    "finma_fintech": "fintech",
-                    "finma_securities": "securities_firm",
-                    "finma_fund_management": "fund_management",
-                    "finma_insurance": "insurance",
-                }
-                lt = license_map.get(pathway)
-                if lt is not None:
-                    client.finma_license_type = lt  # type: ignore[assignment]
-            client.status = "in_progress"
-            client.updated_at = datetime.now(UTC)
-            await client_store.save_client(client)
-            return (
-                client,
-                f"Pathway set to {pathway}. Checklist generated"
-                f" with {len(client.checklist)} items."
-                f" Reason: {tool_input['reason']}",
-            )
+
+            def _set_pathway(client: Client) -> str:
+                client.pathway = pathway
+                client.checklist = get_checklist_for_pathway(pathway)
+                if pathway.startswith("finma"):
+                    license_map = {
+                        "finma_banking": "banking",
+                        "finma_fintech": "fintech",
+                        "finma_securities": "securities_firm",
+                        "finma_fund_management": "fund_management",
+                        "finma_insurance": "insurance",
+                    }
+                    lt = license_map.get(pathway)
+                    if lt is not None:
+                        client.finma_license_type = lt  # type: ignore[assignment]
+                client.status = "in_progress"
+                return (
+                    f"Pathway set to {pathway}. Checklist generated"
+                    f" with {len(client.checklist)} items."
+                    f" Reason: {tool_input['reason']}"
+                )
+
+            return await _mutate(_set_pathway)
         except Exception as exc:
             logger.warning("set_pathway failed: %s", exc)
-            return client, f"Failed to set pathway: {exc}"
+            return f"Failed to set pathway: {exc}"
 
     if tool_name == "mark_intake_complete":
         try:
-            client.status = "under_review"
-            client.updated_at = datetime.now(UTC)
-            await client_store.save_client(client)
-            return client, f"Intake marked complete. Summary: {tool_input['summary']}"
+
+            def _complete(client: Client) -> str:
+                client.status = "under_review"
+                return f"Intake marked complete. Summary: {tool_input['summary']}"
+
+            return await _mutate(_complete)
         except Exception as exc:
             logger.warning("mark_intake_complete failed: %s", exc)
-            return client, f"Failed to mark intake complete: {exc}"
+            return f"Failed to mark intake complete: {exc}"
 
-    return client, f"Unknown tool: {tool_name}"
+    return f"Unknown tool: {tool_name}"
 
 
-async def run_onboarding_turn(client: Client, user_message: str) -> AsyncIterator[str]:
+_SAVE_FAILED = json.dumps(
+    {
+        "type": "error",
+        "message": "Client changes from this turn could not be saved.",
+        "code": "save_failed",
+    }
+)
+
+
+async def _flush_changes(uow: ClientUnitOfWork) -> AsyncIterator[str]:
+    """Flush ``uow``, yielding an error event if the write fails."""
+    try:
+        await uow.flush()
+    except Exception as exc:
+        logger.warning("Failed to save client changes: %s", exc)
+        yield _SAVE_FAILED
+
+
+async def run_onboarding_turn(
+    client: Client,
+    user_message: str,
+    api_client: anthropic.AsyncAnthropic | None = None,
+) -> AsyncIterator[str]:
     """Run one turn of the onboarding conversation. Yields SSE JSON events."""
     # Save user message to history
     client.conversation_history.append({"role": "user", "content": user_message})
@@ -484,45 +618,71 @@ async def run_onboarding_turn(client: Client, user_message: str) -> AsyncIterato
     except Exception as exc:
         logger.warning("Failed to persist user message to history: %s", exc)
 
-    # Build messages for Claude
+    # Replay only recent turns; older ones live in the rolling summary and
+    # saved facts are sent as a profile instead.
     messages: list[anthropic.types.MessageParam] = []
-    for msg in client.conversation_history:
-        messages.append({"role": msg["role"], "content": msg["content"]})  # type: ignore[typeddict-item]
+    for msg in history_manager.build_replay(
+        client.conversation_history, client.summarized_messages
+    ):
+        messages.append({"role": msg["role"], "content": msg["content"]})
+    context = "\n\n".join(
+        part
+        for part in (
+            history_manager.client_profile_context(client),
+            history_manager.summary_context(client.conversation_summary),
+        )
+        if part
+    )
 
-    # Mutable ref so the closure always sees the latest client
-    client_ref: list[Client] = [client]
+    uow = ClientUnitOfWork()
+    uow.attach(client)
 
     async def _exec(tool_name: str, tool_input: dict[str, Any]) -> str:
-        client_ref[0], result = await _execute_tool(
-            client_ref[0], tool_name, tool_input
-        )
-        return result
+        return await _execute_tool(uow, client.id, tool_name, tool_input)
 
     assistant_text = ""
-    async for event_json in run_tool_loop(
-        messages=messages,
-        system=SYSTEM_PROMPT,
-        tools=TOOLS,
-        execute_tool=_exec,
-        max_tokens=2048,
-    ):
-        # Track assistant text for conversation history
-        import json as _json
-
-        try:
-            evt = _json.loads(event_json)
+    done_event: str | None = None
+    try:
+        async for event_json in run_tool_loop(
+            messages=messages,
+            system=SYSTEM_PROMPT,
+            tools=TOOLS,
+            execute_tool=TurnMemo(
+                MUTATING_TOOLS, client_independent_tools={"search_knowledge_base"}
+            ).wrap(_exec),
+            mutating_tools=MUTATING_TOOLS,
+            system_context=context or None,
+            operation="onboarding_turn",
+            api_client=api_client,
+            max_tokens=2048,
+        ):
+            # Track assistant text for conversation history
+            try:
+                evt = json.loads(event_json)
+            except ValueError:
+                evt = {}
             if evt.get("type") == "text":
                 assistant_text += evt.get("content", "")
-        except ValueError:
-            pass
-        yield event_json
-
-    # Persist assistant reply to conversation history
-    if assistant_text:
-        client_ref[0].conversation_history.append(
-            {"role": "assistant", "content": assistant_text}
-        )
-        try:
-            await client_store.save_client(client_ref[0])
-        except Exception as exc:
-            logger.warning("Failed to persist assistant reply to history: %s", exc)
+            elif evt.get("type") == "done":
+                # Held back until the turn's changes are saved.
+                done_event = event_json
+                continue
+            yield event_json
+
+        # Persist the assistant reply together with the tool changes
+        if assistant_text:
+            reply = {"role": "assistant", "content": assistant_text}
+            await uow.mutate(client.id, lambda c: c.conversation_history.append(reply))
+        async for error_json in _flush_changes(uow):
+            yield error_json
+        if done_event is not None:
+            yield done_event
+    finally:
+        # Turns that end on a client disconnect keep their changes.
+        await uow.flush_quietly()
+
+    latest = await uow.get(client.id)
+    if latest is not None and history_manager.needs_summary(
+        len(latest.conversation_history), latest.summarized_messages
+    ):
+        await history_manager.schedule_summary("client", latest.id)
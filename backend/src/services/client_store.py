@@ -1,79 +1,583 @@
 """SQLite-backed client storage."""
 
+import asyncio
+import json
 import logging
+from collections.abc import Callable, Sequence
+from datetime import UTC, datetime
 from typing import Any
 
-from src.models.client import Client
-from src.services.db import DB_PATH, get_db
+import aiosqlite
+
+from src.models.client import ChecklistItem, Client, ClientSummary, FlaggedItem
+from src.services.db import DB_PATH, db_reader, db_writer
+from src.services.keyset import fetch_page
 
 logger = logging.getLogger(__name__)
 
 
+class ClientVersionConflictError(RuntimeError):
+    """Raised when a versioned save finds the client changed underneath it."""
+
+    def __init__(self, client_id: str, expected_version: int) -> None:
+        super().__init__(
+            f"Client {client_id} is no longer at version {expected_version}"
+        )
+        self.client_id = client_id
+        self.expected_version = expected_version
+
+
+class ClientItemNotFoundError(LookupError):
+    """Raised when a checklist item or flag does not exist on a client."""
+
+    def __init__(self, client_id: str, kind: str, item_id: str) -> None:
+        super().__init__(f"{kind} {item_id} not found for client {client_id}")
+        self.client_id = client_id
+        self.item_id = item_id
+
+
 async def init_db() -> None:
     from src.services.migrations.runner import run_migrations
 
     await run_migrations(DB_PATH)
 
 
-async def save_client(client: Client) -> None:
-    db = await get_db()
-    try:
+# clients.layout values
+LAYOUT_BLOB = 1  # everything in clients.data (pre-normalization rows)
+LAYOUT_NORMALIZED = 2  # lists live in their own tables
+
+_LIST_FIELDS = {"checklist", "flags", "conversation_history"}
+
+_CHECKLIST_COLUMNS = (
+    "item_id, category, item, status, notes, required_for, estimated_days, depends_on"
+)
+_FLAG_COLUMNS = "flag_id, field, reason, severity, resolved, resolution_notes"
+
+
+def _checklist_row(item: ChecklistItem) -> tuple[Any, ...]:
+    return (
+        item.id,
+        item.category,
+        item.item,
+        item.status,
+        item.notes,
+        item.required_for,
+        item.estimated_days,
+        json.dumps(item.depends_on),
+    )
+
+
+def _flag_row(flag: FlaggedItem) -> tuple[Any, ...]:
+    return (
+        flag.id,
+        flag.field,
+        flag.reason,
+        flag.severity,
+        1 if flag.resolved else 0,
+        flag.resolution_notes,
+    )
+
+
+async def _sync_rows(
+    db: aiosqlite.Connection,
+    table: str,
+    columns: str,
+    client_id: str,
+    rows: list[tuple[Any, ...]],
+) -> None:
+    """Write only the positions of ``table`` whose contents changed."""
+    cursor = await db.execute(
+        f"SELECT position, {columns} FROM {table} WHERE client_id = ?", (client_id,)
+    )
+    stored = {r[0]: tuple(r[1:]) for r in await cursor.fetchall()}
+    changed = [
+        (client_id, position, *row)
+        for position, row in enumerate(rows)
+        if stored.get(position) != row
+    ]
+    if changed:
+        placeholders = ", ".join("?" for _ in changed[0])
+        await db.executemany(
+            f"INSERT OR REPLACE INTO {table} (client_id, position, {columns})"
+            f" VALUES ({placeholders})",
+            changed,
+        )
+    if len(stored) > len(rows):
         await db.execute(
-            "INSERT OR REPLACE INTO clients (id, data) VALUES (?, ?)",
-            (client.id, client.model_dump_json()),
+            f"DELETE FROM {table} WHERE client_id = ? AND position >= ?",
+            (client_id, len(rows)),
         )
+
+
+async def _sync_history(
+    db: aiosqlite.Connection, client_id: str, history: list[dict[str, str]]
+) -> None:
+    """Append new onboarding messages; rewrite only if history was edited."""
+    cursor = await db.execute(
+        "SELECT seq, role, content FROM onboarding_messages"
+        " WHERE client_id = ? ORDER BY seq DESC LIMIT 1",
+        (client_id,),
+    )
+    last = await cursor.fetchone()
+    start = 0 if last is None else last[0] + 1
+    appended = start <= len(history) and (
+        last is None
+        or (
+            history[last[0]].get("role") == last[1]
+            and history[last[0]].get("content") == last[2]
+        )
+    )
+    if not appended:
+        await db.execute(
+            "DELETE FROM onboarding_messages WHERE client_id = ?", (client_id,)
+        )
+        start = 0
+    if start < len(history):
+        await db.executemany(
+            "INSERT INTO onboarding_messages (client_id, seq, role, content)"
+            " VALUES (?, ?, ?, ?)",
+            [
+                (client_id, seq, m.get("role", ""), m.get("content", ""))
+                for seq, m in enumerate(history[start:], start)
+            ],
+        )
+
+
+async def _write_client(db: aiosqlite.Connection, client: Client) -> None:
+    """Write ``client``'s list fields, touching only rows that changed."""
+    await _sync_rows(
+        db,
+        "client_checklist_items",
+        _CHECKLIST_COLUMNS,
+        client.id,
+        [_checklist_row(item) for item in client.checklist],
+    )
+    await _sync_rows(
+        db,
+        "client_flags",
+        _FLAG_COLUMNS,
+        client.id,
+        [_flag_row(flag) for flag in client.flags],
+    )
+    await _sync_history(db, client.id, client.conversation_history)
+
+
+def _client_columns(client: Client) -> dict[str, Any]:
+    """Values for the ``clients`` row: profile blob plus list-view summary."""
+    return {
+        "data": client.model_dump_json(exclude={"version", *_LIST_FIELDS}),
+        "layout": LAYOUT_NORMALIZED,
+        "company_name": client.company_name,
+        "status": client.status,
+        "pathway": client.pathway,
+        "finma_license_type": client.finma_license_type,
+        "contact_name": client.contact_name,
+        "contact_email": client.contact_email,
+        "current_stage_index": client.current_stage_index,
+        "created_at": client.created_at.isoformat(),
+        "updated_at": client.updated_at.isoformat(),
+        "completed_items": sum(1 for i in client.checklist if i.status == "complete"),
+        "total_items": len(client.checklist),
+    }
+
+
+async def save_client(client: Client, *, check_version: bool = False) -> None:
+    """Persist ``client`` and bump its version.
+
+    Only the profile row and the checklist items, flags and messages that
+    changed are written. With ``check_version`` the write only succeeds if
+    the stored row is still at ``client.version``; otherwise
+    ``ClientVersionConflictError`` is raised.
+    """
+    columns = _client_columns(client)
+    names = ", ".join(columns)
+    async with db_writer() as db:
+        if check_version:
+            assignments = ", ".join(f"{c} = ?" for c in columns)
+            cursor = await db.execute(
+                f"""UPDATE clients SET {assignments}, version = version + 1
+                    WHERE id = ? AND version = ?
+                    RETURNING version""",
+                (*columns.values(), client.id, client.version),
+            )
+        else:
+            placeholders = ", ".join("?" for _ in columns)
+            upserts = ", ".join(f"{c} = excluded.{c}" for c in columns)
+            cursor = await db.execute(
+                f"""INSERT INTO clients (id, {names}) VALUES (?, {placeholders})
+                    ON CONFLICT(id) DO UPDATE
+                    SET {upserts}, version = clients.version + 1
+                    RETURNING version""",
+                (client.id, *columns.values()),
+            )
+        row = await cursor.fetchone()
+        if row is None:
+            raise ClientVersionConflictError(client.id, client.version)
+        await _write_client(db, client)
         await db.commit()
-    finally:
-        await db.close()
+    client.version = row[0]
+
+
+async def _load_clients(
+    db: aiosqlite.Connection,
+    rows: Sequence[aiosqlite.Row],
+    include_history: bool = True,
+) -> list[Client]:
+    """Build ``Client`` models from ``clients`` rows plus their list tables."""
+    ids = [r["id"] for r in rows if r["layout"] == LAYOUT_NORMALIZED]
+    lists: dict[str, dict[str, list[Any]]] = {
+        client_id: {field: [] for field in _LIST_FIELDS} for client_id in ids
+    }
+    if ids:
+        placeholders = ", ".join("?" for _ in ids)
+        cursor = await db.execute(
+            f"SELECT client_id, {_CHECKLIST_COLUMNS} FROM client_checklist_items"
+            f" WHERE client_id IN ({placeholders}) ORDER BY client_id, position",
+            ids,
+        )
+        for r in await cursor.fetchall():
+            lists[r["client_id"]]["checklist"].append(
+                {
+                    "id": r["item_id"],
+                    "category": r["category"],
+                    "item": r["item"],
+                    "status": r["status"],
+                    "notes": r["notes"],
+                    "required_for": r["required_for"],
+                    "estimated_days": r["estimated_days"],
+                    "depends_on": json.loads(r["depends_on"]),
+                }
+            )
+        cursor = await db.execute(
+            f"SELECT client_id, {_FLAG_COLUMNS} FROM client_flags"
+            f" WHERE client_id IN ({placeholders}) ORDER BY client_id, position",
+            ids,
+        )
+        for r in await cursor.fetchall():
+            lists[r["client_id"]]["flags"].append(
+                {
+                    "id": r["flag_id"],
+                    "field": r["field"],
+                    "reason": r["reason"],
+                    "severity": r["severity"],
+                    "resolved": bool(r["resolved"]),
+                    "resolution_notes": r["resolution_notes"],
+                }
+            )
+        if include_history:
+            cursor = await db.execute(
+                "SELECT client_id, role, content FROM onboarding_messages"
+                f" WHERE client_id IN ({placeholders}) ORDER BY client_id, seq",
+                ids,
+            )
+            for r in await cursor.fetchall():
+                lists[r["client_id"]]["conversation_history"].append(
+                    {"role": r["role"], "content": r["content"]}
+                )
 
+    clients: list[Client] = []
+    for row in rows:
+        try:
+            data = json.loads(row["data"])
+            data.update(lists.get(row["id"], {}))
+            if not include_history:
+                data["conversation_history"] = []
+            client = Client.model_validate(data)
+        except Exception:
+            logger.warning("Skipping malformed client row: %s", row["data"][:80])
+            continue
+        client.version = row["version"]
+        clients.append(client)
+    return clients
 
-async def get_client(client_id: str) -> Client | None:
-    db = await get_db()
-    try:
-        cursor = await db.execute("SELECT data FROM clients WHERE id = ?", (client_id,))
+
+async def get_client(client_id: str, *, include_history: bool = True) -> Client | None:
+    """Load a client.
+
+    ``include_history=False`` skips the onboarding transcript; such a client
+    is for reading only and must not be passed to ``save_client``.
+    """
+    async with db_reader() as db:
+        cursor = await db.execute(
+            "SELECT id, data, version, layout FROM clients WHERE id = ?",
+            (client_id,),
+        )
         row = await cursor.fetchone()
         if row is None:
             return None
-        return Client.model_validate_json(row[0])
-    finally:
-        await db.close()
+        clients = await _load_clients(db, [row], include_history)
+        return clients[0] if clients else None
 
 
-async def list_clients(skip: int = 0, limit: int = 50) -> tuple[list[Client], int]:
-    db = await get_db()
-    try:
+async def get_clients(
+    client_ids: Sequence[str], *, include_history: bool = True
+) -> list[Client]:
+    """Load several clients in one pass; unknown ids are left out."""
+    if not client_ids:
+        return []
+    placeholders = ", ".join("?" for _ in client_ids)
+    async with db_reader() as db:
         cursor = await db.execute(
-            "SELECT data FROM clients ORDER BY rowid DESC LIMIT ? OFFSET ?",
-            (limit, skip),
+            "SELECT id, data, version, layout FROM clients"
+            f" WHERE id IN ({placeholders})",
+            list(client_ids),
+        )
+        rows = list(await cursor.fetchall())
+        return await _load_clients(db, rows, include_history)
+
+
+async def list_clients(
+    limit: int = 50, cursor: str | None = None
+) -> tuple[list[Client], int, str | None]:
+    """A page of full clients (most recently updated first), the total count
+    and the cursor for the next page."""
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            "SELECT id, data, version, layout, updated_at FROM clients",
+            sort="updated_at",
+            limit=limit,
+            cursor=cursor,
         )
-        rows = await cursor.fetchall()
-        clients: list[Client] = []
-        for row in rows:
-            try:
-                clients.append(Client.model_validate_json(row[0]))
-            except Exception:
-                logger.warning("Skipping malformed client row: %s", row[0][:80])
-        return clients, len(clients)
-    finally:
-        await db.close()
-
-
-async def update_client(client_id: str, updates: dict[str, Any]) -> Client | None:
+        clients = await _load_clients(db, rows)
+        total = await _count(db, "SELECT COUNT(*) FROM clients")
+        return clients, total, next_cursor
+
+
+_SUMMARY_FIELDS = list(ClientSummary.model_fields)
+
+
+async def _count(db: aiosqlite.Connection, sql: str) -> int:
+    cursor = await db.execute(sql)
+    row = await cursor.fetchone()
+    return int(row[0]) if row else 0
+
+
+async def list_client_summaries(
+    limit: int = 50, cursor: str | None = None
+) -> tuple[list[ClientSummary], int, str | None]:
+    """A page of client summaries (most recently updated first), the total
+    count and the cursor for the next page.
+
+    Reads only the summary columns; no client JSON is parsed. Rows whose blob
+    never parsed have no summary and are left out, as ``list_clients`` skips
+    them.
+    """
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            f"SELECT {', '.join(_SUMMARY_FIELDS)} FROM clients",
+            sort="updated_at",
+            where="created_at != ''",
+            limit=limit,
+            cursor=cursor,
+        )
+        total = await _count(db, "SELECT COUNT(*) FROM clients WHERE created_at != ''")
+    return [ClientSummary.model_validate(dict(r)) for r in rows], total, next_cursor
+
+
+async def backfill_normalized(batch_size: int = 50) -> int:
+    """Move list fields of blob-layout rows into their tables.
+
+    Runs in small write transactions so the app keeps serving while it
+    works; reads handle both layouts in the meantime. Returns the number of
+    rows converted.
+    """
+    converted = 0
+    while True:
+        async with db_writer() as db:
+            cursor = await db.execute(
+                "SELECT id, data FROM clients WHERE layout = ? LIMIT ?",
+                (LAYOUT_BLOB, batch_size),
+            )
+            rows = await cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                try:
+                    client = Client.model_validate_json(row["data"])
+                except Exception:
+                    logger.warning("Cannot backfill malformed client %s", row["id"])
+                    # Leave the blob intact but stop retrying it.
+                    await db.execute(
+                        "UPDATE clients SET layout = 0 WHERE id = ?", (row["id"],)
+                    )
+                    continue
+                await _write_client(db, client)
+                columns = _client_columns(client)
+                assignments = ", ".join(f"{c} = ?" for c in columns)
+                await db.execute(
+                    f"UPDATE clients SET {assignments} WHERE id = ?",
+                    (*columns.values(), row["id"]),
+                )
+                converted += 1
+            await db.commit()
+        # Let queued requests use the writer between batches.
+        await asyncio.sleep(0)
+    if converted:
+        logger.info("Backfilled %d clients into normalized tables", converted)
+    return converted
+
+
+async def update_client(
+    client_id: str,
+    updates: dict[str, Any],
+    *,
+    expected_version: int | None = None,
+) -> Client | None:
+    """Apply field ``updates`` with a versioned save.
+
+    Raises ``ClientVersionConflictError`` if the client is not at
+    ``expected_version`` (when given) or changes before the save lands.
+    """
     client = await get_client(client_id)
     if client is None:
         return None
+    if expected_version is not None and client.version != expected_version:
+        raise ClientVersionConflictError(client_id, expected_version)
     data = client.model_dump()
     for key, value in updates.items():
         if key in data:
             data[key] = value
-    from datetime import UTC, datetime
-
     data["updated_at"] = datetime.now(UTC)
     updated = Client.model_validate(data)
-    await save_client(updated)
+    await save_client(updated, check_version=True)
     return updated
 
 
+async def update_checklist_item(
+    client_id: str,
+    item_id: str,
+    status: str,
+    notes: str | None = None,
+    *,
+    expected_version: int | None = None,
+) -> int | None:
+    """Set one checklist item's status (and notes) in place.
+
+    Returns the client's new version, or None if the client does not exist.
+    Raises ``ClientItemNotFoundError`` for an unknown item and
+    ``ClientVersionConflictError`` if ``expected_version`` is stale.
+    """
+
+    def _apply(client: Client) -> bool:
+        for item in client.checklist:
+            if item.id == item_id:
+                item.status = status  # type: ignore[assignment]
+                if notes is not None:
+                    item.notes = notes
+                return True
+        return False
+
+    return await _update_list_row(
+        client_id,
+        expected_version,
+        "UPDATE client_checklist_items SET status = ?, notes = COALESCE(?, notes)"
+        " WHERE client_id = ? AND item_id = ?",
+        (status, notes, client_id, item_id),
+        _apply,
+        ClientItemNotFoundError(client_id, "Checklist item", item_id),
+        recount=True,
+    )
+
+
+async def resolve_flag(
+    client_id: str,
+    flag_id: str,
+    resolution_notes: str | None,
+    *,
+    resolved: bool = True,
+    expected_version: int | None = None,
+) -> int | None:
+    """Mark one flag resolved (or reopen it) in place; see ``update_checklist_item``."""
+
+    def _apply(client: Client) -> bool:
+        for flag in client.flags:
+            if flag.id == flag_id:
+                flag.resolved = resolved
+                flag.resolution_notes = resolution_notes
+                return True
+        return False
+
+    return await _update_list_row(
+        client_id,
+        expected_version,
+        "UPDATE client_flags SET resolved = ?, resolution_notes = ?"
+        " WHERE client_id = ? AND flag_id = ?",
+        (1 if resolved else 0, resolution_notes, client_id, flag_id),
+        _apply,
+        ClientItemNotFoundError(client_id, "Flag", flag_id),
+    )
+
+
+async def _update_list_row(
+    client_id: str,
+    expected_version: int | None,
+    update_sql: str,
+    params: Sequence[Any],
+    apply: Callable[[Client], bool],
+    not_found: ClientItemNotFoundError,
+    *,
+    recount: bool = False,
+) -> int | None:
+    """Update one checklist/flag row and bump the client's version atomically.
+
+    The version bump doubles as the compare-and-swap, so the row update only
+    lands if the client is still at ``expected_version``. Rows not yet moved
+    out of the blob layout fall back to ``apply`` plus a versioned save.
+    """
+    now = datetime.now(UTC)
+    async with db_writer() as db:
+        cursor = await db.execute(
+            """UPDATE clients
+               SET version = version + 1, updated_at = ?,
+                   data = json_set(data, '$.updated_at', ?)
+               WHERE id = ? AND layout = ? AND version = COALESCE(?, version)
+               RETURNING version""",
+            (
+                now.isoformat(),
+                now.isoformat(),
+                client_id,
+                LAYOUT_NORMALIZED,
+                expected_version,
+            ),
+        )
+        bumped = await cursor.fetchone()
+        if bumped is not None:
+            cursor = await db.execute(update_sql, params)
+            if cursor.rowcount == 0:
+                raise not_found
+            if recount:
+                await db.execute(
+                    """UPDATE clients SET completed_items = (
+                           SELECT COUNT(*) FROM client_checklist_items
+                           WHERE client_id = ? AND status = 'complete')
+                       WHERE id = ?""",
+                    (client_id, client_id),
+                )
+            await db.commit()
+            return int(bumped[0])
+        cursor = await db.execute(
+            "SELECT version, layout FROM clients WHERE id = ?", (client_id,)
+        )
+        current = await cursor.fetchone()
+
+    if current is None:
+        return None
+    if expected_version is not None and current["version"] != expected_version:
+        raise ClientVersionConflictError(client_id, expected_version)
+    client = await get_client(client_id)
+    if client is None:
+        return None
+    if expected_version is not None and client.version != expected_version:
+        raise ClientVersionConflictError(client_id, expected_version)
+    if not apply(client):
+        raise not_found
+    client.updated_at = now
+    await save_client(client, check_version=True)
+    return client.version
+
+
 DEMO_CLIENT_ID = "thomas-muller"
 
 
@@ -134,10 +638,14 @@ async def seed_demo_client() -> None:
 
 
 async def delete_client(client_id: str) -> bool:
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         cursor = await db.execute("DELETE FROM clients WHERE id = ?", (client_id,))
+        for table in (
+            "client_checklist_items",
+            "client_flags",
+            "onboarding_messages",
+            "gap_analyses",
+        ):
+            await db.execute(f"DELETE FROM {table} WHERE client_id = ?", (client_id,))
         await db.commit()
         return cursor.rowcount > 0
-    finally:
-        await db.close()
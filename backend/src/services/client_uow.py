@@ -0,0 +1,138 @@
+"""Turn-scoped unit of work for agent client mutations.
+
+Agent tools used to load and save the whole client document once per
+mutation. A ``ClientUnitOfWork`` loads each client once per turn, applies
+mutations to the in-memory copy and writes every changed client back in a
+single versioned save when the turn ends. If another writer saved the client
+in the meantime, the fresh row is reloaded and the turn's mutations are
+replayed on top of it before retrying.
+"""
+
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from typing import TypeVar
+
+from src.models.client import Client
+from src.services import client_store
+from src.services.client_store import ClientVersionConflictError
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Mutation = Callable[[Client], object]
+
+MAX_FLUSH_ATTEMPTS = 3
+
+
+class ClientUnitOfWork:
+    """Identity map plus pending mutations for the clients touched in a turn."""
+
+    def __init__(self) -> None:
+        self._clients: dict[str, Client] = {}
+        self._pending: dict[str, list[Mutation]] = {}
+
+    def attach(self, client: Client) -> None:
+        """Track a client the caller already loaded."""
+        self._clients.setdefault(client.id, client)
+
+    async def get(self, client_id: str, *, fresh: bool = False) -> Client | None:
+        """Return the turn's copy of a client, loading it on first use.
+
+        ``fresh`` writes any pending changes and reloads from the database,
+        for reads that must see other writers' updates.
+        """
+        if fresh:
+            await self.flush(client_id)
+            self._clients.pop(client_id, None)
+        client = self._clients.get(client_id)
+        if client is None:
+            client = await client_store.get_client(client_id)
+            if client is not None:
+                self._clients[client_id] = client
+        return client
+
+    async def mutate(self, client_id: str, change: Callable[[Client], T]) -> T | None:
+        """Apply ``change`` in memory and queue it for the next flush.
+
+        ``change`` must be deterministic given the client, since it is replayed
+        on a fresh copy if the flush hits a version conflict. Returns its
+        result, or None if the client does not exist.
+        """
+        client = await self.get(client_id)
+        if client is None:
+            return None
+        result = change(client)
+        client.updated_at = datetime.now(UTC)
+        self._pending.setdefault(client_id, []).append(change)
+        return result
+
+    async def write_through(
+        self,
+        client_id: str,
+        write: Callable[[], Awaitable[int | None]],
+        change: Callable[[Client], object],
+    ) -> bool:
+        """Run an in-place store write now and mirror it on the turn's copy.
+
+        ``write`` performs the single-row update and returns the client's new
+        version (None if the client is gone); ``change`` applies the same edit
+        in memory. Pending changes for the client are flushed first so they
+        cannot later overwrite the write.
+        """
+        await self.flush(client_id)
+        version = await write()
+        if version is None:
+            self._clients.pop(client_id, None)
+            return False
+        client = self._clients.get(client_id)
+        if client is not None:
+            change(client)
+            client.version = version
+        return True
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self._pending)
+
+    async def flush(self, client_id: str | None = None) -> None:
+        """Write pending changes (for one client, or all) with version checks."""
+        ids = [client_id] if client_id is not None else list(self._pending)
+        for cid in ids:
+            changes = self._pending.pop(cid, None)
+            if changes:
+                await self._save(cid, changes)
+
+    async def flush_quietly(self) -> None:
+        """Flush, logging instead of raising; for cleanup paths."""
+        if not self.dirty:
+            return
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Failed to save client changes")
+
+    async def _save(self, client_id: str, changes: list[Mutation]) -> None:
+        client = self._clients[client_id]
+        for attempt in range(1, MAX_FLUSH_ATTEMPTS + 1):
+            try:
+                await client_store.save_client(client, check_version=True)
+                return
+            except ClientVersionConflictError:
+                if attempt == MAX_FLUSH_ATTEMPTS:
+                    raise
+                logger.info(
+                    "Client %s changed during the turn; replaying %d changes",
+                    client_id,
+                    len(changes),
+                )
+            latest = await client_store.get_client(client_id)
+            if latest is None:
+                logger.warning("Client %s was deleted; dropping changes", client_id)
+                self._clients.pop(client_id, None)
+                return
+            for change in changes:
+                change(latest)
+            latest.updated_at = datetime.now(UTC)
+            self._clients[client_id] = client = latest
@@ -3,16 +3,17 @@
 import json
 import logging
 from collections.abc import AsyncIterator
-from datetime import UTC, datetime
 from typing import Any
 
 import anthropic
 
 from src.models.client import Client, FlaggedItem
-from src.services import client_store, document_store, rag_service
+from src.services import client_store, document_store, history_manager, rag_service
 from src.services.agent_tool_loop import run_tool_loop
-from src.services.claude_agent import _sanitize_field_value
+from src.services.claude_agent import _flush_changes, _sanitize_field_value
+from src.services.client_uow import ClientUnitOfWork
 from src.services.gap_analyzer import analyze_gaps
+from src.services.tool_memo import TurnMemo
 
 logger = logging.getLogger(__name__)
 
@@ -90,7 +91,9 @@ TOOLS: list[anthropic.types.ToolParam] = [
         "description": (
             "Run a comprehensive gap analysis on a"
             " client. Returns readiness score, gaps"
-            " by category, next steps, and blockers."
+            " by category, next steps, blockers, and a"
+            " checklist timeline (earliest completion"
+            " date and the critical path delaying it)."
         ),
         "input_schema": {
             "type": "object",
@@ -239,9 +242,20 @@ TOOLS: list[anthropic.types.ToolParam] = [
     },
 ]
 
+# Tools that change client state; the rest may run concurrently.
+MUTATING_TOOLS = frozenset(
+    {"update_client_field", "update_checklist_item", "flag_item", "resolve_flag"}
+)
 
-async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
-    """Execute a tool call and return result string."""
+
+async def _execute_tool(
+    uow: ClientUnitOfWork, tool_name: str, tool_input: dict[str, Any]
+) -> str:
+    """Execute a tool call and return result string.
+
+    Client reads and writes go through ``uow``; writes are persisted when the
+    caller flushes it at the end of the turn.
+    """
     if tool_name == "search_knowledge_base":
         try:
             results = await rag_service.search(tool_input["query"], top_k=5)
@@ -261,7 +275,7 @@ async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
 
     if tool_name == "get_client":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
+            client = await uow.get(tool_input["client_id"])
             if client is None:
                 return f"Client {tool_input['client_id']} not found."
             return client.model_dump_json(indent=2)
@@ -271,7 +285,7 @@ async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
 
     if tool_name == "analyze_gaps":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
+            client = await uow.get(tool_input["client_id"])
             if client is None:
                 return f"Client {tool_input['client_id']} not found."
             analysis = analyze_gaps(client)
@@ -282,51 +296,59 @@ async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
 
     if tool_name == "update_client_field":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
-            if client is None:
-                return f"Client {tool_input['client_id']} not found."
-            data = client.model_dump()
             field = tool_input["field"]
             value = _sanitize_field_value(field, tool_input["value"])
-            if field in data:
+            if field not in Client.model_fields or field == "version":
+                return f"Unknown field: {field}"
+
+            def _set_field(client: Client) -> str:
+                data = client.model_dump()
                 data[field] = value
-                data["updated_at"] = datetime.now(UTC)
-                updated = Client.model_validate(data)
-                await client_store.save_client(updated)
+                setattr(client, field, getattr(Client.model_validate(data), field))
                 return f"Updated {field} successfully."
-            return f"Unknown field: {field}"
+
+            result = await uow.mutate(tool_input["client_id"], _set_field)
+            return result or f"Client {tool_input['client_id']} not found."
         except Exception as exc:
             logger.warning("update_client_field failed: %s", exc)
             return f"Failed to update {tool_input.get('field', '?')}: {exc}"
 
     if tool_name == "update_checklist_item":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
+            client = await uow.get(tool_input["client_id"])
             if client is None:
                 return f"Client {tool_input['client_id']} not found."
+            item_id = tool_input["item_id"]
             status = _sanitize_field_value("checklist_status", tool_input["status"])
-            for item in client.checklist:
-                if item.id == tool_input["item_id"]:
-                    item.status = status
-                    if "notes" in tool_input:
-                        item.notes = tool_input["notes"]
-                    client.updated_at = datetime.now(UTC)
-                    await client_store.save_client(client)
-                    return (
-                        f"Updated checklist item"
-                        f" {item.id}: {item.item}"
-                        f" → {status}"
-                    )
-            return f"Checklist item {tool_input['item_id']} not found."
+            item = next((i for i in client.checklist if i.id == item_id), None)
+            if item is None:
+                return f"Checklist item {item_id} not found."
+            notes = tool_input.get("notes")
+
+            def _set_status(client: Client) -> None:
+                for entry in client.checklist:
+                    if entry.id == item_id:
+                        entry.status = status
+                        if notes is not None:
+                            entry.notes = notes
+
+            client_id = client.id
+            written = await uow.write_through(
+                client_id,
+                lambda: client_store.update_checklist_item(
+                    client_id, item_id, status, notes
+                ),
+                _set_status,
+            )
+            if not written:
+                return f"Client {client_id} not found."
+            return f"Updated checklist item {item.id}: {item.item} → {status}"
         except Exception as exc:
             logger.warning("update_checklist_item failed: %s", exc)
             return f"Failed to update checklist item: {exc}"
 
     if tool_name == "flag_item":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
-            if client is None:
-                return f"Client {tool_input['client_id']} not found."
             import uuid
 
             severity = _sanitize_field_value("severity", tool_input["severity"])
@@ -336,27 +358,42 @@ async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
                 reason=tool_input["reason"],
                 severity=severity,
             )
-            client.flags.append(flag)
-            client.updated_at = datetime.now(UTC)
-            await client_store.save_client(client)
-            return f"Flag added: {tool_input['field']} ({severity})"
+
+            def _add_flag(client: Client) -> str:
+                client.flags.append(flag.model_copy())
+                return f"Flag added: {tool_input['field']} ({severity})"
+
+            result = await uow.mutate(tool_input["client_id"], _add_flag)
+            return result or f"Client {tool_input['client_id']} not found."
         except Exception as exc:
             logger.warning("flag_item failed: %s", exc)
             return f"Failed to flag item: {exc}"
 
     if tool_name == "resolve_flag":
         try:
-            client = await client_store.get_client(tool_input["client_id"])
+            client = await uow.get(tool_input["client_id"])
             if client is None:
                 return f"Client {tool_input['client_id']} not found."
-            for flag in client.flags:
-                if flag.id == tool_input["flag_id"]:
-                    flag.resolved = True
-                    flag.resolution_notes = tool_input["resolution_notes"]
-                    client.updated_at = datetime.now(UTC)
-                    await client_store.save_client(client)
-                    return f"Flag {flag.id} resolved: {tool_input['resolution_notes']}"
-            return f"Flag {tool_input['flag_id']} not found."
+            flag_id = tool_input["flag_id"]
+            notes = tool_input["resolution_notes"]
+            if not any(flag.id == flag_id for flag in client.flags):
+                return f"Flag {flag_id} not found."
+
+            def _resolve(client: Client) -> None:
+                for flag in client.flags:
+                    if flag.id == flag_id:
+                        flag.resolved = True
+                        flag.resolution_notes = notes
+
+            client_id = client.id
+            written = await uow.write_through(
+                client_id,
+                lambda: client_store.resolve_flag(client_id, flag_id, notes),
+                _resolve,
+            )
+            if not written:
+                return f"Client {client_id} not found."
+            return f"Flag {flag_id} resolved: {notes}"
         except Exception as exc:
             logger.warning("resolve_flag failed: %s", exc)
             return f"Failed to resolve flag: {exc}"
@@ -386,12 +423,12 @@ async def _execute_tool(tool_name: str, tool_input: dict[str, Any]) -> str:
             )
             if doc is None:
                 return f"Document {tool_input['document_id']} not found."
-            from pathlib import Path
-
-            file_path = Path(doc.file_path)
-            if not file_path.exists():
+            doc_text = await document_store.get_document_text(doc)
+            if doc_text is None:
                 return "Document file not found on disk."
-            text = file_path.read_text(encoding="utf-8")
+            text = doc_text.text
+            if not text:
+                return "No text could be extracted from this document."
             if len(text) > 10000:
                 text = text[:10000] + "\n\n[... truncated — document continues ...]"
             return text
@@ -407,44 +444,76 @@ async def run_consultant_turn(
     conversation_history: list[dict[str, Any]],
     client_id: str | None = None,
     client_context: dict[str, Any] | None = None,
+    api_client: anthropic.AsyncAnthropic | None = None,
+    history_summary: str = "",
+    summarized_messages: int = 0,
 ) -> AsyncIterator[str]:
-    """Run one turn of the consultant conversation. Yields SSE JSON events."""
-    # Build system prompt with optional client context
-    system = SYSTEM_PROMPT
+    """Run one turn of the consultant conversation. Yields SSE JSON events.
+
+    Only the recent part of ``conversation_history`` that fits the model's
+    token budget is replayed; the first ``summarized_messages`` entries are
+    represented by ``history_summary``.
+    """
+    # Per-client context goes after the cached static prompt
+    uow = ClientUnitOfWork()
+    context = ""
     if client_id:
-        client = await client_store.get_client(client_id)
+        client = await uow.get(client_id)
         if client:
-            system += f"\n\n**Current client context (ID: {client_id}):**\n"
-            system += f"- Company: {client.company_name or 'Not set'}\n"
-            system += f"- Status: {client.status}\n"
-            system += f"- Pathway: {client.pathway or 'Undetermined'}\n"
+            context += f"**Current client context (ID: {client_id}):**\n"
+            context += f"- Company: {client.company_name or 'Not set'}\n"
+            context += f"- Status: {client.status}\n"
+            context += f"- Pathway: {client.pathway or 'Undetermined'}\n"
             svc = ", ".join(client.services) if client.services else "Not specified"
-            system += f"- Services: {svc}\n"
+            context += f"- Services: {svc}\n"
             done = sum(1 for i in client.checklist if i.status == "complete")
             total = len(client.checklist)
-            system += f"- Checklist: {done}/{total} complete\n"
+            context += f"- Checklist: {done}/{total} complete\n"
             unresolved = sum(1 for f in client.flags if not f.resolved)
-            system += f"- Flags: {unresolved} unresolved\n"
+            context += f"- Flags: {unresolved} unresolved\n"
     elif client_context:
         # Frontend-provided client context (demo/mock data not in backend DB)
-        system += "\n\n**Current client context (from application):**\n"
-        system += f"- Name: {client_context.get('name', 'Unknown')}\n"
-        system += f"- Company: {client_context.get('company', 'Unknown')}\n"
-        system += f"- License Type: {client_context.get('licenseType', 'Unknown')}\n"
+        context += "**Current client context (from application):**\n"
+        context += f"- Name: {client_context.get('name', 'Unknown')}\n"
+        context += f"- Company: {client_context.get('company', 'Unknown')}\n"
+        context += f"- License Type: {client_context.get('licenseType', 'Unknown')}\n"
         stage_name = client_context.get("currentStageName", "Unknown")
-        system += f"- Current Stage: {stage_name}\n"
+        context += f"- Current Stage: {stage_name}\n"
         doc_summary = client_context.get("documentSummary", "")
         if doc_summary:
-            system += f"- Documents: {doc_summary}\n"
+            context += f"- Documents: {doc_summary}\n"
 
-    messages: list[anthropic.types.MessageParam] = list(conversation_history)  # type: ignore[arg-type]
+    if history_summary:
+        context += "\n\n" + history_manager.summary_context(history_summary)
+
+    messages: list[anthropic.types.MessageParam] = history_manager.build_replay(  # type: ignore[assignment]
+        conversation_history, summarized_messages
+    )
     messages.append({"role": "user", "content": user_message})
 
-    async for event_json in run_tool_loop(
-        messages=messages,
-        system=system,
-        tools=TOOLS,
-        execute_tool=_execute_tool,
-        max_tokens=4096,
-    ):
-        yield event_json
+    async def _exec(tool_name: str, tool_input: dict[str, Any]) -> str:
+        return await _execute_tool(uow, tool_name, tool_input)
+
+    try:
+        async for event_json in run_tool_loop(
+            messages=messages,
+            system=SYSTEM_PROMPT,
+            system_context=context or None,
+            tools=TOOLS,
+            execute_tool=TurnMemo(
+                MUTATING_TOOLS, client_independent_tools={"search_knowledge_base"}
+            ).wrap(_exec),
+            mutating_tools=MUTATING_TOOLS,
+            api_client=api_client,
+            operation="consultant_turn",
+            max_tokens=4096,
+        ):
+            # Persist the turn's client changes before reporting it done, so
+            # a refetch triggered by the done event sees them.
+            if uow.dirty and json.loads(event_json).get("type") == "done":
+                async for error_json in _flush_changes(uow):
+                    yield error_json
+            yield event_json
+    finally:
+        # Turns that end on an error or a client disconnect keep their changes.
+        await uow.flush_quietly()
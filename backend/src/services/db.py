@@ -1,15 +1,315 @@
-"""Shared SQLite database connection helper."""
+"""Shared SQLite connection pool.
 
+The app lifecycle opens one write connection and a few read connections,
+all in WAL mode so readers never wait for the writer. Stores borrow them
+with ``db_reader()`` / ``db_writer()``. The writer is shared, so a
+``db_writer()`` block must not open another ``db_writer()`` block.
+
+Writes are group-committed: each ``db_writer()`` block runs as a savepoint
+inside a transaction shared with the blocks that follow it, and the
+transaction commits once it holds ``db_group_commit_max_ops`` blocks or
+``db_group_commit_window_ms`` after its first one. A block's ``commit()``
+only releases its savepoint; leaving the block waits for the group commit,
+so callers still return only once their write is durable.
+
+When the pool is not open (scripts, tests without the app lifespan) or is
+used from a different event loop, each block gets its own short-lived
+connection, as before pooling.
+"""
+
+import asyncio
+import contextlib
+import sqlite3
+import time
+from collections.abc import AsyncIterator
 from pathlib import Path
+from typing import Any, cast
 
 import aiosqlite
+from fastapi import Request
+
+from src.config import settings
 
 DB_PATH = Path(__file__).parent.parent.parent / "data" / "clients.db"
 
 
 async def get_db() -> aiosqlite.Connection:
-    """Open a connection to the shared SQLite database."""
+    """Open a new connection to the shared SQLite database."""
     DB_PATH.parent.mkdir(parents=True, exist_ok=True)
     db = await aiosqlite.connect(str(DB_PATH))
     db.row_factory = aiosqlite.Row
+    try:
+        await db.executescript(_pragmas())
+    except BaseException:
+        await db.close()
+        raise
     return db
+
+
+def _pragmas() -> str:
+    # journal_mode is persistent; the rest apply per connection.
+    return f"""
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA busy_timeout = {int(settings.db_busy_timeout_ms)};
+        PRAGMA cache_size = -{int(settings.db_cache_size_kib)};
+        PRAGMA mmap_size = {int(settings.db_mmap_size)};
+    """
+
+
+class PoolStats:
+    """Wait-time counters for one kind of pooled connection."""
+
+    def __init__(self) -> None:
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def observe(self, wait_ms: float) -> None:
+        self.acquired += 1
+        if wait_ms >= 1.0:
+            self.waited += 1
+        self.total_wait_ms += wait_ms
+        self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "avg_wait_ms": round(self.total_wait_ms / self.acquired, 3)
+            if self.acquired
+            else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 3),
+        }
+
+
+class _WriteBatch:
+    """An open write transaction shared by consecutive ``writer()`` blocks."""
+
+    def __init__(self) -> None:
+        self.ops = 0
+        self.committed: asyncio.Future[None] = (
+            asyncio.get_running_loop().create_future()
+        )
+        self.flusher: asyncio.Task[None] | None = None
+
+
+class _SavepointConnection:
+    """The write connection as seen by one ``writer()`` block.
+
+    ``commit()`` and ``rollback()`` act on the block's savepoint; everything
+    else goes straight to the connection.
+    """
+
+    def __init__(self, conn: aiosqlite.Connection) -> None:
+        self._conn = conn
+        self.committed = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._conn, name)
+
+    async def commit(self) -> None:
+        await self._conn.execute("RELEASE write_op")
+        await self._conn.execute("SAVEPOINT write_op")
+        self.committed = True
+
+    async def rollback(self) -> None:
+        await self._conn.execute("ROLLBACK TO write_op")
+
+
+class DatabasePool:
+    """One writer connection plus a fixed set of read-only connections."""
+
+    def __init__(self) -> None:
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._writer: aiosqlite.Connection | None = None
+        self._write_lock: asyncio.Lock | None = None
+        self._batch: _WriteBatch | None = None
+        self._readers: asyncio.Queue[aiosqlite.Connection] | None = None
+        self._all_readers: list[aiosqlite.Connection] = []
+        self.read_stats = PoolStats()
+        self.write_stats = PoolStats()
+        self.commits = 0
+        self.committed_ops = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._writer is not None
+
+    async def open(self, readers: int | None = None) -> None:
+        """Open the writer and ``readers`` read-only connections."""
+        if self.is_open:
+            return
+        self._writer = await get_db()
+        self._write_lock = asyncio.Lock()
+        self._readers = asyncio.Queue()
+        for _ in range(max(1, readers or settings.db_read_connections)):
+            conn = await get_db()
+            await conn.execute("PRAGMA query_only = ON")
+            self._all_readers.append(conn)
+            self._readers.put_nowait(conn)
+        self._loop = asyncio.get_running_loop()
+
+    async def close(self) -> None:
+        """Commit any pending writes and close every pooled connection."""
+        if self._write_lock is not None and self._usable():
+            async with self._write_lock:
+                await self._commit_batch()
+        connections = [*self._all_readers]
+        if self._writer is not None:
+            connections.append(self._writer)
+        self._loop = None
+        self._writer = None
+        self._write_lock = None
+        self._readers = None
+        self._all_readers = []
+        for conn in connections:
+            await conn.close()
+
+    def _usable(self) -> bool:
+        return self.is_open and asyncio.get_running_loop() is self._loop
+
+    @contextlib.asynccontextmanager
+    async def reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow a read-only connection."""
+        if not self._usable() or self._readers is None:
+            async with _temporary() as db:
+                yield db
+            return
+        started = time.monotonic()
+        conn = await self._readers.get()
+        self.read_stats.observe((time.monotonic() - started) * 1000)
+        try:
+            yield conn
+        finally:
+            self._readers.put_nowait(conn)
+
+    @contextlib.asynccontextmanager
+    async def writer(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Borrow the write connection; uncommitted work is rolled back."""
+        if not self._usable() or self._writer is None or self._write_lock is None:
+            async with _temporary() as db:
+                yield db
+            return
+        started = time.monotonic()
+        async with self._write_lock:
+            self.write_stats.observe((time.monotonic() - started) * 1000)
+            conn = self._writer
+            if self._batch is None:
+                await conn.execute("BEGIN IMMEDIATE")
+                self._batch = _WriteBatch()
+            batch = self._batch
+            await conn.execute("SAVEPOINT write_op")
+            op = _SavepointConnection(conn)
+            try:
+                # Duck-typed stand-in: same API, savepoint-scoped commits.
+                yield cast(aiosqlite.Connection, op)
+            finally:
+                try:
+                    await conn.execute("ROLLBACK TO write_op")
+                    await conn.execute("RELEASE write_op")
+                except BaseException:
+                    await self._abort_batch()
+                    raise
+                # Also on error: the batch must not stay open with nothing
+                # left to commit or roll it back.
+                await self._settle(batch, op.committed)
+        if op.committed:
+            # Shielded: a cancelled caller must not cancel everyone's commit.
+            await asyncio.shield(batch.committed)
+
+    async def _settle(self, batch: _WriteBatch, committed: bool) -> None:
+        """Add a finished block to ``batch`` (write lock held); commit it,
+        schedule its commit, or end it if it holds nothing."""
+        if committed:
+            batch.ops += 1
+            if batch.ops >= settings.db_group_commit_max_ops or (
+                settings.db_group_commit_window_ms <= 0
+            ):
+                await self._commit_batch()
+            elif batch.flusher is None:
+                batch.flusher = asyncio.create_task(
+                    self._flush_later(batch), name="db-group-commit"
+                )
+        elif batch.ops == 0 and self._batch is batch:
+            # Nothing to commit; don't hold the database write lock.
+            self._batch = None
+            if self._writer is not None:
+                await self._writer.rollback()
+
+    async def _flush_later(self, batch: _WriteBatch) -> None:
+        await asyncio.sleep(settings.db_group_commit_window_ms / 1000)
+        if self._write_lock is None:
+            return
+        async with self._write_lock:
+            if self._batch is batch:
+                await self._commit_batch()
+
+    async def _commit_batch(self) -> None:
+        """Commit the open batch (write lock held) and wake its writers."""
+        batch, self._batch = self._batch, None
+        if batch is None or self._writer is None:
+            return
+        if batch.flusher is not None and batch.flusher is not asyncio.current_task():
+            batch.flusher.cancel()
+        try:
+            await self._writer.commit()
+        except Exception as exc:
+            with contextlib.suppress(Exception):
+                await self._writer.rollback()
+            batch.committed.set_exception(exc)
+            return
+        self.commits += 1
+        self.committed_ops += batch.ops
+        batch.committed.set_result(None)
+
+    async def _abort_batch(self) -> None:
+        """Roll back the open batch after the connection misbehaved."""
+        batch, self._batch = self._batch, None
+        if self._writer is not None:
+            with contextlib.suppress(Exception):
+                await self._writer.rollback()
+        if batch is not None:
+            if batch.flusher is not None:
+                batch.flusher.cancel()
+            batch.committed.set_exception(
+                sqlite3.OperationalError("write batch was rolled back")
+            )
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        return {
+            "read": self.read_stats.as_dict(),
+            "write": self.write_stats.as_dict(),
+            "group_commit": {
+                "commits": self.commits,
+                "ops": self.committed_ops,
+                "avg_ops_per_commit": round(self.committed_ops / self.commits, 2)
+                if self.commits
+                else 0.0,
+            },
+        }
+
+
+@contextlib.asynccontextmanager
+async def _temporary() -> AsyncIterator[aiosqlite.Connection]:
+    db = await get_db()
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+# --- Module-level default pool (opened by the app lifespan) ---
+_default_pool = DatabasePool()
+
+db_reader = _default_pool.reader
+db_writer = _default_pool.writer
+
+
+def get_db_pool(request: Request) -> DatabasePool:
+    """FastAPI dependency that returns the DatabasePool from app state."""
+    pool: DatabasePool | None = getattr(request.app.state, "db_pool", None)
+    if pool is None:
+        return _default_pool
+    return pool
@@ -4,7 +4,7 @@ import logging
 from pathlib import Path
 
 from src.models.client import ClientDocument
-from src.services import document_store, rag_service
+from src.services import document_store, document_text_store, rag_service
 
 logger = logging.getLogger(__name__)
 
@@ -30,15 +30,7 @@ def _parse_file(path: Path) -> str:
 
 def _parse_pdf(path: Path) -> str:
     """Extract text from a PDF file using pypdf."""
-    from pypdf import PdfReader
-
-    reader = PdfReader(path)
-    pages: list[str] = []
-    for page in reader.pages:
-        text = page.extract_text()
-        if text:
-            pages.append(text.strip())
-    return "\n\n".join(pages)
+    return "\n\n".join(p for p in document_text_store.pdf_pages(path) if p)
 
 
 async def ingest_file(
@@ -83,15 +75,21 @@ async def seed_regulatory_docs() -> None:
 
 
 async def ingest_client_document(doc: ClientDocument) -> int:
-    """Ingest an uploaded client document into the knowledge base."""
-    path = Path(doc.file_path)
-    if not path.exists():
+    """Ingest an uploaded client document into the knowledge base.
+
+    Any chunks previously indexed for the same client/document slot are
+    replaced, so re-running the ingestion is safe.
+    """
+    doc_text = await document_store.get_document_text(doc)
+    if doc_text is None:
         logger.warning("File not found for client doc: %s", doc.file_path)
         return 0
-    text = _parse_file(path)
+    text = doc_text.text
     doc_id = f"client-{doc.client_id}-{doc.document_id}"
     title = doc.document_id.replace("-", " ").title()
     source = f"client:{doc.client_id}/{doc.file_name}"
+    # Replace chunks from a previous upload (or a retried attempt) for this slot
+    await rag_service.delete_document(doc_id)
     return await rag_service.ingest_document(
         text, doc_id, title, source, client_id=doc.client_id
     )
@@ -1,12 +1,18 @@
 """File storage and SQLite CRUD for client document uploads."""
 
+import asyncio
+import hashlib
 import uuid
 from pathlib import Path
 
 import aiosqlite
+from fastapi import UploadFile
 
-from src.models.client import ClientDocument
-from src.services.db import get_db
+from src.models.client import ClientDocument, DocumentText
+from src.services import document_text_store
+from src.services.db import db_reader, db_writer
+from src.services.keyset import fetch_page
+from src.services.uploads import stream_to_file
 
 UPLOAD_DIR = Path(__file__).parent.parent.parent / "data" / "client_uploads"
 
@@ -18,14 +24,13 @@ def _upload_path(client_id: str, filename: str) -> Path:
 
 
 async def save_document(doc: ClientDocument) -> None:
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         await db.execute(
             """INSERT OR REPLACE INTO client_documents
                (id, client_id, document_id, file_name, file_path,
                 content_type, file_size, status, verification_result,
-                uploaded_at, verified_at)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                uploaded_at, verified_at, content_hash, verified_hash)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 doc.id,
                 doc.client_id,
@@ -38,16 +43,15 @@ async def save_document(doc: ClientDocument) -> None:
                 doc.verification_result,
                 doc.uploaded_at.isoformat(),
                 doc.verified_at.isoformat() if doc.verified_at else None,
+                doc.content_hash,
+                doc.verified_hash,
             ),
         )
         await db.commit()
-    finally:
-        await db.close()
 
 
 async def get_document(client_id: str, document_id: str) -> ClientDocument | None:
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM client_documents WHERE client_id = ? AND document_id = ?",
             (client_id, document_id),
@@ -56,13 +60,10 @@ async def get_document(client_id: str, document_id: str) -> ClientDocument | Non
         if row is None:
             return None
         return _row_to_doc(row)
-    finally:
-        await db.close()
 
 
 async def get_document_by_id(doc_id: str) -> ClientDocument | None:
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM client_documents WHERE id = ?", (doc_id,)
         )
@@ -70,13 +71,10 @@ async def get_document_by_id(doc_id: str) -> ClientDocument | None:
         if row is None:
             return None
         return _row_to_doc(row)
-    finally:
-        await db.close()
 
 
 async def list_documents(client_id: str) -> list[ClientDocument]:
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM client_documents WHERE client_id = ?"
             " ORDER BY uploaded_at DESC",
@@ -84,19 +82,52 @@ async def list_documents(client_id: str) -> list[ClientDocument]:
         )
         rows = await cursor.fetchall()
         return [_row_to_doc(r) for r in rows]
-    finally:
-        await db.close()
+
+
+async def list_documents_page(
+    client_id: str, limit: int = 50, cursor: str | None = None
+) -> tuple[list[ClientDocument], int, str | None]:
+    """A page of a client's documents (newest upload first), the total count
+    and the cursor for the next page."""
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            "SELECT * FROM client_documents",
+            sort="uploaded_at",
+            where="client_id = ?",
+            params=(client_id,),
+            limit=limit,
+            cursor=cursor,
+        )
+        count = await db.execute(
+            "SELECT COUNT(*) FROM client_documents WHERE client_id = ?", (client_id,)
+        )
+        total = await count.fetchone()
+    return [_row_to_doc(r) for r in rows], total[0] if total else 0, next_cursor
+
+
+async def list_documents_needing_verification(client_id: str) -> list[ClientDocument]:
+    """Return documents that are pending, errored, or changed since verified."""
+    async with db_reader() as db:
+        cursor = await db.execute(
+            """SELECT * FROM client_documents
+               WHERE client_id = ?
+                 AND (status IN ('pending', 'error')
+                      OR (verified_hash IS NOT NULL
+                          AND verified_hash != content_hash))
+               ORDER BY uploaded_at DESC""",
+            (client_id,),
+        )
+        rows = await cursor.fetchall()
+        return [_row_to_doc(r) for r in rows]
 
 
 async def list_all_client_ids() -> list[str]:
     """Return all distinct client IDs that have uploaded documents."""
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute("SELECT DISTINCT client_id FROM client_documents")
         rows = await cursor.fetchall()
         return [row[0] for row in rows]
-    finally:
-        await db.close()
 
 
 async def delete_document(client_id: str, document_id: str) -> bool:
@@ -107,16 +138,13 @@ async def delete_document(client_id: str, document_id: str) -> bool:
     file_path = Path(doc.file_path)
     if file_path.exists():
         file_path.unlink(missing_ok=True)
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         cursor = await db.execute(
             "DELETE FROM client_documents WHERE client_id = ? AND document_id = ?",
             (client_id, document_id),
         )
         await db.commit()
         return cursor.rowcount > 0
-    finally:
-        await db.close()
 
 
 async def update_status(
@@ -125,32 +153,78 @@ async def update_status(
     status: str,
     verification_result: str | None = None,
     verified_at: str | None = None,
+    verified_hash: str | None = None,
 ) -> ClientDocument | None:
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         await db.execute(
             """UPDATE client_documents
-               SET status = ?, verification_result = ?, verified_at = ?
+               SET status = ?, verification_result = ?, verified_at = ?,
+                   verified_hash = COALESCE(?, verified_hash)
                WHERE client_id = ? AND document_id = ?""",
-            (status, verification_result, verified_at, client_id, document_id),
+            (
+                status,
+                verification_result,
+                verified_at,
+                verified_hash,
+                client_id,
+                document_id,
+            ),
         )
         await db.commit()
-    finally:
-        await db.close()
     return await get_document(client_id, document_id)
 
 
 async def store_file(
     client_id: str, document_id: str, file_name: str, content: bytes, content_type: str
 ) -> ClientDocument:
-    """Store an uploaded file and create a DB record."""
-    # Remove any previous upload for this slot
-    await delete_document(client_id, document_id)
-
+    """Store in-memory file content and create a DB record."""
     dest = _upload_path(client_id, file_name)
     dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_bytes(content)
+    await asyncio.to_thread(dest.write_bytes, content)
+    digest = hashlib.sha256(content).hexdigest()
+    return await _register_upload(
+        client_id, document_id, file_name, dest, content_type, len(content), digest
+    )
 
+
+async def store_upload(
+    client_id: str,
+    document_id: str,
+    upload: UploadFile,
+    content_type: str,
+    max_bytes: int,
+) -> ClientDocument:
+    """Stream an upload straight to its final location and create a DB record.
+
+    Raises:
+        FileTooLargeError: If the upload exceeds ``max_bytes``. Any previous
+            upload for the slot is left untouched.
+    """
+    file_name = upload.filename or "upload"
+    streamed = await stream_to_file(
+        upload, _upload_path(client_id, file_name), max_bytes
+    )
+    return await _register_upload(
+        client_id,
+        document_id,
+        file_name,
+        streamed.path,
+        content_type,
+        streamed.size,
+        streamed.sha256,
+    )
+
+
+async def _register_upload(
+    client_id: str,
+    document_id: str,
+    file_name: str,
+    dest: Path,
+    content_type: str,
+    file_size: int,
+    digest: str,
+) -> ClientDocument:
+    previous = await get_document(client_id, document_id)
     doc = ClientDocument(
         id=uuid.uuid4().hex[:16],
         client_id=client_id,
@@ -158,12 +232,62 @@ async def store_file(
         file_name=file_name,
         file_path=str(dest),
         content_type=content_type,
-        file_size=len(content),
+        file_size=file_size,
+        content_hash=digest,
     )
-    await save_document(doc)
+    try:
+        # Extract once at upload; every consumer reads the cached text
+        await document_text_store.extract_and_cache(dest, content_type, digest)
+        # Replaces the slot's previous row (unique on client and document id)
+        await save_document(doc)
+    except BaseException:
+        dest.unlink(missing_ok=True)
+        raise
+
+    # Only now that the new upload is registered, remove the previous file
+    if previous is not None and Path(previous.file_path) != dest:
+        Path(previous.file_path).unlink(missing_ok=True)
     return doc
 
 
+async def get_document_text(doc: ClientDocument) -> DocumentText | None:
+    """Return the extracted text of an upload from the text cache.
+
+    Uploads stored before the cache existed are hashed and extracted on first
+    access, and their content hash is backfilled.
+    """
+    file_path = Path(doc.file_path)
+    if doc.content_hash:
+        cached = await document_text_store.get_text(
+            doc.content_hash,
+            suffix=file_path.suffix.lower(),
+            content_type=doc.content_type,
+        )
+        if cached is not None:
+            return cached
+
+    if not file_path.exists():
+        return None
+
+    digest = doc.content_hash
+    if digest is None:
+        digest = await asyncio.to_thread(document_text_store.file_sha256, file_path)
+        await _set_content_hash(doc.id, digest)
+        doc.content_hash = digest
+    return await document_text_store.extract_and_cache(
+        file_path, doc.content_type, digest
+    )
+
+
+async def _set_content_hash(doc_id: str, content_hash: str) -> None:
+    async with db_writer() as db:
+        await db.execute(
+            "UPDATE client_documents SET content_hash = ? WHERE id = ?",
+            (content_hash, doc_id),
+        )
+        await db.commit()
+
+
 def _row_to_doc(row: aiosqlite.Row) -> ClientDocument:
     from datetime import datetime
 
@@ -183,4 +307,6 @@ def _row_to_doc(row: aiosqlite.Row) -> ClientDocument:
         verification_result=row["verification_result"],
         uploaded_at=datetime.fromisoformat(row["uploaded_at"]),
         verified_at=verified_at,
+        content_hash=row["content_hash"],
+        verified_hash=row["verified_hash"],
     )
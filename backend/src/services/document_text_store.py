@@ -0,0 +1,180 @@
+"""Extracted-text cache for uploaded files, keyed by file content hash.
+
+Text is extracted once (at upload) and shared by ingestion, verification,
+EHP comment generation and the consultant agent.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import aiosqlite
+
+from src.models.client import DocumentText
+from src.services.db import db_reader, db_writer
+
+logger = logging.getLogger(__name__)
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: Path) -> str:
+    """Hash a file on disk without loading it into memory."""
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        while chunk := fh.read(_HASH_CHUNK):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pdf_pages(path: Path) -> list[str]:
+    """Extract per-page text from a PDF file using pypdf."""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    return [(page.extract_text() or "").strip() for page in reader.pages]
+
+
+def extract_text(
+    path: Path, content_type: str = ""
+) -> tuple[str, list[int], dict[str, Any]]:
+    """Best-effort text extraction from common file types.
+
+    Returns the plain text, the character offset at which each page starts,
+    and extraction metadata.
+    """
+    suffix = path.suffix.lower()
+
+    if suffix == ".pdf":
+        pages = pdf_pages(path)
+        parts: list[str] = []
+        offsets: list[int] = []
+        position = 0
+        for page in pages:
+            if page and parts:
+                position += 2  # "\n\n" separator
+            offsets.append(position)
+            if page:
+                parts.append(page)
+                position += len(page)
+        return (
+            "\n\n".join(parts),
+            offsets,
+            {"extractor": "pypdf", "page_count": len(pages)},
+        )
+
+    strict = suffix in (".txt", ".md", ".csv") or "text" in content_type
+    try:
+        text = path.read_text(encoding="utf-8", errors="strict" if strict else "ignore")
+    except UnicodeDecodeError:
+        text = ""
+    return text, [0], {"extractor": "text", "page_count": 1}
+
+
+async def get_text(
+    content_hash: str, *, suffix: str | None = None, content_type: str | None = None
+) -> DocumentText | None:
+    """Cached text for ``content_hash``.
+
+    Entries from a failed extraction are never returned. If ``suffix`` or
+    ``content_type`` is given, an entry extracted from different inputs is
+    treated as a miss too.
+    """
+    async with db_reader() as db:
+        cursor = await db.execute(
+            "SELECT * FROM document_texts WHERE content_hash = ?", (content_hash,)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            return None
+        cached = _row_to_text(row)
+    if "error" in cached.metadata:
+        return None
+    if suffix is not None and cached.metadata.get("suffix", suffix) != suffix:
+        return None
+    if (
+        content_type is not None
+        and cached.metadata.get("content_type", content_type) != content_type
+    ):
+        return None
+    return cached
+
+
+async def save_text(doc_text: DocumentText) -> None:
+    async with db_writer() as db:
+        await db.execute(
+            """INSERT INTO document_texts
+               (content_hash, text, page_offsets, metadata, extracted_at)
+               VALUES (?, ?, ?, ?, ?)
+               ON CONFLICT(content_hash) DO UPDATE SET
+                 text = excluded.text,
+                 page_offsets = excluded.page_offsets,
+                 metadata = excluded.metadata,
+                 extracted_at = excluded.extracted_at""",
+            (
+                doc_text.content_hash,
+                doc_text.text,
+                json.dumps(doc_text.page_offsets),
+                json.dumps(doc_text.metadata),
+                doc_text.extracted_at.isoformat(),
+            ),
+        )
+        await db.commit()
+
+
+async def extract_and_cache(
+    path: Path, content_type: str, content_hash: str
+) -> DocumentText:
+    """Return cached text for ``content_hash``, extracting it on a miss.
+
+    The cache entry is keyed on the bytes plus the extractor inputs (file
+    suffix and content type). A failed extraction returns empty text but is
+    not cached, so the next call tries again.
+    """
+    suffix = path.suffix.lower()
+    cached = await get_text(content_hash, suffix=suffix, content_type=content_type)
+    if cached is not None:
+        return cached
+
+    metadata: dict[str, Any]
+    try:
+        text, offsets, metadata = await asyncio.to_thread(
+            extract_text, path, content_type
+        )
+    except Exception as exc:
+        logger.warning("Text extraction failed for %s: %s", path.name, exc)
+        return DocumentText(
+            content_hash=content_hash,
+            text="",
+            metadata={
+                "error": str(exc),
+                "suffix": suffix,
+                "content_type": content_type,
+            },
+        )
+
+    metadata["suffix"] = suffix
+    metadata["content_type"] = content_type
+    metadata["char_count"] = len(text)
+    doc_text = DocumentText(
+        content_hash=content_hash,
+        text=text,
+        page_offsets=offsets,
+        metadata=metadata,
+    )
+    await save_text(doc_text)
+    return doc_text
+
+
+def _row_to_text(row: aiosqlite.Row) -> DocumentText:
+    return DocumentText(
+        content_hash=row["content_hash"],
+        text=row["text"],
+        page_offsets=json.loads(row["page_offsets"]),
+        metadata=json.loads(row["metadata"]),
+        extracted_at=datetime.fromisoformat(row["extracted_at"]),
+    )
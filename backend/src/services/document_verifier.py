@@ -1,15 +1,18 @@
 """AI-powered document verification using Anthropic Claude."""
 
+import asyncio
+import json
 import logging
+from collections.abc import AsyncGenerator
 from datetime import UTC, datetime
-from pathlib import Path
 
 import anthropic
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.config import settings
 from src.models.client import ClientDocument
-from src.services import document_store
+from src.services import document_store, llm_cache, usage_ledger
+from src.services.llm_clients import _default_clients
 
 logger = logging.getLogger(__name__)
 
@@ -38,24 +41,65 @@ Respond with a JSON object (no markdown fences):
 """
 
 MAX_TEXT_CHARS = 30_000  # limit text sent to Claude
-
-
-async def verify_document(doc: ClientDocument, expected_name: str) -> ClientDocument:
-    """Run AI verification on an uploaded document. Updates status in DB."""
-    file_path = Path(doc.file_path)
-    if not file_path.exists():
-        return await _mark_error(doc, "File not found on disk")
-
-    # Extract text content
-    text = _extract_text(file_path, doc.content_type)
+VERIFY_MAX_TOKENS = 512
+
+
+async def verify_document(
+    doc: ClientDocument,
+    expected_name: str,
+    *,
+    use_cache: bool = True,
+    raise_api_errors: bool = False,
+    api_client: anthropic.AsyncAnthropic | None = None,
+) -> tuple[ClientDocument, bool]:
+    """Run AI verification on an uploaded document. Updates status in DB.
+
+    Returns the updated document and whether the verdict came from the LLM
+    cache. Pass ``use_cache=False`` to force a fresh Claude call. With
+    ``raise_api_errors`` Anthropic API errors propagate instead of marking
+    the document as errored, so a job can retry them.
+    """
+    doc_text = await document_store.get_document_text(doc)
+    if doc_text is None:
+        return await mark_error(doc, "File not found on disk"), False
+
+    text = doc_text.text
     if not text or len(text.strip()) < 20:
-        return await _mark_error(doc, "Could not extract meaningful text from file")
+        return (
+            await mark_error(doc, "Could not extract meaningful text from file"),
+            False,
+        )
+
+    cache_key = llm_cache.make_key(
+        content_hash=doc_text.content_hash,
+        task="verify_document",
+        prompt_version=llm_cache.prompt_version(VERIFY_SYSTEM),
+        model=settings.agent_model,
+        params={
+            "expected_name": expected_name,
+            "document_id": doc.document_id,
+            "file_name": doc.file_name,
+            "max_tokens": VERIFY_MAX_TOKENS,
+            "max_text_chars": MAX_TEXT_CHARS,
+        },
+    )
+    if use_cache:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            status, reason = _parse_verdict(cached)
+            return await _record_verdict(doc, status, reason), True
 
     # Call Claude for verification
     try:
-        api_client = anthropic.AsyncAnthropic(
-            api_key=settings.anthropic_api_key, timeout=60.0
+        client = api_client or _default_clients.anthropic
+        prompt = (
+            f"Document purpose: {expected_name}\n"
+            f"Document ID: {doc.document_id}\n"
+            f"File name: {doc.file_name}\n\n"
+            f"--- Extracted text (first {MAX_TEXT_CHARS} chars) ---\n"
+            f"{text[:MAX_TEXT_CHARS]}"
         )
+        attempts = 0
 
         @retry(
             stop=stop_after_attempt(2),
@@ -63,23 +107,20 @@ async def verify_document(doc: ClientDocument, expected_name: str) -> ClientDocu
             reraise=True,
         )
         async def _verify_with_claude() -> anthropic.types.Message:
-            return await api_client.messages.create(
-                model=settings.agent_model,
-                max_tokens=512,
-                system=VERIFY_SYSTEM,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": (
-                            f"Document purpose: {expected_name}\n"
-                            f"Document ID: {doc.document_id}\n"
-                            f"File name: {doc.file_name}\n\n"
-                            f"--- Extracted text (first {MAX_TEXT_CHARS} chars) ---\n"
-                            f"{text[:MAX_TEXT_CHARS]}"
-                        ),
-                    }
-                ],
-            )
+            nonlocal attempts
+            attempts += 1
+            with usage_ledger.track_anthropic(
+                "verify_document", settings.agent_model, retries=attempts - 1
+            ) as call:
+                message = await client.messages.create(
+                    model=settings.agent_model,
+                    max_tokens=VERIFY_MAX_TOKENS,
+                    system=VERIFY_SYSTEM,
+                    messages=[{"role": "user", "content": prompt}],
+                    timeout=60.0,
+                )
+                call.usage = message.usage
+            return message
 
         response = await _verify_with_claude()
         first_block = response.content[0] if response.content else None
@@ -89,64 +130,91 @@ async def verify_document(doc: ClientDocument, expected_name: str) -> ClientDocu
             else ""
         )
 
-        import json
-
-        try:
-            result = json.loads(result_text)
-            status = result.get("status", "error")
-            if status not in ("verified", "rejected"):
-                status = "error"
-            reason = result.get("reason", result_text)
-        except json.JSONDecodeError:
-            status = "error"
-            reason = result_text
-
-        now = datetime.now(UTC).isoformat()
-        updated = await document_store.update_status(
-            doc.client_id,
-            doc.document_id,
-            status=status,
-            verification_result=reason,
-            verified_at=now,
-        )
-        return updated or doc
+        status, reason = _parse_verdict(result_text)
+        if status != "error":
+            await llm_cache.put(
+                cache_key,
+                task="verify_document",
+                model=settings.agent_model,
+                response=result_text,
+            )
+        return await _record_verdict(doc, status, reason), False
 
     except Exception as exc:
+        if raise_api_errors and isinstance(exc, anthropic.APIError):
+            raise
         logger.exception("Verification failed for %s", doc.id)
-        return await _mark_error(doc, str(exc))
+        return await mark_error(doc, str(exc)), False
+
+
+async def verify_documents(
+    docs: list[ClientDocument],
+    concurrency: int | None = None,
+    *,
+    use_cache: bool = True,
+    api_client: anthropic.AsyncAnthropic | None = None,
+) -> AsyncGenerator[tuple[ClientDocument, bool], None]:
+    """Verify documents concurrently, yielding each result as it completes.
+
+    Yields ``(document, cached)`` pairs. At most ``concurrency`` (default
+    ``settings.bulk_verify_concurrency``) Claude calls are in flight at once.
+    Closing the iterator early cancels the verifications that have not
+    finished.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.bulk_verify_concurrency)
+
+    async def _bounded(doc: ClientDocument) -> tuple[ClientDocument, bool]:
+        async with semaphore:
+            return await verify_document(
+                doc,
+                expected_name=doc.document_id,
+                use_cache=use_cache,
+                api_client=api_client,
+            )
+
+    tasks = [asyncio.create_task(_bounded(doc)) for doc in docs]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
 
 
-async def _mark_error(doc: ClientDocument, reason: str) -> ClientDocument:
+def _parse_verdict(result_text: str) -> tuple[str, str]:
+    """Parse Claude's JSON verdict into ``(status, reason)``."""
+    try:
+        result = json.loads(result_text)
+        status = result.get("status", "error")
+        if status not in ("verified", "rejected"):
+            status = "error"
+        reason = result.get("reason", result_text)
+    except (json.JSONDecodeError, AttributeError):
+        status = "error"
+        reason = result_text
+    return status, reason
+
+
+async def _record_verdict(
+    doc: ClientDocument, status: str, reason: str
+) -> ClientDocument:
     updated = await document_store.update_status(
         doc.client_id,
         doc.document_id,
-        status="error",
+        status=status,
         verification_result=reason,
+        verified_at=datetime.now(UTC).isoformat(),
+        verified_hash=doc.content_hash,
     )
     return updated or doc
 
 
-def _extract_text(file_path: Path, content_type: str) -> str:
-    """Best-effort text extraction from common file types."""
-    suffix = file_path.suffix.lower()
-
-    if suffix == ".pdf":
-        try:
-            from src.services.document_ingestion import _parse_pdf
-
-            return _parse_pdf(file_path)
-        except Exception:
-            return ""
-
-    # Plain text types
-    if suffix in (".txt", ".md", ".csv") or "text" in content_type:
-        try:
-            return file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            return ""
-
-    # For other types, try reading as text
-    try:
-        return file_path.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return ""
+async def mark_error(doc: ClientDocument, reason: str) -> ClientDocument:
+    """Record that verification of ``doc`` failed."""
+    updated = await document_store.update_status(
+        doc.client_id,
+        doc.document_id,
+        status="error",
+        verification_result=reason,
+    )
+    return updated or doc
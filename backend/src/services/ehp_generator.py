@@ -1,12 +1,15 @@
 """AI-generated EHP comment exchanges using Claude."""
 
+import json
 import logging
+from typing import Any
 
 import anthropic
 
 from src.config import settings
 from src.models.ehp import EHPComment
-from src.services import ehp_store
+from src.services import ehp_store, llm_cache, usage_ledger
+from src.services.llm_clients import _default_clients
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +43,9 @@ Respond with a JSON array of comment objects. Each object must have:
 
 Return ONLY the JSON array, no other text."""
 
+MAX_TOKENS = 1500
+EXCERPT_CHARS = 3000
+
 
 async def generate_ehp_comments(
     client_id: str,
@@ -47,8 +53,20 @@ async def generate_ehp_comments(
     document_name: str,
     document_description: str,
     document_text: str | None = None,
-) -> list[EHPComment]:
-    """Generate realistic EHP comments for a document using Claude."""
+    content_hash: str | None = None,
+    *,
+    use_cache: bool = True,
+    raise_api_errors: bool = False,
+    api_client: anthropic.AsyncAnthropic | None = None,
+) -> tuple[list[EHPComment], bool]:
+    """Generate realistic EHP comments for a document using Claude.
+
+    Returns the comments and whether they came from the LLM cache. A cache
+    hit reuses comments already stored for this document instead of adding
+    duplicates. Pass ``use_cache=False`` to force a fresh exchange. With
+    ``raise_api_errors`` Anthropic API errors propagate instead of yielding
+    no comments, so a job can retry them.
+    """
     user_prompt = (
         f"Generate an EHP review exchange for this document:\n\n"
         f"Document: {document_name}\n"
@@ -56,7 +74,7 @@ async def generate_ehp_comments(
         f"Document ID: {document_id}\n"
     )
     if document_text:
-        truncated = document_text[:3000]
+        truncated = document_text[:EXCERPT_CHARS]
         user_prompt += f"\nDocument content (excerpt):\n{truncated}\n"
 
     user_prompt += (
@@ -65,22 +83,73 @@ async def generate_ehp_comments(
         "raising a specific regulatory concern, and a response."
     )
 
+    cache_key = llm_cache.make_key(
+        content_hash=content_hash or "",
+        task="generate_ehp_comments",
+        prompt_version=llm_cache.prompt_version(SYSTEM_PROMPT),
+        model=settings.agent_model,
+        params={
+            "document_id": document_id,
+            "document_name": document_name,
+            "document_description": document_description,
+            "has_text": bool(document_text),
+            "max_tokens": MAX_TOKENS,
+            "excerpt_chars": EXCERPT_CHARS,
+        },
+    )
+    if use_cache:
+        cached = await llm_cache.get(cache_key)
+        if cached is not None:
+            try:
+                comments = await _store_comments(
+                    client_id, document_id, json.loads(cached)
+                )
+                return comments, True
+            except Exception:
+                logger.exception("Ignoring unusable cached EHP comments")
+
     try:
-        client = anthropic.AsyncAnthropic(api_key=settings.anthropic_api_key)
-        response = await client.messages.create(
+        client = api_client or _default_clients.anthropic
+        with usage_ledger.track_anthropic(
+            "generate_ehp_comments", settings.agent_model
+        ) as call:
+            response = await client.messages.create(
+                model=settings.agent_model,
+                max_tokens=MAX_TOKENS,
+                system=SYSTEM_PROMPT,
+                messages=[{"role": "user", "content": user_prompt}],
+            )
+            call.usage = response.usage
+
+        text = response.content[0].text  # type: ignore[union-attr]
+        results = await _store_comments(client_id, document_id, json.loads(text))
+        await llm_cache.put(
+            cache_key,
+            task="generate_ehp_comments",
             model=settings.agent_model,
-            max_tokens=1500,
-            system=SYSTEM_PROMPT,
-            messages=[{"role": "user", "content": user_prompt}],
+            response=text,
         )
+        return results, False
+    except Exception as exc:
+        if raise_api_errors and isinstance(exc, anthropic.APIError):
+            raise
+        logger.exception("Failed to generate EHP comments")
+        return [], False
 
-        import json
-
-        text = response.content[0].text  # type: ignore[union-attr]
-        comments_data = json.loads(text)
 
-        results: list[EHPComment] = []
-        for item in comments_data:
+async def _store_comments(
+    client_id: str, document_id: str, comments_data: list[dict[str, Any]]
+) -> list[EHPComment]:
+    """Persist generated comments, reusing identical AI comments already stored."""
+    existing = {
+        (c.author, c.content): c
+        for c in await ehp_store.list_comments(client_id, document_id)
+        if c.ai_generated
+    }
+    results: list[EHPComment] = []
+    for item in comments_data:
+        comment = existing.get((item["author"], item["content"]))
+        if comment is None:
             comment = await ehp_store.add_comment(
                 client_id=client_id,
                 document_id=document_id,
@@ -90,9 +159,5 @@ async def generate_ehp_comments(
                 resolved=item.get("resolved", False),
                 ai_generated=True,
             )
-            results.append(comment)
-
-        return results
-    except Exception:
-        logger.exception("Failed to generate EHP comments")
-        return []
+        results.append(comment)
+    return results
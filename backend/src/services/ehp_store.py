@@ -7,17 +7,25 @@ from typing import Literal
 import aiosqlite
 
 from src.models.ehp import EHPComment
-from src.services.db import get_db
+from src.services.db import db_reader, db_writer
 
 
 async def save_comment(comment: EHPComment) -> None:
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         await db.execute(
-            """INSERT OR REPLACE INTO ehp_comments
+            """INSERT INTO ehp_comments
                (id, client_id, document_id, author, role, content,
                 timestamp, resolved, ai_generated)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT(id) DO UPDATE SET
+                 client_id = excluded.client_id,
+                 document_id = excluded.document_id,
+                 author = excluded.author,
+                 role = excluded.role,
+                 content = excluded.content,
+                 timestamp = excluded.timestamp,
+                 resolved = excluded.resolved,
+                 ai_generated = excluded.ai_generated""",
             (
                 comment.id,
                 comment.client_id,
@@ -31,15 +39,12 @@ async def save_comment(comment: EHPComment) -> None:
             ),
         )
         await db.commit()
-    finally:
-        await db.close()
 
 
 async def list_comments(
     client_id: str, document_id: str
 ) -> list[EHPComment]:
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM ehp_comments"
             " WHERE client_id = ? AND document_id = ?"
@@ -48,13 +53,10 @@ async def list_comments(
         )
         rows = await cursor.fetchall()
         return [_row_to_comment(r) for r in rows]
-    finally:
-        await db.close()
 
 
 async def get_comment(comment_id: str) -> EHPComment | None:
-    db = await get_db()
-    try:
+    async with db_reader() as db:
         cursor = await db.execute(
             "SELECT * FROM ehp_comments WHERE id = ?",
             (comment_id,),
@@ -63,8 +65,6 @@ async def get_comment(comment_id: str) -> EHPComment | None:
         if row is None:
             return None
         return _row_to_comment(row)
-    finally:
-        await db.close()
 
 
 async def toggle_resolved(comment_id: str) -> EHPComment | None:
@@ -72,15 +72,12 @@ async def toggle_resolved(comment_id: str) -> EHPComment | None:
     if comment is None:
         return None
     new_resolved = not comment.resolved
-    db = await get_db()
-    try:
+    async with db_writer() as db:
         await db.execute(
             "UPDATE ehp_comments SET resolved = ? WHERE id = ?",
             (1 if new_resolved else 0, comment_id),
         )
         await db.commit()
-    finally:
-        await db.close()
     return await get_comment(comment_id)
 
 
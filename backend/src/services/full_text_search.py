@@ -0,0 +1,103 @@
+"""Local full-text search over chat messages, EHP comments and document text.
+
+Backed by the FTS5 tables from migrations 016 and 021, which triggers keep in step
+with their source tables. Queries never leave SQLite, so exact phrases and
+citations ("Art. 1b BankA") resolve without an embedding call.
+"""
+
+import re
+from collections.abc import Collection
+from typing import Any, get_args
+
+from src.models.search import SearchHit, SearchKind
+from src.services.db import db_reader
+
+_SNIPPET_TOKENS = 16
+
+# A "quoted phrase" or a bare word.
+_TERM = re.compile(r'"([^"]*)"|(\S+)')
+
+_QUERIES: dict[str, tuple[str, str]] = {
+    # kind -> (query, client id column)
+    "chat": (
+        """SELECT m.session_id AS id, m.seq, s.client_id, s.title,
+                  snippet(chat_messages_fts, 0, '**', '**', '…', ?) AS snippet,
+                  bm25(chat_messages_fts) AS rank
+           FROM chat_messages_fts
+           JOIN chat_messages m ON m.id = chat_messages_fts.rowid
+           JOIN chat_sessions s ON s.id = m.session_id
+           WHERE chat_messages_fts MATCH ?""",
+        "s.client_id",
+    ),
+    "ehp_comment": (
+        """SELECT c.id, NULL AS seq, c.client_id,
+                  c.author || ' on ' || c.document_id AS title,
+                  snippet(ehp_comments_fts, 0, '**', '**', '…', ?) AS snippet,
+                  bm25(ehp_comments_fts) AS rank
+           FROM ehp_comments_fts
+           JOIN ehp_comments c ON c.pk = ehp_comments_fts.rowid
+           WHERE ehp_comments_fts MATCH ?""",
+        "c.client_id",
+    ),
+    "document": (
+        """SELECT d.id, NULL AS seq, d.client_id, d.file_name AS title,
+                  snippet(document_texts_fts, 0, '**', '**', '…', ?) AS snippet,
+                  bm25(document_texts_fts) AS rank
+           FROM document_texts_fts
+           JOIN document_texts t ON t.pk = document_texts_fts.rowid
+           JOIN client_documents d ON d.content_hash = t.content_hash
+           WHERE document_texts_fts MATCH ?""",
+        "d.client_id",
+    ),
+}
+
+
+def build_match_query(text: str) -> str:
+    """Turn user input into an FTS5 query that matches every term.
+
+    Double-quoted parts stay phrases; everything else is matched word by
+    word. Each term is quoted, so punctuation such as "Art." or "1b" can
+    never be read as FTS5 syntax.
+    """
+    terms: list[str] = []
+    for phrase, word in _TERM.findall(text):
+        term = (phrase or word).strip()
+        if term:
+            terms.append('"' + term.replace('"', '""') + '"')
+    return " ".join(terms)
+
+
+async def search(
+    query: str,
+    *,
+    client_id: str | None = None,
+    kinds: Collection[SearchKind] | None = None,
+    limit: int = 20,
+) -> list[SearchHit]:
+    """Best matches for ``query`` across ``kinds`` (default: all)."""
+    match = build_match_query(query)
+    if not match:
+        return []
+    hits: list[SearchHit] = []
+    async with db_reader() as db:
+        for kind in kinds or get_args(SearchKind):
+            sql, client_column = _QUERIES[kind]
+            params: list[Any] = [_SNIPPET_TOKENS, match]
+            if client_id is not None:
+                sql += f" AND {client_column} = ?"
+                params.append(client_id)
+            cursor = await db.execute(sql + " ORDER BY rank LIMIT ?", [*params, limit])
+            hits.extend(
+                SearchHit(
+                    kind=kind,
+                    id=row["id"],
+                    client_id=row["client_id"],
+                    title=row["title"] or "",
+                    snippet=row["snippet"] or "",
+                    score=-row["rank"],
+                    seq=row["seq"],
+                )
+                for row in await cursor.fetchall()
+            )
+    hits.sort(key=lambda h: h.score, reverse=True)
+    return hits[:limit]
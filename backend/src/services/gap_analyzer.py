@@ -1,6 +1,12 @@
 """Gap analysis service: compare client state against pathway requirements."""
 
-from src.models.client import Client, Gap, GapAnalysis, NextStep
+from datetime import UTC, date, datetime, timedelta
+
+from src.models.client import ChecklistTimeline, Client, Gap, GapAnalysis, NextStep
+from src.services.checklist_graph import ChecklistGraph
+
+# Ready checklist items suggested as next steps
+_MAX_CHECKLIST_STEPS = 5
 
 
 def _check_core_fields(client: Client) -> tuple[list[Gap], list[str]]:
@@ -274,7 +280,9 @@ def _check_unresolved_flags(client: Client) -> list[str]:
     ]
 
 
-def _generate_next_steps(client: Client, pathway: str) -> list[NextStep]:
+def _generate_next_steps(
+    client: Client, pathway: str, graph: ChecklistGraph | None = None
+) -> list[NextStep]:
     """Generate prioritized next steps based on gaps."""
     steps: list[NextStep] = []
     priority = 1
@@ -390,29 +398,36 @@ def _generate_next_steps(client: Client, pathway: str) -> list[NextStep]:
         )
         priority += 1
 
-    # Add not-started checklist items as next steps
-    not_started = [item for item in client.checklist if item.status == "not_started"]
-    for item in not_started[:5]:
-        deps_met = all(
-            any(ci.id == dep and ci.status == "complete" for ci in client.checklist)
-            for dep in item.depends_on
-        )
-        if deps_met or not item.depends_on:
-            steps.append(
-                NextStep(
-                    priority=priority,
-                    action=item.item,
-                    category=item.category,
-                    estimated_days=item.estimated_days,
-                    depends_on=item.depends_on,
-                )
+    # Checklist items that can start now, critical path first
+    if graph is None:
+        graph = ChecklistGraph(client.checklist)
+    for item in graph.ready()[:_MAX_CHECKLIST_STEPS]:
+        steps.append(
+            NextStep(
+                priority=priority,
+                action=item.item,
+                category=item.category,
+                estimated_days=item.estimated_days,
+                depends_on=item.depends_on,
             )
-            priority += 1
+        )
+        priority += 1
 
     return steps
 
 
-def analyze_gaps(client: Client) -> GapAnalysis:
+def checklist_timeline(graph: ChecklistGraph, today: date) -> ChecklistTimeline:
+    """When the checklist can be finished at the earliest, and what sets it."""
+    return ChecklistTimeline(
+        remaining_days=graph.remaining_days,
+        earliest_completion=today + timedelta(days=graph.remaining_days),
+        critical_path=graph.critical_path,
+        unblocked=[item.id for item in graph.ready()],
+        unschedulable=graph.cyclic,
+    )
+
+
+def analyze_gaps(client: Client, today: date | None = None) -> GapAnalysis:
     """Analyze a client's readiness for their chosen licensing pathway."""
     pathway = client.pathway or "undetermined"
     gaps: list[Gap] = []
@@ -435,8 +450,10 @@ def analyze_gaps(client: Client) -> GapAnalysis:
     gaps.extend(_check_checklist(client))
     critical_blockers.extend(_check_unresolved_flags(client))
 
-    # Next steps
-    next_steps = _generate_next_steps(client, pathway)
+    # Next steps and the checklist schedule
+    graph = ChecklistGraph(client.checklist)
+    next_steps = _generate_next_steps(client, pathway, graph)
+    timeline = checklist_timeline(graph, today or datetime.now(UTC).date())
 
     # Readiness score
     total_items = len(client.checklist)
@@ -452,4 +469,5 @@ def analyze_gaps(client: Client) -> GapAnalysis:
         gaps=gaps,
         next_steps=next_steps,
         critical_blockers=critical_blockers,
+        timeline=timeline,
     )
@@ -0,0 +1,123 @@
+"""Cached gap analyses for the portfolio view.
+
+``analyze_gaps`` needs the full client, so each client's result is stored
+in ``gap_analyses`` with the client's version and ``updated_at``. A
+portfolio read first recomputes only the clients whose key changed, then
+pages through the stored results with the filters applied in SQL.
+"""
+
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.models.client import GapAnalysis
+from src.services import client_store
+from src.services.db import db_reader, db_writer
+from src.services.gap_analyzer import analyze_gaps
+from src.services.keyset import fetch_page
+
+# Clients loaded per batch while refreshing
+_REFRESH_BATCH = 200
+
+
+async def refresh() -> int:
+    """Recompute analyses for clients changed since they were cached.
+
+    Returns how many were recomputed.
+    """
+    async with db_reader() as db:
+        cursor = await db.execute(
+            """SELECT c.id, c.version, c.updated_at, c.status FROM clients c
+               LEFT JOIN gap_analyses g ON g.client_id = c.id
+               WHERE c.created_at != ''
+                 AND (g.client_id IS NULL
+                      OR g.version != c.version
+                      OR g.updated_at != c.updated_at)"""
+        )
+        stale = {r["id"]: r for r in await cursor.fetchall()}
+    ids = list(stale)
+    for start in range(0, len(ids), _REFRESH_BATCH):
+        clients = await client_store.get_clients(
+            ids[start : start + _REFRESH_BATCH], include_history=False
+        )
+        rows: list[tuple[Any, ...]] = []
+        for client in clients:
+            analysis = analyze_gaps(client)
+            # Keyed on the row as read above: if the client changed since,
+            # the key no longer matches and the next read recomputes it.
+            key = stale[client.id]
+            rows.append(
+                (
+                    client.id,
+                    key["version"],
+                    key["updated_at"],
+                    key["status"],
+                    analysis.pathway,
+                    len(analysis.critical_blockers),
+                    analysis.model_dump_json(),
+                )
+            )
+        async with db_writer() as db:
+            await db.executemany(
+                """INSERT INTO gap_analyses
+                   (client_id, version, updated_at, status, pathway, blockers, data)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(client_id) DO UPDATE SET
+                     version = excluded.version,
+                     updated_at = excluded.updated_at,
+                     status = excluded.status,
+                     pathway = excluded.pathway,
+                     blockers = excluded.blockers,
+                     data = excluded.data""",
+                rows,
+            )
+            await db.commit()
+    return len(ids)
+
+
+async def list_gap_analyses(
+    *,
+    pathway: str | None = None,
+    status: str | None = None,
+    min_blockers: int = 0,
+    limit: int = 50,
+    cursor: str | None = None,
+) -> tuple[list[GapAnalysis], int, str | None]:
+    """A page of every client's gap analysis (most recently updated client
+    first), the total matching count and the cursor for the next page."""
+    await refresh()
+    clauses: list[str] = []
+    params: list[Any] = []
+    if pathway is not None:
+        clauses.append("pathway = ?")
+        params.append(pathway)
+    if status is not None:
+        clauses.append("status = ?")
+        params.append(status)
+    if min_blockers > 0:
+        clauses.append("blockers >= ?")
+        params.append(min_blockers)
+    where = " AND ".join(clauses)
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            "SELECT client_id, updated_at, data FROM gap_analyses",
+            sort="updated_at",
+            key="client_id",
+            where=where,
+            params=params,
+            limit=limit,
+            cursor=cursor,
+        )
+        count = await db.execute(
+            "SELECT COUNT(*) FROM gap_analyses" + (f" WHERE {where}" if where else ""),
+            params,
+        )
+        total = await count.fetchone()
+    analyses = [GapAnalysis.model_validate_json(r["data"]) for r in rows]
+    # Timelines are cached as durations; date them from today, not from
+    # when they were computed.
+    today = datetime.now(UTC).date()
+    for analysis in analyses:
+        timeline = analysis.timeline
+        timeline.earliest_completion = today + timedelta(days=timeline.remaining_days)
+    return analyses, total[0] if total else 0, next_cursor
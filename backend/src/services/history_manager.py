@@ -0,0 +1,243 @@
+"""Token-budgeted conversation replay with a rolling summary.
+
+Agents replay only the recent, not-yet-summarized part of a conversation.
+Older turns are folded into a rolling summary by a background job, and facts
+already saved on the ``Client`` are sent as a compact profile instead of being
+re-derived from the transcript. Per-turn input therefore stays bounded no
+matter how long an engagement runs.
+"""
+
+import logging
+from typing import Any
+
+import anthropic
+
+from src.config import settings
+from src.models.client import Client
+from src.services import chat_store, client_store, usage_ledger
+from src.services.job_queue import UnknownJobKindError, _default_queue
+from src.services.llm_clients import _default_clients
+
+logger = logging.getLogger(__name__)
+
+SUMMARIZE_HISTORY = "summarize_history"
+
+# Versioned save attempts before a client summary run gives up
+MAX_SAVE_ATTEMPTS = 3
+
+# History token budgets by model family; the first matching prefix wins.
+MODEL_HISTORY_BUDGETS: dict[str, int] = {
+    "claude-haiku": 8_000,
+    "claude-sonnet": 16_000,
+    "claude-opus": 24_000,
+}
+
+# Client fields that are bookkeeping rather than intake facts.
+_NON_PROFILE_FIELDS = {
+    "id",
+    "created_at",
+    "updated_at",
+    "current_stage_index",
+    "checklist",
+    "flags",
+    "conversation_history",
+    "conversation_summary",
+    "summarized_messages",
+    "version",
+}
+
+SUMMARY_SYSTEM = """\
+You maintain a running summary of a regulatory consulting conversation.
+
+Merge the new messages into the existing summary. Keep decisions, open \
+questions, commitments, concerns raised and anything the assistant promised \
+to follow up on. Omit facts listed in the saved client profile; they are \
+stored separately. Be concise: at most 250 words of plain prose or bullets.
+Return only the updated summary."""
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+def token_budget(model: str) -> int:
+    """History token budget for ``model``."""
+    for prefix, budget in MODEL_HISTORY_BUDGETS.items():
+        if model.startswith(prefix):
+            return budget
+    return settings.history_token_budget
+
+
+def _message_tokens(message: dict[str, Any]) -> int:
+    content = message.get("content", "")
+    return estimate_tokens(content if isinstance(content, str) else str(content))
+
+
+def build_replay(
+    history: list[dict[str, Any]],
+    summarized: int = 0,
+    model: str | None = None,
+) -> list[dict[str, Any]]:
+    """Select the messages to replay verbatim.
+
+    Skips the first ``summarized`` messages (covered by the rolling summary),
+    then keeps the most recent messages that fit the model's token budget.
+    The result always starts with a user message.
+    """
+    budget = token_budget(model or settings.agent_model)
+    candidates = history[min(summarized, len(history)) :]
+
+    kept: list[dict[str, Any]] = []
+    used = 0
+    for message in reversed(candidates):
+        cost = _message_tokens(message)
+        if kept and used + cost > budget:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+
+    while kept and kept[0].get("role") != "user":
+        kept.pop(0)
+    return kept
+
+
+def needs_summary(history_length: int, summarized: int) -> bool:
+    """Whether enough unsummarized turns have piled up to fold some away."""
+    return (
+        history_length - summarized
+        > settings.history_keep_recent + settings.history_summarize_batch
+    )
+
+
+def client_profile_context(client: Client) -> str:
+    """Render the intake facts already saved on ``client``."""
+    lines: list[str] = []
+    for field, value in client.model_dump(exclude=_NON_PROFILE_FIELDS).items():
+        if value is None or value == "" or value == []:
+            continue
+        if isinstance(value, list):
+            value = ", ".join(str(v) for v in value)
+        lines.append(f"- {field}: {value}")
+    if not lines:
+        return ""
+    return (
+        "**Saved client profile (already recorded — do not ask again):**\n"
+        + "\n".join(lines)
+    )
+
+
+def summary_context(summary: str) -> str:
+    if not summary:
+        return ""
+    return f"**Summary of the earlier conversation:**\n{summary}"
+
+
+# ── Background summarization ───────────────────────────────
+
+
+async def schedule_summary(target: str, target_id: str) -> None:
+    """Queue a rolling-summary refresh for a client or chat session."""
+    try:
+        await _default_queue.enqueue(
+            SUMMARIZE_HISTORY,
+            {"target": target, "id": target_id},
+            idempotency_key=f"summarize:{target}:{target_id}",
+            client_id=target_id if target == "client" else None,
+        )
+    except UnknownJobKindError:
+        logger.warning("History summarization is not registered; skipping")
+
+
+async def summarize(
+    previous_summary: str,
+    messages: list[dict[str, Any]],
+    profile: str = "",
+    api_client: anthropic.AsyncAnthropic | None = None,
+) -> str:
+    """Fold ``messages`` into ``previous_summary`` with Claude."""
+    transcript = "\n\n".join(
+        f"{m.get('role', 'user').upper()}: {m.get('content', '')}" for m in messages
+    )
+    prompt = (
+        f"Saved client profile:\n{profile or '(none)'}\n\n"
+        f"Existing summary:\n{previous_summary or '(none)'}\n\n"
+        f"New messages:\n{transcript}"
+    )
+    client = api_client or _default_clients.anthropic
+    with usage_ledger.track_anthropic(
+        "summarize_history", settings.agent_model
+    ) as call:
+        response = await client.messages.create(
+            model=settings.agent_model,
+            max_tokens=600,
+            system=SUMMARY_SYSTEM,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=60.0,
+        )
+        call.usage = response.usage
+    first_block = response.content[0] if response.content else None
+    if first_block is None or first_block.type != "text":
+        return ""
+    return first_block.text.strip()
+
+
+async def refresh_client_summary(client_id: str) -> int:
+    """Fold a client's older onboarding turns into its rolling summary.
+
+    Returns the number of messages folded.
+    """
+    client = await client_store.get_client(client_id)
+    if client is None:
+        return 0
+    history = client.conversation_history
+    fold_to = len(history) - settings.history_keep_recent
+    if fold_to <= client.summarized_messages:
+        return 0
+    base = client.summarized_messages
+    summary = await summarize(
+        client.conversation_summary,
+        history[base:fold_to],
+        client_profile_context(client),
+    )
+    attempt = 1
+    while True:
+        # Re-read so fields written during the Claude call are not overwritten.
+        latest = await client_store.get_client(client_id)
+        if latest is None:
+            return 0
+        if (
+            latest.summarized_messages != base
+            or len(latest.conversation_history) < fold_to
+        ):
+            # Another run folded these turns first, or the history was
+            # rewritten: this summary no longer extends the stored one.
+            logger.info("Client %s summary changed; dropping this run", client_id)
+            return 0
+        latest.conversation_summary = summary
+        latest.summarized_messages = fold_to
+        try:
+            await client_store.save_client(latest, check_version=True)
+        except client_store.ClientVersionConflictError:
+            if attempt == MAX_SAVE_ATTEMPTS:
+                raise
+            attempt += 1
+            continue
+        return fold_to - base
+
+
+async def refresh_session_summary(session_id: str) -> int:
+    """Fold a chat session's older turns into its rolling summary."""
+    session = await chat_store.get_session(session_id, include_messages=False)
+    if session is None:
+        return 0
+    fold_to = session.message_count - settings.history_keep_recent
+    if fold_to <= session.summarized_messages:
+        return 0
+    summary = await summarize(
+        session.summary,
+        await chat_store.get_messages(session_id, session.summarized_messages, fold_to),
+    )
+    await chat_store.update_summary(session_id, summary, fold_to)
+    return fold_to - session.summarized_messages
@@ -0,0 +1,151 @@
+"""Job handlers for document ingestion, verification and EHP generation."""
+
+import logging
+from typing import Any
+
+import anthropic
+
+from src.config import settings
+from src.models.job import Job
+from src.services import document_store, usage_ledger
+from src.services.document_ingestion import ingest_client_document
+from src.services.document_verifier import mark_error, verify_document
+from src.services.ehp_generator import generate_ehp_comments
+from src.services.history_manager import (
+    SUMMARIZE_HISTORY,
+    refresh_client_summary,
+    refresh_session_summary,
+)
+from src.services.job_queue import (
+    JobHandler,
+    JobQueue,
+    ProgressCallback,
+    _default_queue,
+)
+
+logger = logging.getLogger(__name__)
+
+INGEST_DOCUMENT = "ingest_document"
+VERIFY_DOCUMENT = "verify_document"
+GENERATE_EHP_COMMENTS = "generate_ehp_comments"
+
+# Interactive work jumps ahead of background indexing.
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BACKGROUND = 0
+
+
+class DocumentNotFoundError(LookupError):
+    """Raised when a job references a document that no longer exists."""
+
+    def __init__(self, client_id: str, document_id: str) -> None:
+        super().__init__(f"Document {document_id} not found for client {client_id}")
+
+
+async def _ingest_document(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+    client_id = job.payload["client_id"]
+    document_id = job.payload["document_id"]
+    doc = await document_store.get_document(client_id, document_id)
+    if doc is None:
+        # Deleted before indexing ran; nothing left to do.
+        return {"chunks": 0, "skipped": True}
+    await progress(0.1, "Indexing document")
+    chunks = await ingest_client_document(doc)
+    return {"chunks": chunks}
+
+
+async def _verify_document(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+    client_id = job.payload["client_id"]
+    document_id = job.payload["document_id"]
+    doc = await document_store.get_document(client_id, document_id)
+    if doc is None:
+        raise DocumentNotFoundError(client_id, document_id)
+    await progress(0.1, "Verifying document")
+    try:
+        updated, cached = await verify_document(
+            doc,
+            expected_name=job.payload.get("expected_name", document_id),
+            use_cache=not job.payload.get("refresh", False),
+            raise_api_errors=True,
+        )
+    except anthropic.APIError as exc:
+        # Transient API failures are retried by the queue; only the last
+        # attempt leaves the document marked as errored.
+        if job.attempts >= job.max_attempts:
+            await mark_error(doc, str(exc))
+        raise
+    return {
+        "status": updated.status,
+        "verification_result": updated.verification_result,
+        "cached": cached,
+    }
+
+
+async def _generate_ehp_comments(
+    job: Job, progress: ProgressCallback
+) -> dict[str, Any]:
+    client_id = job.payload["client_id"]
+    document_id = job.payload["document_id"]
+
+    # Use the actual document text for context-aware generation
+    document_text: str | None = None
+    content_hash: str | None = None
+    doc = await document_store.get_document(client_id, document_id)
+    if doc:
+        doc_text = await document_store.get_document_text(doc)
+        if doc_text is not None and doc_text.text:
+            document_text = doc_text.text
+            content_hash = doc_text.content_hash
+
+    await progress(0.2, "Generating review comments")
+    comments, cached = await generate_ehp_comments(
+        client_id=client_id,
+        document_id=document_id,
+        document_name=job.payload.get("document_name") or document_id,
+        document_description=job.payload.get("document_description", ""),
+        document_text=document_text,
+        content_hash=content_hash,
+        use_cache=not job.payload.get("refresh", False),
+        raise_api_errors=True,
+    )
+    return {
+        "comments": [c.model_dump(mode="json") for c in comments],
+        "cached": cached,
+    }
+
+
+async def _summarize_history(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+    target_id = job.payload["id"]
+    if job.payload["target"] == "client":
+        folded = await refresh_client_summary(target_id)
+    else:
+        folded = await refresh_session_summary(target_id)
+    return {"folded_messages": folded}
+
+
+def _attributed(kind: str, handler: JobHandler) -> JobHandler:
+    """Attribute LLM usage inside a job to the job kind and its client."""
+
+    async def _run(job: Job, progress: ProgressCallback) -> dict[str, Any] | None:
+        usage_ledger.new_context(endpoint=f"job:{kind}", client_id=job.client_id)
+        return await handler(job, progress)
+
+    return _run
+
+
+def register_handlers(queue: JobQueue) -> None:
+    """Register all application job kinds on ``queue``."""
+    handlers: list[tuple[str, JobHandler, int]] = [
+        (INGEST_DOCUMENT, _ingest_document, settings.job_ingest_concurrency),
+        (VERIFY_DOCUMENT, _verify_document, settings.job_verify_concurrency),
+        (
+            GENERATE_EHP_COMMENTS,
+            _generate_ehp_comments,
+            settings.job_ehp_concurrency,
+        ),
+        (SUMMARIZE_HISTORY, _summarize_history, settings.job_summary_concurrency),
+    ]
+    for kind, handler, concurrency in handlers:
+        queue.register(kind, _attributed(kind, handler), concurrency)
+
+
+register_handlers(_default_queue)
@@ -0,0 +1,416 @@
+"""Durable SQLite-backed job queue with an in-process worker pool.
+
+Jobs are persisted in the ``jobs`` table, so queued work survives client
+disconnects and restarts. Workers claim the highest-priority ready job whose
+kind still has free capacity, retry failures with exponential backoff, and
+record progress that the status endpoints expose.
+
+Several processes can share the table. A claimed job is leased to its
+process, which keeps renewing the lease; only jobs whose lease lapsed
+(their process died) are requeued.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import uuid
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+import aiosqlite
+from fastapi import Request
+
+from src.config import settings
+from src.models.job import Job, JobStatus
+from src.services.db import db_reader, db_writer
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[float, str | None], Awaitable[None]]
+JobHandler = Callable[[Job, ProgressCallback], Awaitable[dict[str, Any] | None]]
+
+MAX_RETRY_DELAY = 300.0
+
+
+class UnknownJobKindError(ValueError):
+    """Raised when enqueuing a job kind that has no registered handler."""
+
+    def __init__(self, kind: str) -> None:
+        super().__init__(f"No handler registered for job kind '{kind}'")
+
+
+class JobQueue:
+    """Persistent priority queue plus a bounded pool of worker tasks."""
+
+    def __init__(self) -> None:
+        self._handlers: dict[str, JobHandler] = {}
+        self._limits: dict[str, int] = {}
+        self._running: dict[str, int] = {}
+        # Ids of jobs this process is executing; only these leases are renewed
+        self._active: set[str] = set()
+        self._wakeup: asyncio.Event | None = None
+        self._workers: list[asyncio.Task[None]] = []
+        # Lease owner id for jobs claimed by this process
+        self._owner = uuid.uuid4().hex
+
+    def register(self, kind: str, handler: JobHandler, concurrency: int = 1) -> None:
+        """Register the handler for a job kind and its concurrency limit."""
+        self._handlers[kind] = handler
+        self._limits[kind] = max(1, concurrency)
+        self._running.setdefault(kind, 0)
+
+    # ── Producer API ───────────────────────────────────────
+
+    async def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        *,
+        priority: int = 0,
+        idempotency_key: str | None = None,
+        client_id: str | None = None,
+        max_attempts: int = 3,
+    ) -> Job:
+        """Persist a job and wake a worker.
+
+        If a queued or running job already holds ``idempotency_key`` it is
+        returned instead of creating a duplicate. Keys of finished jobs are
+        released so the same work can be requested again.
+        """
+        if kind not in self._handlers:
+            raise UnknownJobKindError(kind)
+
+        now = datetime.now(UTC)
+        job = Job(
+            id=uuid.uuid4().hex[:16],
+            kind=kind,
+            payload=payload,
+            priority=priority,
+            idempotency_key=idempotency_key,
+            client_id=client_id,
+            max_attempts=max_attempts,
+            run_after=now,
+            created_at=now,
+            updated_at=now,
+        )
+        async with db_writer() as db:
+            if idempotency_key is not None:
+                cursor = await db.execute(
+                    "SELECT * FROM jobs WHERE idempotency_key = ?",
+                    (idempotency_key,),
+                )
+                row = await cursor.fetchone()
+                if row is not None:
+                    existing = _row_to_job(row)
+                    if existing.status in ("queued", "running"):
+                        return existing
+                    await db.execute(
+                        "UPDATE jobs SET idempotency_key = NULL WHERE id = ?",
+                        (existing.id,),
+                    )
+            await db.execute(
+                """INSERT INTO jobs
+                   (id, kind, payload, status, priority, attempts, max_attempts,
+                    idempotency_key, client_id, progress, run_after,
+                    created_at, updated_at)
+                   VALUES (?, ?, ?, 'queued', ?, 0, ?, ?, ?, 0, ?, ?, ?)""",
+                (
+                    job.id,
+                    job.kind,
+                    json.dumps(job.payload),
+                    job.priority,
+                    job.max_attempts,
+                    job.idempotency_key,
+                    job.client_id,
+                    job.run_after.isoformat(),
+                    job.created_at.isoformat(),
+                    job.updated_at.isoformat(),
+                ),
+            )
+            await db.commit()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get_job(self, job_id: str) -> Job | None:
+        async with db_reader() as db:
+            cursor = await db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,))
+            row = await cursor.fetchone()
+            if row is None:
+                return None
+            return _row_to_job(row)
+
+    async def list_jobs(
+        self,
+        client_id: str | None = None,
+        status: JobStatus | None = None,
+        limit: int = 50,
+    ) -> list[Job]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if client_id:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        async with db_reader() as db:
+            cursor = await db.execute(
+                f"SELECT * FROM jobs{where} ORDER BY created_at DESC LIMIT ?",
+                (*params, limit),
+            )
+            rows = await cursor.fetchall()
+            return [_row_to_job(r) for r in rows]
+
+    # ── Worker pool ────────────────────────────────────────
+
+    async def start(self, workers: int | None = None) -> None:
+        """Requeue jobs orphaned by a dead process and start workers."""
+        if self._workers:
+            return
+        await self._requeue_expired()
+
+        lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        count = workers or settings.job_workers
+        self._workers = [
+            asyncio.create_task(
+                self._worker_loop(lock, self._wakeup), name=f"job-worker-{i}"
+            )
+            for i in range(count)
+        ]
+        self._workers.append(
+            asyncio.create_task(self._lease_loop(), name="job-lease-renewal")
+        )
+        logger.info("Started %d job workers", count)
+
+    def _lease_expiry(self) -> str:
+        return (
+            datetime.now(UTC) + timedelta(seconds=settings.job_lease_seconds)
+        ).isoformat()
+
+    async def _requeue_expired(self) -> int:
+        """Requeue running jobs whose lease lapsed (or that predate leases)."""
+        now = datetime.now(UTC).isoformat()
+        async with db_writer() as db:
+            cursor = await db.execute(
+                """UPDATE jobs
+                   SET status = 'queued', lease_owner = NULL, lease_expires = NULL,
+                       updated_at = ?
+                   WHERE status = 'running'
+                     AND (lease_expires IS NULL OR lease_expires < ?)""",
+                (now, now),
+            )
+            await db.commit()
+        if cursor.rowcount:
+            logger.info("Requeued %d interrupted jobs", cursor.rowcount)
+        return cursor.rowcount
+
+    async def _lease_loop(self) -> None:
+        """Renew this process's leases and recover jobs of dead processes."""
+        while True:
+            await asyncio.sleep(settings.job_lease_seconds / 3)
+            try:
+                if self._active:
+                    active = list(self._active)
+                    placeholders = ", ".join("?" for _ in active)
+                    async with db_writer() as db:
+                        await db.execute(
+                            f"""UPDATE jobs SET lease_expires = ?
+                                WHERE status = 'running' AND lease_owner = ?
+                                  AND id IN ({placeholders})""",
+                            (self._lease_expiry(), self._owner, *active),
+                        )
+                        await db.commit()
+                if await self._requeue_expired() and self._wakeup is not None:
+                    self._wakeup.set()
+            except Exception:
+                logger.exception("Job lease renewal failed")
+
+    async def stop(self) -> None:
+        """Cancel workers; their jobs go back to the queue."""
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._wakeup = None
+
+    async def _worker_loop(self, lock: asyncio.Lock, wakeup: asyncio.Event) -> None:
+        failures = 0
+        while True:
+            try:
+                # Clear before claiming: an enqueue that lands during the
+                # claim then still wakes the wait below.
+                wakeup.clear()
+                job = await self._claim(lock)
+                failures = 0
+                if job is None:
+                    with contextlib.suppress(TimeoutError):
+                        await asyncio.wait_for(
+                            wakeup.wait(), timeout=settings.job_poll_interval
+                        )
+                    continue
+                self._active.add(job.id)
+                try:
+                    await self._run(job)
+                finally:
+                    self._active.discard(job.id)
+                    self._running[job.kind] -= 1
+                    wakeup.set()
+            except Exception:
+                # A job whose status write failed stays running; its lease is
+                # no longer renewed, so it is requeued once the lease lapses.
+                failures += 1
+                logger.exception("Job worker iteration failed")
+                await asyncio.sleep(
+                    min(
+                        settings.job_poll_interval * 2 ** (failures - 1),
+                        MAX_RETRY_DELAY,
+                    )
+                )
+
+    async def _claim(self, lock: asyncio.Lock) -> Job | None:
+        """Atomically move the best ready job with free capacity to running."""
+        async with lock:
+            kinds = [
+                kind
+                for kind, limit in self._limits.items()
+                if self._running.get(kind, 0) < limit
+            ]
+            if not kinds:
+                return None
+            now = datetime.now(UTC).isoformat()
+            placeholders = ", ".join("?" for _ in kinds)
+            async with db_writer() as db:
+                cursor = await db.execute(
+                    f"""UPDATE jobs
+                        SET status = 'running', attempts = attempts + 1,
+                            started_at = ?, updated_at = ?,
+                            lease_owner = ?, lease_expires = ?
+                        WHERE id = (
+                            SELECT id FROM jobs
+                            WHERE status = 'queued' AND run_after <= ?
+                              AND kind IN ({placeholders})
+                            ORDER BY priority DESC, created_at ASC
+                            LIMIT 1
+                        ) AND status = 'queued'
+                        RETURNING *""",
+                    (now, now, self._owner, self._lease_expiry(), now, *kinds),
+                )
+                row = await cursor.fetchone()
+                await db.commit()
+            if row is None:
+                return None
+            job = _row_to_job(row)
+            self._running[job.kind] = self._running.get(job.kind, 0) + 1
+            return job
+
+    async def _run(self, job: Job) -> None:
+        handler = self._handlers[job.kind]
+
+        async def _progress(fraction: float, message: str | None = None) -> None:
+            await self._update(
+                job.id, progress=max(0.0, min(1.0, fraction)), progress_message=message
+            )
+
+        try:
+            result = await handler(job, _progress)
+        except asyncio.CancelledError:
+            await self._update(job.id, status="queued", attempts=job.attempts - 1)
+            raise
+        except Exception as exc:
+            logger.warning(
+                "Job %s (%s) attempt %d failed: %s",
+                job.id,
+                job.kind,
+                job.attempts,
+                exc,
+            )
+            error = f"{type(exc).__name__}: {exc}"
+            if job.attempts < job.max_attempts:
+                delay = min(
+                    settings.job_retry_base_delay * 2 ** (job.attempts - 1),
+                    MAX_RETRY_DELAY,
+                )
+                run_after = datetime.now(UTC) + timedelta(seconds=delay)
+                await self._update(
+                    job.id, status="queued", error=error, run_after=run_after
+                )
+            else:
+                await self._update(
+                    job.id,
+                    status="failed",
+                    error=error,
+                    finished_at=datetime.now(UTC),
+                )
+            return
+
+        await self._update(
+            job.id,
+            status="succeeded",
+            progress=1.0,
+            result=result or {},
+            error=None,
+            finished_at=datetime.now(UTC),
+        )
+
+    async def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = datetime.now(UTC)
+        assignments: list[str] = []
+        params: list[Any] = []
+        for key, value in fields.items():
+            assignments.append(f"{key} = ?")
+            if isinstance(value, datetime):
+                value = value.isoformat()
+            elif isinstance(value, dict):
+                value = json.dumps(value)
+            params.append(value)
+        async with db_writer() as db:
+            await db.execute(
+                f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?",
+                (*params, job_id),
+            )
+            await db.commit()
+
+
+def _parse_dt(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _row_to_job(row: aiosqlite.Row) -> Job:
+    return Job(
+        id=row["id"],
+        kind=row["kind"],
+        payload=json.loads(row["payload"]),
+        status=row["status"],
+        priority=row["priority"],
+        attempts=row["attempts"],
+        max_attempts=row["max_attempts"],
+        idempotency_key=row["idempotency_key"],
+        client_id=row["client_id"],
+        progress=row["progress"],
+        progress_message=row["progress_message"],
+        result=json.loads(row["result"]) if row["result"] else None,
+        error=row["error"],
+        run_after=datetime.fromisoformat(row["run_after"]),
+        created_at=datetime.fromisoformat(row["created_at"]),
+        updated_at=datetime.fromisoformat(row["updated_at"]),
+        started_at=_parse_dt(row["started_at"]),
+        finished_at=_parse_dt(row["finished_at"]),
+    )
+
+
+# --- Module-level default queue (handlers are registered by job_handlers) ---
+_default_queue = JobQueue()
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """FastAPI dependency that returns the JobQueue from app state."""
+    queue: JobQueue | None = getattr(request.app.state, "job_queue", None)
+    if queue is None:
+        return _default_queue
+    return queue
@@ -0,0 +1,156 @@
+"""Registry of knowledge-base documents and lexical index of their chunks.
+
+Qdrant only stores chunks, so listing documents from it means scrolling the
+whole collection. RAGService records each document here as it is ingested
+or deleted, and ``reconcile`` repairs drift from the chunks themselves.
+
+Chunk text also goes into ``kb_chunks``, whose FTS5 index is the BM25 side
+of hybrid search. Living in SQLite, it is shared by every worker process.
+"""
+
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime
+
+import aiosqlite
+
+from src.services.db import db_reader, db_writer
+from src.services.keyset import fetch_page
+
+# (Qdrant point id, doc id, chunk text)
+Chunk = tuple[str, str, str]
+
+
+async def upsert_document(
+    doc_id: str,
+    title: str,
+    source: str,
+    client_id: str | None,
+    chunks: int,
+    texts: Sequence[Chunk] = (),
+) -> None:
+    """Register a document and add its chunk ``texts`` to the lexical index."""
+    async with db_writer() as db:
+        await _insert_chunks(db, texts)
+        await db.execute(
+            """INSERT INTO kb_documents
+               (doc_id, title, source, client_id, chunks, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(doc_id) DO UPDATE SET
+                 title = excluded.title,
+                 source = excluded.source,
+                 client_id = excluded.client_id,
+                 chunks = excluded.chunks,
+                 updated_at = excluded.updated_at""",
+            (doc_id, title, source, client_id, chunks, datetime.now(UTC).isoformat()),
+        )
+        await db.commit()
+
+
+async def delete_document(doc_id: str) -> None:
+    async with db_writer() as db:
+        await db.execute("DELETE FROM kb_documents WHERE doc_id = ?", (doc_id,))
+        await db.execute("DELETE FROM kb_chunks WHERE doc_id = ?", (doc_id,))
+        await db.commit()
+
+
+async def reconcile(
+    docs: Iterable[dict[str, str | int | None]], chunks: Iterable[Chunk] = ()
+) -> None:
+    """Make the registry and lexical index match ``docs`` and ``chunks`` (as
+    found in Qdrant), in one transaction.
+
+    Documents already registered keep their ``updated_at``, so a rebuild
+    does not reshuffle the listing; chunks already indexed are left alone.
+    """
+    chunk_rows = list(chunks)
+    now = datetime.now(UTC).isoformat()
+    rows = [
+        (d["doc_id"], d["title"], d["source"], d.get("client_id"), d["chunks"], now)
+        for d in docs
+    ]
+    async with db_writer() as db:
+        await db.execute("CREATE TEMP TABLE IF NOT EXISTS kb_seen (doc_id TEXT)")
+        await db.execute("DELETE FROM kb_seen")
+        await db.executemany(
+            "INSERT INTO kb_seen (doc_id) VALUES (?)", [(r[0],) for r in rows]
+        )
+        await db.execute(
+            "DELETE FROM kb_documents WHERE doc_id NOT IN (SELECT doc_id FROM kb_seen)"
+        )
+        await db.executemany(
+            """INSERT INTO kb_documents
+               (doc_id, title, source, client_id, chunks, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT(doc_id) DO UPDATE SET
+                 title = excluded.title,
+                 source = excluded.source,
+                 client_id = excluded.client_id,
+                 chunks = excluded.chunks""",
+            rows,
+        )
+        await db.execute("DELETE FROM kb_seen")
+        await db.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS kb_seen_chunks (point_id TEXT)"
+        )
+        await db.execute("DELETE FROM kb_seen_chunks")
+        await db.executemany(
+            "INSERT INTO kb_seen_chunks (point_id) VALUES (?)",
+            [(c[0],) for c in chunk_rows],
+        )
+        await db.execute(
+            """DELETE FROM kb_chunks
+               WHERE point_id NOT IN (SELECT point_id FROM kb_seen_chunks)"""
+        )
+        await db.execute("DELETE FROM kb_seen_chunks")
+        await _insert_chunks(db, chunk_rows)
+        await db.commit()
+
+
+async def list_documents(
+    limit: int = 50, cursor: str | None = None
+) -> tuple[list[dict[str, str]], int, str | None]:
+    """A page of documents (most recently indexed first), the total count and
+    the cursor for the next page."""
+    async with db_reader() as db:
+        rows, next_cursor = await fetch_page(
+            db,
+            "SELECT doc_id, title, source, updated_at FROM kb_documents",
+            sort="updated_at",
+            key="doc_id",
+            limit=limit,
+            cursor=cursor,
+        )
+        count = await db.execute("SELECT COUNT(*) FROM kb_documents")
+        total = await count.fetchone()
+    docs = [
+        {"doc_id": r["doc_id"], "title": r["title"], "source": r["source"]}
+        for r in rows
+    ]
+    return docs, total[0] if total else 0, next_cursor
+
+
+async def search_chunks(query: str, limit: int = 10) -> list[tuple[str, float]]:
+    """Point ids of the chunks best matching any word of ``query``, with
+    their BM25 scores (higher is better)."""
+    match = " OR ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+    if not match:
+        return []
+    async with db_reader() as db:
+        cursor = await db.execute(
+            """SELECT c.point_id, bm25(kb_chunks_fts) AS rank
+               FROM kb_chunks_fts
+               JOIN kb_chunks c ON c.id = kb_chunks_fts.rowid
+               WHERE kb_chunks_fts MATCH ?
+               ORDER BY rank LIMIT ?""",
+            (match, limit),
+        )
+        rows = await cursor.fetchall()
+    return [(r["point_id"], -r["rank"]) for r in rows]
+
+
+async def _insert_chunks(db: aiosqlite.Connection, chunks: Iterable[Chunk]) -> None:
+    await db.executemany(
+        """INSERT INTO kb_chunks (point_id, doc_id, text) VALUES (?, ?, ?)
+           ON CONFLICT(point_id) DO NOTHING""",
+        chunks,
+    )
@@ -0,0 +1,78 @@
+"""Keyset (cursor) pagination for SQLite listings.
+
+Pages are ordered newest first by ``(sort column, id column)`` and the next
+page starts strictly after the last row's key, so every page is an index
+range scan no matter how deep it is. Cursors are opaque to callers: a
+URL-safe base64 encoding of that last key.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from typing import Any
+
+import aiosqlite
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    def __init__(self) -> None:
+        super().__init__("Invalid pagination cursor")
+
+
+def encode_cursor(sort_value: str, key: str) -> str:
+    raw = json.dumps([sort_value, key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise InvalidCursorError() from exc
+    if (
+        not isinstance(value, list)
+        or len(value) != 2
+        or not all(isinstance(v, str) for v in value)
+    ):
+        raise InvalidCursorError()
+    return value[0], value[1]
+
+
+async def fetch_page(
+    db: aiosqlite.Connection,
+    select: str,
+    *,
+    sort: str,
+    key: str = "id",
+    where: str = "",
+    params: Sequence[Any] = (),
+    limit: int,
+    cursor: str | None = None,
+) -> tuple[list[aiosqlite.Row], str | None]:
+    """Run ``select`` for one page; returns the rows and the next cursor.
+
+    ``select`` must produce the ``sort`` and ``key`` columns, and an index
+    on (any equality columns in ``where``, ``sort``, ``key``) keeps it a
+    range scan.
+    """
+    clauses = [where] if where else []
+    args = list(params)
+    if cursor is not None:
+        clauses.append(f"({sort}, {key}) < (?, ?)")
+        args.extend(decode_cursor(cursor))
+    sql = select
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += f" ORDER BY {sort} DESC, {key} DESC LIMIT ?"
+    args.append(limit + 1)
+
+    result = await db.execute(sql, args)
+    rows = list(await result.fetchall())
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor(last[sort], last[key])
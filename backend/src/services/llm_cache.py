@@ -0,0 +1,97 @@
+"""Persistent cache of LLM results keyed by input content and prompt.
+
+Entries are keyed on (content hash, task, prompt version, model, parameters),
+so a result is reused only while every input that shaped it is unchanged.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from src.config import settings
+from src.services.db import db_reader, db_writer
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_version(system_prompt: str) -> str:
+    """Derive a version tag from a prompt so edits invalidate old entries."""
+    return hashlib.sha256(system_prompt.encode()).hexdigest()[:12]
+
+
+def make_key(
+    *,
+    content_hash: str,
+    task: str,
+    prompt_version: str,
+    model: str,
+    params: dict[str, Any],
+) -> str:
+    """Build a stable cache key from every input that affects the response."""
+    material = json.dumps(
+        {
+            "content_hash": content_hash,
+            "task": task,
+            "prompt_version": prompt_version,
+            "model": model,
+            "params": params,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(material.encode()).hexdigest()
+
+
+async def get(cache_key: str) -> str | None:
+    """Return a cached response, or None if missing or expired."""
+    now = datetime.now(UTC).isoformat()
+    async with db_reader() as db:
+        cursor = await db.execute(
+            "SELECT response, task FROM llm_cache"
+            " WHERE cache_key = ? AND (expires_at IS NULL OR expires_at > ?)",
+            (cache_key, now),
+        )
+        row = await cursor.fetchone()
+    if row is None:
+        return None
+    async with db_writer() as db:
+        await db.execute(
+            "UPDATE llm_cache SET hits = hits + 1 WHERE cache_key = ?", (cache_key,)
+        )
+        await db.commit()
+    logger.info("LLM cache hit: %s %s", row["task"], cache_key[:12])
+    return str(row["response"])
+
+
+async def put(
+    cache_key: str,
+    *,
+    task: str,
+    model: str,
+    response: str,
+    ttl_seconds: int | None = None,
+) -> None:
+    """Store a response. ``ttl_seconds`` defaults to ``settings.llm_cache_ttl``."""
+    ttl = settings.llm_cache_ttl if ttl_seconds is None else ttl_seconds
+    now = datetime.now(UTC)
+    expires_at = (now + timedelta(seconds=ttl)).isoformat() if ttl > 0 else None
+    async with db_writer() as db:
+        await db.execute(
+            """INSERT OR REPLACE INTO llm_cache
+               (cache_key, task, model, response, created_at, expires_at, hits)
+               VALUES (?, ?, ?, ?, ?, ?, 0)""",
+            (cache_key, task, model, response, now.isoformat(), expires_at),
+        )
+        await db.commit()
+
+
+async def purge_expired() -> int:
+    """Delete expired entries. Returns the number removed."""
+    async with db_writer() as db:
+        cursor = await db.execute(
+            "DELETE FROM llm_cache WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (datetime.now(UTC).isoformat(),),
+        )
+        await db.commit()
+        return cursor.rowcount
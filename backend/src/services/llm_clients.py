@@ -0,0 +1,76 @@
+"""Shared, pooled Anthropic and OpenAI clients owned by the application.
+
+One client per provider is created on first use and reused for every call,
+so requests share a keep-alive HTTP connection pool instead of paying a new
+TLS handshake each time. ``lifespan`` stores the instance on ``app.state``
+and closes it on shutdown.
+"""
+
+import logging
+from typing import Any
+
+import anthropic
+import openai
+from fastapi import Request
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _limits() -> Any:
+    # Built from the SDK's own bundled httpx Limits class so it always matches
+    # the transport the SDK was installed with.
+    return type(anthropic.DEFAULT_CONNECTION_LIMITS)(
+        max_connections=settings.llm_max_connections,
+        max_keepalive_connections=settings.llm_max_keepalive_connections,
+        keepalive_expiry=settings.llm_keepalive_expiry,
+    )
+
+
+class LLMClients:
+    """Lazily created, long-lived Anthropic and OpenAI clients."""
+
+    def __init__(self) -> None:
+        self._anthropic: anthropic.AsyncAnthropic | None = None
+        self._openai: openai.AsyncOpenAI | None = None
+
+    @property
+    def anthropic(self) -> anthropic.AsyncAnthropic:
+        if self._anthropic is None:
+            self._anthropic = anthropic.AsyncAnthropic(
+                api_key=settings.anthropic_api_key,
+                http_client=anthropic.DefaultAsyncHttpxClient(limits=_limits()),
+            )
+        return self._anthropic
+
+    @property
+    def openai(self) -> openai.AsyncOpenAI:
+        if self._openai is None:
+            self._openai = openai.AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                http_client=openai.DefaultAsyncHttpxClient(limits=_limits()),
+            )
+        return self._openai
+
+    async def aclose(self) -> None:
+        """Close the connection pools. Clients are recreated on next use."""
+        if self._anthropic is not None:
+            await self._anthropic.close()
+            self._anthropic = None
+        if self._openai is not None:
+            await self._openai.close()
+            self._openai = None
+        logger.info("LLM clients closed")
+
+
+# --- Module-level default instance (used by background jobs and seeding) ---
+_default_clients = LLMClients()
+
+
+def get_llm_clients(request: Request) -> LLMClients:
+    """FastAPI dependency that returns the LLMClients from app state."""
+    clients: LLMClients | None = getattr(request.app.state, "llm_clients", None)
+    if clients is None:
+        return _default_clients
+    return clients
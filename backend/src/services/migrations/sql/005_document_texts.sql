@@ -0,0 +1,10 @@
+CREATE TABLE IF NOT EXISTS document_texts (
+    content_hash TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    page_offsets TEXT NOT NULL DEFAULT '[]',
+    metadata TEXT NOT NULL DEFAULT '{}',
+    extracted_at TEXT NOT NULL
+);
+
+ALTER TABLE client_documents ADD COLUMN content_hash TEXT;
+CREATE INDEX IF NOT EXISTS idx_client_documents_hash ON client_documents(content_hash);
@@ -0,0 +1 @@
+ALTER TABLE client_documents ADD COLUMN verified_hash TEXT;
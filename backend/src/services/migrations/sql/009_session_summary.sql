@@ -0,0 +1,2 @@
+ALTER TABLE chat_sessions ADD COLUMN summary TEXT NOT NULL DEFAULT '';
+ALTER TABLE chat_sessions ADD COLUMN summarized_messages INTEGER NOT NULL DEFAULT 0;
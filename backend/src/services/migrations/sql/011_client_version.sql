@@ -0,0 +1 @@
+ALTER TABLE clients ADD COLUMN version INTEGER NOT NULL DEFAULT 0;
@@ -0,0 +1,39 @@
+-- Checklist items, flags and onboarding messages move out of the clients.data
+-- JSON blob. Rows with layout = 1 still hold everything in data and are
+-- converted by client_store.backfill_normalized(); layout = 2 rows keep only
+-- the scalar profile fields in data.
+ALTER TABLE clients ADD COLUMN layout INTEGER NOT NULL DEFAULT 1;
+
+CREATE TABLE IF NOT EXISTS client_checklist_items (
+    client_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    item_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL,
+    notes TEXT,
+    required_for TEXT NOT NULL,
+    estimated_days INTEGER,
+    depends_on TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (client_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS client_flags (
+    client_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    flag_id TEXT NOT NULL,
+    field TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    resolved INTEGER NOT NULL DEFAULT 0,
+    resolution_notes TEXT,
+    PRIMARY KEY (client_id, position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS onboarding_messages (
+    client_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (client_id, seq)
+) WITHOUT ROWID;
@@ -0,0 +1,36 @@
+-- List-view projection of each client, maintained by client_store.save_client
+-- so GET /api/clients never parses a full client.
+ALTER TABLE clients ADD COLUMN company_name TEXT NOT NULL DEFAULT '';
+ALTER TABLE clients ADD COLUMN status TEXT NOT NULL DEFAULT 'intake';
+ALTER TABLE clients ADD COLUMN pathway TEXT;
+ALTER TABLE clients ADD COLUMN finma_license_type TEXT;
+ALTER TABLE clients ADD COLUMN contact_name TEXT NOT NULL DEFAULT '';
+ALTER TABLE clients ADD COLUMN contact_email TEXT NOT NULL DEFAULT '';
+ALTER TABLE clients ADD COLUMN current_stage_index INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE clients ADD COLUMN created_at TEXT NOT NULL DEFAULT '';
+ALTER TABLE clients ADD COLUMN updated_at TEXT NOT NULL DEFAULT '';
+ALTER TABLE clients ADD COLUMN completed_items INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE clients ADD COLUMN total_items INTEGER NOT NULL DEFAULT 0;
+
+UPDATE clients SET
+    company_name = COALESCE(json_extract(data, '$.company_name'), ''),
+    status = COALESCE(json_extract(data, '$.status'), 'intake'),
+    pathway = json_extract(data, '$.pathway'),
+    finma_license_type = json_extract(data, '$.finma_license_type'),
+    contact_name = COALESCE(json_extract(data, '$.contact_name'), ''),
+    contact_email = COALESCE(json_extract(data, '$.contact_email'), ''),
+    current_stage_index = COALESCE(json_extract(data, '$.current_stage_index'), 0),
+    created_at = COALESCE(json_extract(data, '$.created_at'), ''),
+    updated_at = COALESCE(json_extract(data, '$.updated_at'), ''),
+    completed_items = CASE WHEN layout = 2 THEN (
+        SELECT COUNT(*) FROM client_checklist_items c
+        WHERE c.client_id = clients.id AND c.status = 'complete'
+    ) ELSE (
+        SELECT COUNT(*) FROM json_each(data, '$.checklist')
+        WHERE json_extract(value, '$.status') = 'complete'
+    ) END,
+    total_items = CASE WHEN layout = 2 THEN (
+        SELECT COUNT(*) FROM client_checklist_items c
+        WHERE c.client_id = clients.id
+    ) ELSE COALESCE(json_array_length(data, '$.checklist'), 0) END
+WHERE json_valid(data);
@@ -0,0 +1,24 @@
+-- Indexes for keyset pagination: every listing is ordered by
+-- (timestamp, id) descending and filtered by equality on the leading columns.
+CREATE INDEX IF NOT EXISTS idx_clients_updated ON clients(updated_at, id);
+
+DROP INDEX IF EXISTS idx_chat_sessions_client;
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_updated ON chat_sessions(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_chat_sessions_client_updated
+    ON chat_sessions(client_id, updated_at, id);
+
+CREATE INDEX IF NOT EXISTS idx_client_documents_uploaded
+    ON client_documents(client_id, uploaded_at, id);
+
+-- One row per knowledge-base document, so listing does not scroll every
+-- chunk in Qdrant. Kept in step by RAGService and reconciled against Qdrant
+-- whenever the BM25 corpus is rebuilt.
+CREATE TABLE IF NOT EXISTS kb_documents (
+    doc_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    client_id TEXT,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_kb_documents_updated ON kb_documents(updated_at, doc_id);
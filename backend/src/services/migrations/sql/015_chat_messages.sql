@@ -0,0 +1,28 @@
+-- Chat messages move out of the chat_sessions.messages JSON array into one
+-- row per message, so appending a message no longer rewrites the whole
+-- transcript. message_count is the next seq to assign.
+CREATE TABLE IF NOT EXISTS chat_messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+
+ALTER TABLE chat_sessions ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0;
+
+INSERT INTO chat_messages (session_id, seq, role, content, created_at)
+SELECT s.id,
+       CAST(m.key AS INTEGER),
+       COALESCE(json_extract(m.value, '$.role'), 'user'),
+       COALESCE(json_extract(m.value, '$.content'), ''),
+       s.updated_at
+FROM chat_sessions s, json_each(s.messages) m
+WHERE json_valid(s.messages);
+
+UPDATE chat_sessions
+SET message_count = (
+        SELECT COUNT(*) FROM chat_messages WHERE session_id = chat_sessions.id
+    ),
+    messages = '[]';
@@ -0,0 +1,82 @@
+-- Full-text search over chat messages, EHP comments and extracted document
+-- text. Each FTS5 table indexes its source table as external content and is
+-- kept in sync by triggers, so stores need no extra writes. Sources must be
+-- written with INSERT ... ON CONFLICT DO UPDATE rather than INSERT OR REPLACE:
+-- REPLACE deletes rows without firing delete triggers.
+
+-- External-content FTS needs an integer rowid, so chat_messages gains one.
+CREATE TABLE chat_messages_v2 (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (session_id, seq)
+);
+INSERT INTO chat_messages_v2 (session_id, seq, role, content, created_at)
+SELECT session_id, seq, role, content, created_at
+FROM chat_messages
+ORDER BY session_id, seq;
+DROP TABLE chat_messages;
+ALTER TABLE chat_messages_v2 RENAME TO chat_messages;
+
+CREATE VIRTUAL TABLE chat_messages_fts USING fts5(
+    content,
+    content = 'chat_messages',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER chat_messages_fts_ai AFTER INSERT ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+CREATE TRIGGER chat_messages_fts_ad AFTER DELETE ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+END;
+CREATE TRIGGER chat_messages_fts_au AFTER UPDATE OF content ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts (chat_messages_fts, rowid, content)
+    VALUES ('delete', old.id, old.content);
+    INSERT INTO chat_messages_fts (rowid, content) VALUES (new.id, new.content);
+END;
+INSERT INTO chat_messages_fts (chat_messages_fts) VALUES ('rebuild');
+
+CREATE VIRTUAL TABLE ehp_comments_fts USING fts5(
+    content,
+    content = 'ehp_comments',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER ehp_comments_fts_ai AFTER INSERT ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (rowid, content) VALUES (new.rowid, new.content);
+END;
+CREATE TRIGGER ehp_comments_fts_ad AFTER DELETE ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (ehp_comments_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+END;
+CREATE TRIGGER ehp_comments_fts_au AFTER UPDATE OF content ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (ehp_comments_fts, rowid, content)
+    VALUES ('delete', old.rowid, old.content);
+    INSERT INTO ehp_comments_fts (rowid, content) VALUES (new.rowid, new.content);
+END;
+INSERT INTO ehp_comments_fts (ehp_comments_fts) VALUES ('rebuild');
+
+CREATE VIRTUAL TABLE document_texts_fts USING fts5(
+    text,
+    content = 'document_texts',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER document_texts_fts_ai AFTER INSERT ON document_texts BEGIN
+    INSERT INTO document_texts_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER document_texts_fts_ad AFTER DELETE ON document_texts BEGIN
+    INSERT INTO document_texts_fts (document_texts_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER document_texts_fts_au AFTER UPDATE OF text ON document_texts BEGIN
+    INSERT INTO document_texts_fts (document_texts_fts, rowid, text)
+    VALUES ('delete', old.rowid, old.text);
+    INSERT INTO document_texts_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+INSERT INTO document_texts_fts (document_texts_fts) VALUES ('rebuild');
@@ -0,0 +1,29 @@
+-- Lexical index over knowledge-base chunks. It used to be an in-memory BM25
+-- corpus rebuilt from Qdrant in every worker; kept here, all workers share
+-- one copy and see each other's ingests. point_id is the chunk's Qdrant id.
+CREATE TABLE IF NOT EXISTS kb_chunks (
+    id INTEGER PRIMARY KEY,
+    point_id TEXT NOT NULL UNIQUE,
+    doc_id TEXT NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_kb_chunks_doc ON kb_chunks(doc_id);
+
+CREATE VIRTUAL TABLE kb_chunks_fts USING fts5(
+    text,
+    content = 'kb_chunks',
+    content_rowid = 'id',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER kb_chunks_fts_ai AFTER INSERT ON kb_chunks BEGIN
+    INSERT INTO kb_chunks_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER kb_chunks_fts_ad AFTER DELETE ON kb_chunks BEGIN
+    INSERT INTO kb_chunks_fts (kb_chunks_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+END;
+CREATE TRIGGER kb_chunks_fts_au AFTER UPDATE OF text ON kb_chunks BEGIN
+    INSERT INTO kb_chunks_fts (kb_chunks_fts, rowid, text)
+    VALUES ('delete', old.id, old.text);
+    INSERT INTO kb_chunks_fts (rowid, text) VALUES (new.id, new.text);
+END;
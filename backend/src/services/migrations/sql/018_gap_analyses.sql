@@ -0,0 +1,14 @@
+-- Cached GapAnalysis per client for the portfolio view. A row is current
+-- while its version and updated_at match the client's; gap_store recomputes
+-- the others on read. status and pathway are copied for filtering.
+CREATE TABLE IF NOT EXISTS gap_analyses (
+    client_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    pathway TEXT NOT NULL,
+    blockers INTEGER NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_gap_analyses_updated
+    ON gap_analyses(updated_at, client_id);
@@ -0,0 +1,3 @@
+-- Gap analyses now carry a checklist timeline; drop cached ones from before
+-- so gap_store recomputes them.
+DELETE FROM gap_analyses;
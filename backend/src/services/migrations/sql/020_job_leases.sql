@@ -0,0 +1,5 @@
+-- Running jobs are leased to the worker process that claimed them. The
+-- owner renews the lease while it runs; any process may requeue a running
+-- job whose lease has lapsed (its owner died), but not a live sibling's.
+ALTER TABLE jobs ADD COLUMN lease_owner TEXT;
+ALTER TABLE jobs ADD COLUMN lease_expires TEXT;
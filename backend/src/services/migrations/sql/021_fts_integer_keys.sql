@@ -0,0 +1,86 @@
+-- ehp_comments and document_texts have TEXT primary keys, so their FTS5
+-- indexes (016) were keyed on implicit rowids, which VACUUM may renumber.
+-- Both tables gain an explicit INTEGER PRIMARY KEY (pk), as chat_messages
+-- did, and the indexes are rebuilt on it. Dropping a table drops its
+-- triggers, which are recreated below.
+
+DROP TABLE ehp_comments_fts;
+CREATE TABLE ehp_comments_v2 (
+    pk INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    client_id TEXT NOT NULL,
+    document_id TEXT NOT NULL,
+    author TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    resolved INTEGER DEFAULT 0,
+    ai_generated INTEGER DEFAULT 0
+);
+INSERT INTO ehp_comments_v2
+    (id, client_id, document_id, author, role, content, timestamp, resolved,
+     ai_generated)
+SELECT id, client_id, document_id, author, role, content, timestamp, resolved,
+       ai_generated
+FROM ehp_comments
+ORDER BY rowid;
+DROP TABLE ehp_comments;
+ALTER TABLE ehp_comments_v2 RENAME TO ehp_comments;
+CREATE INDEX IF NOT EXISTS idx_ehp_client_doc ON ehp_comments(client_id, document_id);
+
+CREATE VIRTUAL TABLE ehp_comments_fts USING fts5(
+    content,
+    content = 'ehp_comments',
+    content_rowid = 'pk',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER ehp_comments_fts_ai AFTER INSERT ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (rowid, content) VALUES (new.pk, new.content);
+END;
+CREATE TRIGGER ehp_comments_fts_ad AFTER DELETE ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (ehp_comments_fts, rowid, content)
+    VALUES ('delete', old.pk, old.content);
+END;
+CREATE TRIGGER ehp_comments_fts_au AFTER UPDATE OF content ON ehp_comments BEGIN
+    INSERT INTO ehp_comments_fts (ehp_comments_fts, rowid, content)
+    VALUES ('delete', old.pk, old.content);
+    INSERT INTO ehp_comments_fts (rowid, content) VALUES (new.pk, new.content);
+END;
+INSERT INTO ehp_comments_fts (ehp_comments_fts) VALUES ('rebuild');
+
+DROP TABLE document_texts_fts;
+CREATE TABLE document_texts_v2 (
+    pk INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    text TEXT NOT NULL,
+    page_offsets TEXT NOT NULL DEFAULT '[]',
+    metadata TEXT NOT NULL DEFAULT '{}',
+    extracted_at TEXT NOT NULL
+);
+INSERT INTO document_texts_v2
+    (content_hash, text, page_offsets, metadata, extracted_at)
+SELECT content_hash, text, page_offsets, metadata, extracted_at
+FROM document_texts
+ORDER BY rowid;
+DROP TABLE document_texts;
+ALTER TABLE document_texts_v2 RENAME TO document_texts;
+
+CREATE VIRTUAL TABLE document_texts_fts USING fts5(
+    text,
+    content = 'document_texts',
+    content_rowid = 'pk',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER document_texts_fts_ai AFTER INSERT ON document_texts BEGIN
+    INSERT INTO document_texts_fts (rowid, text) VALUES (new.pk, new.text);
+END;
+CREATE TRIGGER document_texts_fts_ad AFTER DELETE ON document_texts BEGIN
+    INSERT INTO document_texts_fts (document_texts_fts, rowid, text)
+    VALUES ('delete', old.pk, old.text);
+END;
+CREATE TRIGGER document_texts_fts_au AFTER UPDATE OF text ON document_texts BEGIN
+    INSERT INTO document_texts_fts (document_texts_fts, rowid, text)
+    VALUES ('delete', old.pk, old.text);
+    INSERT INTO document_texts_fts (rowid, text) VALUES (new.pk, new.text);
+END;
+INSERT INTO document_texts_fts (document_texts_fts) VALUES ('rebuild');
@@ -1,10 +1,12 @@
 """RAG service: embedding, indexing, and hybrid search.
 
-Uses Qdrant + OpenAI embeddings.
+Uses Qdrant + OpenAI embeddings, fused with BM25 over the SQLite lexical
+index in kb_document_store.
 """
 
 import hashlib
 import logging
+import time
 import uuid
 
 from fastapi import Request
@@ -18,10 +20,10 @@ from qdrant_client.models import (
     PointStruct,
     VectorParams,
 )
-from rank_bm25 import BM25Okapi
 from tenacity import retry, stop_after_attempt, wait_exponential
 
 from src.config import settings
+from src.services import kb_document_store, usage_ledger
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,6 @@ class RAGService:
     def __init__(self) -> None:
         self._qdrant: AsyncQdrantClient | None = None
         self._openai: AsyncOpenAI | None = None
-        self._bm25_corpus: list[dict[str, str]] = []
 
     def _require_qdrant(self) -> AsyncQdrantClient:
         if self._qdrant is None:
@@ -54,10 +55,10 @@ class RAGService:
             raise RAGServiceNotInitializedError("OpenAI client")
         return self._openai
 
-    async def init(self) -> None:
-        """Connect to Qdrant and init OpenAI client."""
+    async def init(self, openai_client: AsyncOpenAI | None = None) -> None:
+        """Connect to Qdrant and attach the (shared) OpenAI client."""
         self._qdrant = AsyncQdrantClient(url=settings.qdrant_url)
-        self._openai = AsyncOpenAI(api_key=settings.openai_api_key)
+        self._openai = openai_client or AsyncOpenAI(api_key=settings.openai_api_key)
 
         collections = await self._qdrant.get_collections()
         names = [c.name for c in collections.collections]
@@ -73,21 +74,44 @@ class RAGService:
                 "Created Qdrant collection: %s", settings.qdrant_collection
             )
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-    )
     async def embed(self, text: str) -> list[float]:
         """Generate embedding via OpenAI API."""
         openai = self._require_openai()
-        resp = await openai.embeddings.create(
-            model=settings.embedding_model,
-            input=text,
-            dimensions=settings.embedding_dimensions,
-            timeout=30,
+        attempts = 0
+
+        @retry(
+            stop=stop_after_attempt(3),
+            wait=wait_exponential(multiplier=1, min=1, max=10),
+            reraise=True,
         )
-        return resp.data[0].embedding
+        async def _embed() -> list[float]:
+            nonlocal attempts
+            attempts += 1
+            started = time.monotonic()
+            success = False
+            tokens = 0
+            try:
+                resp = await openai.embeddings.create(
+                    model=settings.embedding_model,
+                    input=text,
+                    dimensions=settings.embedding_dimensions,
+                    timeout=30,
+                )
+                tokens = resp.usage.prompt_tokens if resp.usage else 0
+                success = True
+            finally:
+                usage_ledger.record(
+                    provider="openai",
+                    model=settings.embedding_model,
+                    operation="embedding",
+                    input_tokens=tokens,
+                    latency_ms=round((time.monotonic() - started) * 1000),
+                    retries=attempts - 1,
+                    success=success,
+                )
+            return resp.data[0].embedding
+
+        return await _embed()
 
     async def ingest_document(
         self,
@@ -125,12 +149,17 @@ class RAGService:
             await qdrant.upsert(
                 collection_name=settings.qdrant_collection, points=points
             )
-            # Update BM25 corpus
-            for p in points:
-                if p.payload is not None:
-                    self._bm25_corpus.append(
-                        {"id": str(p.id), "text": str(p.payload["text"])}
-                    )
+            await kb_document_store.upsert_document(
+                doc_id,
+                title,
+                source,
+                client_id,
+                len(points),
+                texts=[
+                    (str(p.id), doc_id, chunk)
+                    for p, chunk in zip(points, chunks, strict=True)
+                ],
+            )
 
         logger.info("Ingested '%s': %d chunks", title, len(points))
         return len(points)
@@ -151,24 +180,12 @@ class RAGService:
         )
 
         # BM25 lexical search
-        bm25_results: list[dict[str, object]] = []
-        if self._bm25_corpus:
-            tokenized = [
-                doc["text"].lower().split() for doc in self._bm25_corpus
-            ]
-            bm25 = BM25Okapi(tokenized)
-            scores = bm25.get_scores(query.lower().split())
-            scored = sorted(
-                enumerate(scores), key=lambda x: x[1], reverse=True
-            )[: top_k * 2]
-            for idx, score in scored:
-                if score > 0:
-                    bm25_results.append(
-                        {
-                            "id": self._bm25_corpus[idx]["id"],
-                            "score": float(score),
-                        }
-                    )
+        bm25_results = [
+            {"id": point_id, "score": score}
+            for point_id, score in await kb_document_store.search_chunks(
+                query, top_k * 2
+            )
+        ]
 
         # Reciprocal rank fusion
         rrf_scores: dict[str, float] = {}
@@ -218,10 +235,7 @@ class RAGService:
                 ]
             ),
         )
-        # Remove from BM25 corpus
-        self._bm25_corpus = [
-            c for c in self._bm25_corpus if c.get("doc_id") != doc_id
-        ]
+        await kb_document_store.delete_document(doc_id)
         logger.info("Deleted document: %s", doc_id)
         return 0  # Qdrant delete doesn't return count
 
@@ -254,10 +268,22 @@ class RAGService:
 
         return list(docs.values())
 
+    async def list_documents_page(
+        self, limit: int = 50, cursor: str | None = None
+    ) -> tuple[list[dict[str, str]], int, str | None]:
+        """A page of indexed documents from the registry, the total count and
+        the cursor for the next page."""
+        return await kb_document_store.list_documents(limit, cursor)
+
     async def rebuild_bm25_corpus(self) -> None:
-        """Rebuild in-memory BM25 corpus from Qdrant."""
+        """Resync the shared BM25 index and document registry from Qdrant.
+
+        Other workers keep searching the previous index until the rebuild
+        commits, then see the new one.
+        """
         qdrant = self._require_qdrant()
-        self._bm25_corpus = []
+        chunks: list[kb_document_store.Chunk] = []
+        docs: dict[str, dict[str, str | int | None]] = {}
 
         offset = None
         while True:
@@ -270,17 +296,28 @@ class RAGService:
             points, next_offset = result
             for point in points:
                 if point.payload:
-                    self._bm25_corpus.append(
-                        {
-                            "id": str(point.id),
-                            "text": str(point.payload.get("text", "")),
-                        }
+                    did = str(point.payload.get("doc_id", ""))
+                    chunks.append(
+                        (str(point.id), did, str(point.payload.get("text", "")))
                     )
+                    if did:
+                        doc = docs.setdefault(
+                            did,
+                            {
+                                "doc_id": did,
+                                "title": str(point.payload.get("title", "")),
+                                "source": str(point.payload.get("source", "")),
+                                "client_id": point.payload.get("client_id"),
+                                "chunks": 0,
+                            },
+                        )
+                        doc["chunks"] = int(doc["chunks"] or 0) + 1
             if next_offset is None:
                 break
             offset = next_offset
 
-        logger.info("Rebuilt BM25 corpus: %d entries", len(self._bm25_corpus))
+        await kb_document_store.reconcile(docs.values(), chunks)
+        logger.info("Rebuilt BM25 index: %d chunks", len(chunks))
 
 
 def _chunk_text(
@@ -336,6 +373,7 @@ ingest_document = _default_instance.ingest_document
 search = _default_instance.search
 delete_document = _default_instance.delete_document
 list_documents = _default_instance.list_documents
+list_documents_page = _default_instance.list_documents_page
 rebuild_bm25_corpus = _default_instance.rebuild_bm25_corpus
 
 
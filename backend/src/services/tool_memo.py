@@ -0,0 +1,110 @@
+"""Turn-scoped memoization of read-only agent tool calls.
+
+Within one agent turn Claude often repeats a knowledge-base search or
+re-reads a client after an unrelated tool. A ``TurnMemo`` returns the first
+result for identical inputs and drops a client's entries as soon as a
+mutating tool writes to that client. Free-text fields such as ``query`` are
+normalized before comparison; ids and other arguments must match exactly.
+Results that report a failure are not kept, so a retry runs the tool again.
+"""
+
+import asyncio
+import json
+import logging
+import re
+from collections.abc import Awaitable, Callable, Collection
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+ToolExecutor = Callable[[str, dict[str, Any]], Awaitable[str]]
+
+_WHITESPACE = re.compile(r"\s+")
+# Tool executors report errors as text, e.g. "Knowledge base search failed: …"
+# or "Failed to fetch client: …".
+_FAILURE = re.compile(r"^(?:Failed to [^:\n]*|[^:\n]* failed): ")
+
+# Inputs compared after folding case, spacing and trailing punctuation
+TEXT_FIELDS = frozenset({"query"})
+
+
+def _normalize(text: str) -> str:
+    """Fold trivial differences (case, spacing, trailing punctuation) in text."""
+    return _WHITESPACE.sub(" ", text).strip().rstrip("?.!").lower()
+
+
+def is_failure(result: str) -> bool:
+    """Whether a tool result is an error message rather than data."""
+    return _FAILURE.match(result) is not None
+
+
+class TurnMemo:
+    """Memo for one agent turn; create a fresh instance per turn.
+
+    Tools not in ``mutating_tools`` are treated as read-only. Reads in
+    ``client_independent_tools`` (e.g. knowledge-base search) survive client
+    writes; every other read is dropped when its client is written. String
+    inputs named in ``text_fields`` are normalized for the memo key.
+    """
+
+    def __init__(
+        self,
+        mutating_tools: Collection[str],
+        client_independent_tools: Collection[str] = (),
+        text_fields: Collection[str] = TEXT_FIELDS,
+    ) -> None:
+        self._mutating = mutating_tools
+        self._global = client_independent_tools
+        self._text_fields = text_fields
+        # key -> (tool name, client_id the entry depends on, result task)
+        self._entries: dict[str, tuple[str, str | None, asyncio.Task[str]]] = {}
+        self.hits = 0
+
+    def wrap(self, execute: ToolExecutor) -> ToolExecutor:
+        """Return an executor that serves repeated reads from the memo."""
+
+        async def _memoized(tool_name: str, tool_input: dict[str, Any]) -> str:
+            client_id = tool_input.get("client_id")
+            if tool_name in self._mutating:
+                self.invalidate(client_id)
+                return await execute(tool_name, tool_input)
+
+            key = json.dumps([tool_name, self._key_input(tool_input)], sort_keys=True)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+                logger.debug("Tool memo hit: %s", tool_name)
+                # Concurrent identical reads share the in-flight call.
+                return await entry[2]
+
+            task = asyncio.ensure_future(execute(tool_name, tool_input))
+            self._entries[key] = (tool_name, client_id, task)
+            try:
+                result = await task
+            except BaseException:
+                self._entries.pop(key, None)
+                raise
+            if is_failure(result):
+                self._entries.pop(key, None)
+            return result
+
+        return _memoized
+
+    def _key_input(self, tool_input: dict[str, Any]) -> dict[str, Any]:
+        return {
+            k: _normalize(v) if k in self._text_fields and isinstance(v, str) else v
+            for k, v in tool_input.items()
+        }
+
+    def invalidate(self, client_id: str | None = None) -> None:
+        """Drop reads that depend on ``client_id``.
+
+        With no client id every client-dependent read is dropped, since the
+        write could have touched any of them.
+        """
+        self._entries = {
+            key: (tool_name, scope, task)
+            for key, (tool_name, scope, task) in self._entries.items()
+            if tool_name in self._global
+            or (client_id is not None and scope is not None and scope != client_id)
+        }
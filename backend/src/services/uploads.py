@@ -0,0 +1,62 @@
+"""Chunked upload copying with incremental hashing and size enforcement."""
+
+import asyncio
+import hashlib
+from pathlib import Path
+
+from fastapi import UploadFile
+from pydantic import BaseModel
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int) -> None:
+        super().__init__(f"File too large (max {max_bytes // (1024 * 1024)} MB)")
+        self.max_bytes = max_bytes
+
+
+class StreamedFile(BaseModel):
+    path: Path
+    size: int
+    sha256: str
+
+
+async def stream_to_file(
+    upload: UploadFile, dest: Path, max_bytes: int
+) -> StreamedFile:
+    """Copy an upload to ``dest`` chunk by chunk.
+
+    Starlette has already spooled the request body by the time a route sees
+    ``upload``, so this does not save the network or spool I/O of an
+    oversized upload; ``BodySizeLimitMiddleware`` refuses those before they
+    are read. Here the sha256 is computed per chunk and ``max_bytes`` is
+    enforced before each write, so the file is never held in memory. Data is
+    written to a ``.part`` sibling and renamed into place only once complete.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise FileTooLargeError(max_bytes)
+
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(f"{dest.name}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    fh = await asyncio.to_thread(part.open, "wb")
+    try:
+        while chunk := await upload.read(CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_bytes:
+                raise FileTooLargeError(max_bytes)
+            digest.update(chunk)
+            await asyncio.to_thread(fh.write, chunk)
+    except BaseException:
+        await asyncio.to_thread(fh.close)
+        part.unlink(missing_ok=True)
+        raise
+    await asyncio.to_thread(fh.close)
+    await asyncio.to_thread(part.replace, dest)
+
+    return StreamedFile(path=dest, size=size, sha256=digest.hexdigest())
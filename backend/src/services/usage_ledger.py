@@ -0,0 +1,355 @@
+"""Asynchronous ledger of every Anthropic and OpenAI call.
+
+Call sites report tokens, latency and retries with ``record``; the request
+or job they run under (endpoint, client) and the agent tool that triggered
+them are picked up from context variables. Records are buffered in memory
+and written to the ``llm_usage`` table in batches by a background task, so
+recording never adds a database round trip to the LLM hot path.
+"""
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from fastapi import Request
+
+from src.config import settings
+from src.models.usage import UsageAggregate, UsageGroupBy, UsageRecord
+from src.services.db import db_reader, db_writer
+
+logger = logging.getLogger(__name__)
+
+# Per-request/job attribution. The dict is shared by everything running for
+# one request so values bound late (e.g. the client id) are still seen.
+_context: ContextVar[dict[str, Any] | None] = ContextVar(
+    "llm_usage_context", default=None
+)
+# Tool calls run in their own tasks, so the tool name lives in its own var.
+_tool_name: ContextVar[str | None] = ContextVar("llm_usage_tool", default=None)
+
+MAX_BUFFERED = 10_000
+
+_GROUP_COLUMNS: dict[str, str] = {
+    "client": "client_id",
+    "endpoint": "endpoint",
+    "operation": "operation",
+    "model": "model",
+    "tool": "tool_name",
+}
+
+
+def new_context(**fields: Any) -> None:
+    """Start a fresh attribution context (one per request or job)."""
+    _context.set(dict(fields))
+
+
+def bind(**fields: Any) -> None:
+    """Add attribution fields (e.g. ``client_id``) to the current context."""
+    current = _context.get()
+    if current is None:
+        new_context(**fields)
+    else:
+        current.update({k: v for k, v in fields.items() if v is not None})
+
+
+def set_tool(name: str | None) -> None:
+    """Attribute calls made from the current task to an agent tool."""
+    _tool_name.set(name)
+
+
+def _endpoint(ctx: dict[str, Any]) -> str | None:
+    if ctx.get("endpoint"):
+        return str(ctx["endpoint"])
+    scope = ctx.get("scope")
+    if scope is None:
+        return None
+    route = scope.get("route")
+    path = getattr(route, "path", None) or scope.get("path", "")
+    return f"{scope.get('method', '')} {path}".strip()
+
+
+def _path_client_id(ctx: dict[str, Any]) -> str | None:
+    scope = ctx.get("scope")
+    if scope is None:
+        return None
+    client_id = scope.get("path_params", {}).get("client_id")
+    return str(client_id) if client_id else None
+
+
+class TrackedCall:
+    """Handle for ``track_anthropic``; set ``usage`` from the response."""
+
+    usage: Any = None
+
+
+class UsageLedger:
+    """In-memory buffer plus a background batch writer."""
+
+    def __init__(self) -> None:
+        self._buffer: list[UsageRecord] = []
+        self._wakeup: asyncio.Event | None = None
+        self._writer: asyncio.Task[None] | None = None
+
+    def record(
+        self,
+        *,
+        provider: str,
+        model: str,
+        operation: str,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        latency_ms: int = 0,
+        retries: int = 0,
+        success: bool = True,
+    ) -> None:
+        """Buffer one call; the writer task (or ``flush``) persists it."""
+        ctx = _context.get() or {}
+        self._buffer.append(
+            UsageRecord(
+                provider=provider,  # type: ignore[arg-type]
+                model=model,
+                operation=operation,
+                endpoint=_endpoint(ctx),
+                client_id=ctx.get("client_id") or _path_client_id(ctx),
+                tool_name=_tool_name.get(),
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cache_read_tokens=cache_read_tokens,
+                cache_write_tokens=cache_write_tokens,
+                latency_ms=latency_ms,
+                retries=retries,
+                success=success,
+            )
+        )
+        if len(self._buffer) > MAX_BUFFERED:
+            # Writer not running or stuck: keep the most recent records.
+            del self._buffer[: len(self._buffer) - MAX_BUFFERED]
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def record_anthropic(
+        self,
+        operation: str,
+        model: str,
+        usage: Any,
+        latency_ms: int,
+        retries: int = 0,
+        success: bool = True,
+    ) -> None:
+        """Record an Anthropic call from its ``usage`` object (may be None)."""
+
+        def _tokens(name: str) -> int:
+            return int(getattr(usage, name, None) or 0)
+
+        self.record(
+            provider="anthropic",
+            model=model,
+            operation=operation,
+            input_tokens=_tokens("input_tokens"),
+            output_tokens=_tokens("output_tokens"),
+            cache_read_tokens=_tokens("cache_read_input_tokens"),
+            cache_write_tokens=_tokens("cache_creation_input_tokens"),
+            latency_ms=latency_ms,
+            retries=retries,
+            success=success,
+        )
+
+    @contextlib.contextmanager
+    def track_anthropic(
+        self, operation: str, model: str, retries: int = 0
+    ) -> Iterator[TrackedCall]:
+        """Time an Anthropic call and record it, including failures."""
+        call = TrackedCall()
+        started = time.monotonic()
+        success = False
+        try:
+            yield call
+            success = True
+        finally:
+            self.record_anthropic(
+                operation,
+                model,
+                call.usage,
+                latency_ms=round((time.monotonic() - started) * 1000),
+                retries=retries,
+                success=success,
+            )
+
+    async def flush(self) -> int:
+        """Write buffered records. Returns the number written."""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            async with db_writer() as db:
+                await db.executemany(
+                    """INSERT INTO llm_usage
+                       (created_at, provider, model, operation, endpoint, client_id,
+                        tool_name, input_tokens, output_tokens, cache_read_tokens,
+                        cache_write_tokens, latency_ms, retries, success)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (
+                            r.created_at.isoformat(),
+                            r.provider,
+                            r.model,
+                            r.operation,
+                            r.endpoint,
+                            r.client_id,
+                            r.tool_name,
+                            r.input_tokens,
+                            r.output_tokens,
+                            r.cache_read_tokens,
+                            r.cache_write_tokens,
+                            r.latency_ms,
+                            r.retries,
+                            1 if r.success else 0,
+                        )
+                        for r in batch
+                    ],
+                )
+                await db.commit()
+        except Exception:
+            logger.exception("Failed to write %d usage records", len(batch))
+            return 0
+        return len(batch)
+
+    async def start(self) -> None:
+        """Start the background writer."""
+        if self._writer is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._writer = asyncio.create_task(
+            self._write_loop(self._wakeup), name="usage-ledger-writer"
+        )
+
+    async def stop(self) -> None:
+        """Stop the writer and flush whatever is still buffered."""
+        if self._writer is not None:
+            self._writer.cancel()
+            await asyncio.gather(self._writer, return_exceptions=True)
+            self._writer = None
+            self._wakeup = None
+        await self.flush()
+
+    async def _write_loop(self, wakeup: asyncio.Event) -> None:
+        while True:
+            await wakeup.wait()
+            # Let a burst of calls accumulate into one batch.
+            await asyncio.sleep(settings.usage_flush_interval)
+            wakeup.clear()
+            await self.flush()
+
+    async def aggregate(
+        self,
+        group_by: UsageGroupBy = "endpoint",
+        since: datetime | None = None,
+        until: datetime | None = None,
+        client_id: str | None = None,
+        endpoint: str | None = None,
+    ) -> list[UsageAggregate]:
+        """Totals and p50/p95 latency per group within a time window.
+
+        ``since`` defaults to ``usage_default_window_days`` ago. Counts and
+        sums are grouped in SQL; the percentiles come from a window query
+        that returns at most two latencies per group.
+        """
+        if since is None:
+            since = datetime.now(UTC) - timedelta(
+                days=settings.usage_default_window_days
+            )
+        clauses = ["created_at >= ?"]
+        params: list[Any] = [since.isoformat()]
+        if until is not None:
+            clauses.append("created_at < ?")
+            params.append(until.isoformat())
+        if client_id:
+            clauses.append("client_id = ?")
+            params.append(client_id)
+        if endpoint:
+            clauses.append("endpoint = ?")
+            params.append(endpoint)
+        where = " AND ".join(clauses)
+        column = _GROUP_COLUMNS[group_by]
+
+        async with db_reader() as db:
+            cursor = await db.execute(
+                f"""SELECT {column} AS key, COUNT(*) AS calls,
+                           SUM(success = 0) AS errors,
+                           SUM(retries) AS retries,
+                           SUM(input_tokens) AS input_tokens,
+                           SUM(output_tokens) AS output_tokens,
+                           SUM(cache_read_tokens) AS cache_read_tokens,
+                           SUM(cache_write_tokens) AS cache_write_tokens,
+                           SUM(latency_ms) AS total_latency_ms
+                    FROM llm_usage WHERE {where}
+                    GROUP BY {column}""",
+                params,
+            )
+            totals = await cursor.fetchall()
+            # Nearest-rank percentiles: rank = ceil(pct / 100 * n), kept in
+            # integer arithmetic as (pct * n + 99) / 100.
+            cursor = await db.execute(
+                f"""WITH ranked AS (
+                        SELECT {column} AS key, latency_ms,
+                               ROW_NUMBER() OVER (
+                                   PARTITION BY {column} ORDER BY latency_ms
+                               ) AS rank,
+                               COUNT(*) OVER (PARTITION BY {column}) AS n
+                        FROM llm_usage WHERE {where}
+                    )
+                    SELECT key,
+                           MAX(CASE WHEN rank = (50 * n + 99) / 100
+                               THEN latency_ms END) AS p50,
+                           MAX(CASE WHEN rank = (95 * n + 99) / 100
+                               THEN latency_ms END) AS p95
+                    FROM ranked
+                    WHERE rank IN ((50 * n + 99) / 100, (95 * n + 99) / 100)
+                    GROUP BY key""",
+                params,
+            )
+            percentiles = {row["key"]: row for row in await cursor.fetchall()}
+
+        results: list[UsageAggregate] = []
+        for row in totals:
+            latency = percentiles.get(row["key"])
+            results.append(
+                UsageAggregate(
+                    key=row["key"],
+                    calls=row["calls"],
+                    errors=row["errors"],
+                    retries=row["retries"],
+                    input_tokens=row["input_tokens"],
+                    output_tokens=row["output_tokens"],
+                    cache_read_tokens=row["cache_read_tokens"],
+                    cache_write_tokens=row["cache_write_tokens"],
+                    latency_p50_ms=latency["p50"] if latency else 0,
+                    latency_p95_ms=latency["p95"] if latency else 0,
+                    total_latency_ms=row["total_latency_ms"],
+                )
+            )
+        results.sort(key=lambda a: a.input_tokens + a.output_tokens, reverse=True)
+        return results
+
+
+# --- Module-level default ledger ---
+_default_ledger = UsageLedger()
+
+record = _default_ledger.record
+record_anthropic = _default_ledger.record_anthropic
+track_anthropic = _default_ledger.track_anthropic
+
+
+def get_usage_ledger(request: Request) -> UsageLedger:
+    """FastAPI dependency that returns the UsageLedger from app state."""
+    ledger: UsageLedger | None = getattr(request.app.state, "usage_ledger", None)
+    if ledger is None:
+        return _default_ledger
+    return ledger
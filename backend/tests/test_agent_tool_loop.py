@@ -0,0 +1,191 @@
+"""Unit tests for the shared Claude tool-use loop (Anthropic API mocked)."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+from src.services.agent_tool_loop import run_tool_loop
+
+TOOLS: list[Any] = [
+    {"name": "a", "description": "A", "input_schema": {"type": "object"}},
+    {"name": "b", "description": "B", "input_schema": {"type": "object"}},
+]
+
+
+def _text_block(text: str) -> MagicMock:
+    return MagicMock(type="text", text=text)
+
+
+def _tool_block(tool_id: str, name: str, tool_input: dict[str, Any]) -> MagicMock:
+    block = MagicMock(type="tool_use", id=tool_id, input=tool_input)
+    block.name = name
+    return block
+
+
+class _FakeStream:
+    """Stands in for ``AsyncMessageStream``: replays text and block events."""
+
+    def __init__(self, blocks: list[MagicMock], log: list[str]) -> None:
+        self._blocks = blocks
+        self._log = log
+
+    async def __aenter__(self) -> "_FakeStream":
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        return None
+
+    async def __aiter__(self) -> AsyncIterator[MagicMock]:
+        for block in self._blocks:
+            if block.type == "text":
+                yield MagicMock(type="text", text=block.text)
+            yield MagicMock(type="content_block_stop", content_block=block)
+            await asyncio.sleep(0.01)
+        self._log.append("stream_end")
+
+    async def get_final_message(self) -> MagicMock:
+        usage = MagicMock(
+            input_tokens=10,
+            cache_creation_input_tokens=0,
+            cache_read_input_tokens=900,
+            output_tokens=5,
+        )
+        return MagicMock(content=self._blocks, usage=usage)
+
+
+def _api(responses: list[list[MagicMock]], log: list[str]) -> MagicMock:
+    api = MagicMock()
+    api.messages.stream = MagicMock(
+        side_effect=[_FakeStream(blocks, log) for blocks in responses]
+    )
+    return api
+
+
+def _run(api: MagicMock, **kwargs: Any) -> list[dict[str, Any]]:
+    async def _collect() -> list[dict[str, Any]]:
+        return [json.loads(e) async for e in run_tool_loop(api_client=api, **kwargs)]
+
+    return asyncio.run(_collect())
+
+
+def test_prompt_cache_breakpoints_and_usage() -> None:
+    api = _api([[_text_block("Hello")]], [])
+    messages: list[Any] = [{"role": "user", "content": "Hi"}]
+
+    events = _run(
+        api,
+        messages=messages,
+        system="Static prompt",
+        system_context="Client: Acme",
+        tools=TOOLS,
+        execute_tool=AsyncMock(),
+    )
+
+    request = api.messages.stream.call_args.kwargs
+    assert request["system"] == [
+        {
+            "type": "text",
+            "text": "Static prompt",
+            "cache_control": {"type": "ephemeral"},
+        },
+        {"type": "text", "text": "Client: Acme"},
+    ]
+    assert "cache_control" not in request["tools"][0]
+    assert request["tools"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert request["messages"][-1]["content"][-1]["cache_control"] == {
+        "type": "ephemeral"
+    }
+    # The caller's history is left untouched
+    assert messages == [{"role": "user", "content": "Hi"}]
+    assert "cache_control" not in TOOLS[-1]
+
+    assert events[0] == {"type": "text", "content": "Hello"}
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["usage"] == {
+        "input_tokens": 10,
+        "cache_creation_input_tokens": 0,
+        "cache_read_input_tokens": 900,
+        "output_tokens": 5,
+    }
+    assert isinstance(done["ttft_ms"], int)
+
+
+def test_tools_start_while_response_streams() -> None:
+    log: list[str] = []
+    api = _api(
+        [
+            [
+                _tool_block("t1", "a", {"n": 1}),
+                _tool_block("t2", "b", {"n": 2}),
+                _text_block("Working on it"),
+            ],
+            [_text_block("Done")],
+        ],
+        log,
+    )
+
+    async def execute(name: str, tool_input: dict[str, Any]) -> str:
+        log.append(name)
+        return f"{name}={tool_input['n']}"
+
+    messages: list[Any] = [{"role": "user", "content": "Go"}]
+    events = _run(api, messages=messages, system="S", tools=TOOLS, execute_tool=execute)
+
+    # Both tools ran, in order, before the first response finished streaming
+    assert log[:3] == ["a", "b", "stream_end"]
+    assert [e["type"] for e in events] == [
+        "tool_use",
+        "tool_use",
+        "text",
+        "text",
+        "done",
+    ]
+    results = messages[2]["content"]
+    assert [(r["tool_use_id"], r["content"]) for r in results] == [
+        ("t1", "a=1"),
+        ("t2", "b=2"),
+    ]
+
+
+def test_read_tools_run_concurrently_and_writes_stay_ordered() -> None:
+    log: list[str] = []
+    api = _api(
+        [
+            [
+                _tool_block("t1", "a", {"n": 1}),
+                _tool_block("t2", "b", {"n": 2}),
+                _tool_block("t3", "write", {"n": 3}),
+                _tool_block("t4", "a", {"n": 4}),
+            ],
+            [_text_block("Done")],
+        ],
+        log,
+    )
+
+    async def execute(name: str, tool_input: dict[str, Any]) -> str:
+        log.append(f"start {name}{tool_input['n']}")
+        await asyncio.sleep(0.05)
+        log.append(f"end {name}{tool_input['n']}")
+        return str(tool_input["n"])
+
+    messages: list[Any] = [{"role": "user", "content": "Go"}]
+    _run(
+        api,
+        messages=messages,
+        system="S",
+        tools=TOOLS,
+        execute_tool=execute,
+        mutating_tools={"write"},
+    )
+
+    # The two reads overlap; the write waits for both; the next read waits
+    # for the write.
+    assert log.index("start b2") < log.index("end a1")
+    assert log.index("start write3") > max(log.index("end a1"), log.index("end b2"))
+    assert log.index("start a4") > log.index("end write3")
+    results = messages[2]["content"]
+    assert [r["tool_use_id"] for r in results] == ["t1", "t2", "t3", "t4"]
+    assert [r["content"] for r in results] == ["1", "2", "3", "4"]
@@ -1,6 +1,13 @@
 """Tests for chat session CRUD endpoints."""
 
+import asyncio
+import json
+import sqlite3
+from pathlib import Path
+
 from fastapi.testclient import TestClient
+from src.services import chat_store
+from src.services.migrations.runner import SQL_DIR
 
 
 def test_create_session(client: TestClient) -> None:
@@ -28,7 +35,7 @@ def test_create_session_with_client(client: TestClient) -> None:
 def test_list_sessions_empty(client: TestClient) -> None:
     resp = client.get("/api/consult/sessions")
     assert resp.status_code == 200
-    assert isinstance(resp.json(), list)
+    assert isinstance(resp.json()["items"], list)
 
 
 def test_list_sessions_filtered(client: TestClient) -> None:
@@ -46,7 +53,7 @@ def test_list_sessions_filtered(client: TestClient) -> None:
         "/api/consult/sessions?client_id=client-a"
     )
     assert resp.status_code == 200
-    sessions = resp.json()
+    sessions = resp.json()["items"]
     for s in sessions:
         assert s["client_id"] == "client-a"
 
@@ -92,3 +99,116 @@ def test_delete_session(client: TestClient) -> None:
 def test_delete_session_not_found(client: TestClient) -> None:
     resp = client.delete("/api/consult/sessions/nonexistent")
     assert resp.status_code == 404
+
+
+def test_list_sessions_pages_with_cursor(client: TestClient) -> None:
+    created = {
+        client.post(
+            "/api/consult/sessions", json={"client_id": "cursor-client"}
+        ).json()["session_id"]
+        for _ in range(5)
+    }
+
+    seen: list[str] = []
+    cursor: str | None = None
+    while True:
+        params: dict[str, str | int] = {"client_id": "cursor-client", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/api/consult/sessions", params=params).json()
+        assert data["total"] == 5
+        seen.extend(s["id"] for s in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert set(seen) == created
+
+
+def test_list_sessions_carries_counts_not_messages(client: TestClient) -> None:
+    session_id = client.post(
+        "/api/consult/sessions", json={"client_id": "listing-client"}
+    ).json()["session_id"]
+    messages = [
+        {"role": "user", "content": "Which licence?"},
+        {"role": "assistant", "content": "A banking licence."},
+    ]
+    asyncio.run(chat_store.append_messages(session_id, messages))
+
+    [item] = client.get(
+        "/api/consult/sessions", params={"client_id": "listing-client"}
+    ).json()["items"]
+    assert item["message_count"] == 2
+    assert "messages" not in item
+
+    full = client.get(f"/api/consult/sessions/{session_id}").json()
+    assert full["messages"] == messages
+
+
+def test_list_sessions_rejects_bad_cursor(client: TestClient) -> None:
+    resp = client.get("/api/consult/sessions", params={"cursor": "not-a-cursor"})
+    assert resp.status_code == 400
+
+
+def test_append_messages_and_tail_window(client: TestClient) -> None:
+    async def _run() -> None:
+        session = await chat_store.create_session()
+        count = await chat_store.append_messages(
+            session.id, [{"role": "user", "content": "q0"}], title="First"
+        )
+        assert count == 1
+        for n in range(1, 6):
+            role = "assistant" if n % 2 else "user"
+            count = await chat_store.append_messages(
+                session.id, [{"role": role, "content": f"m{n}"}]
+            )
+        assert count == 6
+        await chat_store.update_summary(session.id, "earlier", 2)
+
+        full = await chat_store.get_session(session.id)
+        assert full is not None
+        assert full.title == "First"
+        assert full.message_count == 6
+        assert [m["content"] for m in full.messages] == [
+            "q0", "m1", "m2", "m3", "m4", "m5"
+        ]
+
+        loaded = await chat_store.get_session_tail(session.id, limit=3)
+        assert loaded is not None
+        head, tail = loaded
+        assert head.messages == []
+        assert [m["content"] for m in tail] == ["m3", "m4", "m5"]
+        window = await chat_store.get_messages(session.id, 2, 4)
+        assert [m["content"] for m in window] == ["m2", "m3"]
+
+        assert await chat_store.append_messages("missing", [{"content": "x"}]) is None
+
+    asyncio.run(_run())
+
+
+def test_migration_splits_legacy_message_arrays(tmp_path: Path) -> None:
+    db = sqlite3.connect(tmp_path / "legacy.db")
+    for sql_file in sorted(SQL_DIR.glob("*.sql")):
+        if sql_file.name.startswith("015"):
+            legacy = [
+                {"role": "user", "content": "Hello"},
+                {"role": "assistant", "content": "Hi"},
+            ]
+            db.execute(
+                "INSERT INTO chat_sessions (id, messages, created_at, updated_at)"
+                " VALUES ('legacy', ?, 't', 't')",
+                (json.dumps(legacy),),
+            )
+        db.executescript(sql_file.read_text())
+
+    rows = db.execute(
+        "SELECT seq, role, content FROM chat_messages WHERE session_id = 'legacy'"
+        " ORDER BY seq"
+    ).fetchall()
+    session = db.execute(
+        "SELECT messages, message_count FROM chat_sessions WHERE id = 'legacy'"
+    ).fetchone()
+    db.close()
+    assert rows == [(0, "user", "Hello"), (1, "assistant", "Hi")]
+    assert session == ("[]", 2)
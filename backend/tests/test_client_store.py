@@ -0,0 +1,136 @@
+"""Tests for the normalized client storage layout."""
+
+import asyncio
+from collections.abc import Awaitable
+
+from src.models.client import ChecklistItem, Client, FlaggedItem
+from src.services import client_store
+from src.services.db import get_db
+
+
+def _client(client_id: str) -> Client:
+    return Client(
+        id=client_id,
+        company_name="Norm AG",
+        services=["payments"],
+        checklist=[
+            ChecklistItem(
+                id=f"item-{i}",
+                category="Stage 1",
+                item=f"Item {i}",
+                required_for="finma",
+                depends_on=[f"item-{i - 1}"] if i else [],
+            )
+            for i in range(5)
+        ],
+        flags=[FlaggedItem(id="f1", field="aml", reason="none", severity="info")],
+        conversation_history=[
+            {"role": "user", "content": "Hello"},
+            {"role": "assistant", "content": "Hi there"},
+        ],
+    )
+
+
+async def _count_inserts(table: str, action: Awaitable[None]) -> int:
+    """Run ``action`` and count the rows it inserted into ``table``."""
+    db = await get_db()
+    try:
+        await db.execute("CREATE TABLE IF NOT EXISTS _test_inserts (tbl TEXT)")
+        await db.execute(
+            f"CREATE TRIGGER _test_count AFTER INSERT ON {table}"
+            f" BEGIN INSERT INTO _test_inserts VALUES ('{table}'); END"
+        )
+        await db.execute("DELETE FROM _test_inserts")
+        await db.commit()
+        await action
+        cursor = await db.execute("SELECT COUNT(*) FROM _test_inserts")
+        count = (await cursor.fetchone())[0]
+        await db.execute("DROP TRIGGER _test_count")
+        await db.commit()
+        return int(count)
+    finally:
+        await db.close()
+
+
+def test_round_trip_preserves_client() -> None:
+    async def _run() -> tuple[Client, Client | None, Client | None]:
+        client = _client("norm-roundtrip")
+        await client_store.save_client(client)
+        return (
+            client,
+            await client_store.get_client(client.id),
+            await client_store.get_client(client.id, include_history=False),
+        )
+
+    original, loaded, without_history = asyncio.run(_run())
+    assert loaded == original
+    assert without_history is not None
+    assert without_history.conversation_history == []
+    assert without_history.checklist == original.checklist
+
+
+def test_save_writes_only_changed_rows() -> None:
+    async def _run() -> tuple[int, int, Client | None]:
+        client = _client("norm-targeted")
+        await client_store.save_client(client)
+
+        client.checklist[3].status = "complete"
+        checklist_writes = await _count_inserts(
+            "client_checklist_items", client_store.save_client(client)
+        )
+        client.conversation_history.append({"role": "user", "content": "More"})
+        message_writes = await _count_inserts(
+            "onboarding_messages", client_store.save_client(client)
+        )
+        return (
+            checklist_writes,
+            message_writes,
+            await client_store.get_client(client.id),
+        )
+
+    checklist_writes, message_writes, stored = asyncio.run(_run())
+    assert checklist_writes == 1
+    assert message_writes == 1
+    assert stored is not None
+    assert stored.checklist[3].status == "complete"
+    assert [m["content"] for m in stored.conversation_history] == [
+        "Hello",
+        "Hi there",
+        "More",
+    ]
+
+
+def test_legacy_blob_rows_are_readable_and_backfilled() -> None:
+    async def _run() -> tuple[Client | None, int, Client | None, str]:
+        legacy = _client("norm-legacy")
+        db = await get_db()
+        try:
+            await db.execute(
+                "INSERT INTO clients (id, data, layout) VALUES (?, ?, 1)",
+                (legacy.id, legacy.model_dump_json(exclude={"version"})),
+            )
+            await db.commit()
+        finally:
+            await db.close()
+
+        before = await client_store.get_client(legacy.id)
+        converted = await client_store.backfill_normalized(batch_size=1)
+        after = await client_store.get_client(legacy.id)
+
+        db = await get_db()
+        try:
+            cursor = await db.execute(
+                "SELECT data FROM clients WHERE id = ?", (legacy.id,)
+            )
+            data = (await cursor.fetchone())[0]
+        finally:
+            await db.close()
+        return before, converted, after, data
+
+    before, converted, after, data = asyncio.run(_run())
+    assert before is not None
+    assert converted >= 1
+    assert after == before
+    assert len(after.checklist) == 5
+    assert "checklist" not in data
+    assert "conversation_history" not in data
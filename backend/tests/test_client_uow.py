@@ -0,0 +1,195 @@
+"""Tests for the turn-scoped client unit of work."""
+
+import asyncio
+
+import pytest
+from src.models.client import Client, FlaggedItem
+from src.services import client_store
+from src.services.client_store import ClientVersionConflictError
+from src.services.client_uow import ClientUnitOfWork
+
+
+def _flag(flag_id: str) -> FlaggedItem:
+    return FlaggedItem(id=flag_id, field="capital", reason="low", severity="warning")
+
+
+def test_save_client_bumps_version_and_rejects_stale_writes() -> None:
+    async def _run() -> None:
+        client = Client(id="uow-version", company_name="Acme AG")
+        await client_store.save_client(client)
+        stale = await client_store.get_client(client.id)
+        assert stale is not None
+
+        client.company_name = "Acme Holding AG"
+        await client_store.save_client(client, check_version=True)
+        assert client.version == stale.version + 1
+
+        stale.company_name = "Lost Update AG"
+        with pytest.raises(ClientVersionConflictError):
+            await client_store.save_client(stale, check_version=True)
+
+        stored = await client_store.get_client(client.id)
+        assert stored is not None
+        assert stored.company_name == "Acme Holding AG"
+        assert stored.version == client.version
+
+    asyncio.run(_run())
+
+
+def test_mutations_are_written_once_at_flush() -> None:
+    async def _run() -> tuple[Client | None, int]:
+        client = Client(id="uow-flush")
+        await client_store.save_client(client)
+        start_version = client.version
+
+        uow = ClientUnitOfWork()
+        await uow.mutate(client.id, lambda c: setattr(c, "company_name", "Beta AG"))
+        await uow.mutate(client.id, lambda c: c.flags.append(_flag("f1")))
+        cached = await uow.get(client.id)
+        assert cached is not None and cached.company_name == "Beta AG"
+
+        unsaved = await client_store.get_client(client.id)
+        assert unsaved is not None and unsaved.company_name == ""
+
+        await uow.flush()
+        assert not uow.dirty
+        return await client_store.get_client(client.id), start_version
+
+    stored, start_version = asyncio.run(_run())
+    assert stored is not None
+    assert stored.company_name == "Beta AG"
+    assert [f.id for f in stored.flags] == ["f1"]
+    assert stored.version == start_version + 1
+
+
+def test_flush_replays_changes_after_a_concurrent_write() -> None:
+    async def _run() -> Client | None:
+        client = Client(id="uow-conflict")
+        await client_store.save_client(client)
+
+        uow = ClientUnitOfWork()
+        await uow.mutate(client.id, lambda c: c.flags.append(_flag("agent")))
+
+        # Another writer saves the client while the turn is running.
+        other = await client_store.get_client(client.id)
+        assert other is not None
+        other.contact_name = "Jane Doe"
+        await client_store.save_client(other)
+
+        await uow.flush()
+        return await client_store.get_client(client.id)
+
+    stored = asyncio.run(_run())
+    assert stored is not None
+    assert stored.contact_name == "Jane Doe"
+    assert [f.id for f in stored.flags] == ["agent"]
+
+
+def test_consultant_tools_share_one_load_and_one_save(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from src.services.consultant_agent import _execute_tool
+
+    async def _run() -> tuple[int, Client | None]:
+        await client_store.save_client(Client(id="uow-tools"))
+        loads = 0
+        real_get = client_store.get_client
+
+        async def counting_get(client_id: str) -> Client | None:
+            nonlocal loads
+            loads += 1
+            return await real_get(client_id)
+
+        monkeypatch.setattr(client_store, "get_client", counting_get)
+        uow = ClientUnitOfWork()
+        for tool_name, tool_input in [
+            ("get_client", {}),
+            ("update_client_field", {"field": "company_name", "value": "Gamma"}),
+            ("flag_item", {"field": "aml", "reason": "none", "severity": "info"}),
+            ("analyze_gaps", {}),
+        ]:
+            await _execute_tool(
+                uow, tool_name, {"client_id": "uow-tools", **tool_input}
+            )
+        monkeypatch.setattr(client_store, "get_client", real_get)
+        await uow.flush()
+        return loads, await client_store.get_client("uow-tools")
+
+    loads, stored = asyncio.run(_run())
+    assert loads == 1
+    assert stored is not None
+    assert stored.company_name == "Gamma"
+    assert len(stored.flags) == 1
+
+
+def test_update_client_fields_applies_valid_fields_in_one_write() -> None:
+    from src.services.claude_agent import _execute_tool
+
+    async def _run() -> tuple[str, Client | None, int]:
+        client = Client(id="uow-batch")
+        await client_store.save_client(client)
+        start_version = client.version
+        uow = ClientUnitOfWork()
+        result = await _execute_tool(
+            uow,
+            client.id,
+            "update_client_fields",
+            {
+                "fields": {
+                    "company_name": "Delta AG",
+                    "legal_structure": "AG (stock corporation)",
+                    "existing_capital_chf": "lots",
+                    "favourite_colour": "blue",
+                }
+            },
+        )
+        await uow.flush()
+        return result, await client_store.get_client(client.id), start_version
+
+    result, stored, start_version = asyncio.run(_run())
+    assert result.startswith("Updated 2 of 4 fields.")
+    assert "- existing_capital_chf:" in result
+    assert "- favourite_colour: unknown field" in result
+    assert stored is not None
+    assert stored.company_name == "Delta AG"
+    assert stored.legal_structure == "AG"
+    assert stored.existing_capital_chf is None
+    assert stored.version == start_version + 1
+
+
+def test_checklist_tool_writes_in_place_after_pending_changes() -> None:
+    from src.models.client import ChecklistItem
+    from src.services.consultant_agent import _execute_tool
+
+    async def _run() -> tuple[Client | None, Client | None]:
+        await client_store.save_client(
+            Client(
+                id="uow-in-place",
+                checklist=[
+                    ChecklistItem(id="c1", category="c", item="Form", required_for="x")
+                ],
+            )
+        )
+        uow = ClientUnitOfWork()
+        await _execute_tool(
+            uow,
+            "update_client_field",
+            {"client_id": "uow-in-place", "field": "company_name", "value": "Delta"},
+        )
+        # Someone else edits the client while the turn runs.
+        await client_store.update_client("uow-in-place", {"contact_name": "UI"})
+        await _execute_tool(
+            uow,
+            "update_checklist_item",
+            {"client_id": "uow-in-place", "item_id": "c1", "status": "complete"},
+        )
+        cached = await uow.get("uow-in-place")
+        await uow.flush()
+        return cached, await client_store.get_client("uow-in-place")
+
+    cached, stored = asyncio.run(_run())
+    assert stored is not None and cached is not None
+    assert stored.company_name == "Delta"
+    assert stored.contact_name == "UI"
+    assert stored.checklist[0].status == "complete"
+    assert cached.checklist[0].status == "complete"
@@ -1,5 +1,7 @@
 """Tests for client CRUD endpoints."""
 
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -110,3 +112,97 @@ def test_update_boolean_and_int_fields(
     )
     assert resp.status_code == 200
     assert resp.json()[field] == value
+
+
+
+def test_list_clients_reads_summaries_with_real_total(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from src.models.client import ChecklistItem, Client
+    from src.services import client_store
+
+    for name in ("Page A", "Page B", "Page C"):
+        client.post("/api/clients", json={"company_name": name})
+    checklist = [
+        ChecklistItem(id=f"i{n}", category="c", item="x", required_for="finma")
+        for n in range(3)
+    ]
+    checklist[0].status = "complete"
+    asyncio.run(
+        client_store.save_client(
+            Client(id="page-d", company_name="Page D", checklist=checklist)
+        )
+    )
+
+    def _no_full_clients(*args: object, **kwargs: object) -> None:
+        raise AssertionError("list endpoint parsed full clients")
+
+    monkeypatch.setattr(client_store, "_load_clients", _no_full_clients)
+    resp = client.get("/api/clients", params={"limit": 2})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert len(data["items"]) == 2
+    assert data["total"] >= 4
+    newest = data["items"][0]
+    assert newest["company_name"] == "Page D"
+    assert (newest["completed_items"], newest["total_items"]) == (1, 3)
+
+
+def test_checklist_and_flag_updates_use_version_preconditions(
+    client: TestClient,
+) -> None:
+    from src.models.client import ChecklistItem, Client, FlaggedItem
+    from src.services import client_store
+
+    asyncio.run(
+        client_store.save_client(
+            Client(
+                id="cas-client",
+                company_name="CAS AG",
+                checklist=[
+                    ChecklistItem(id=f"c{n}", category="c", item="x", required_for="x")
+                    for n in range(2)
+                ],
+                flags=[FlaggedItem(id="f1", field="aml", reason="r", severity="info")],
+            )
+        )
+    )
+    etag = client.get("/api/clients/cas-client").headers["etag"]
+
+    resp = client.patch(
+        "/api/clients/cas-client/checklist/c1",
+        json={"status": "complete", "notes": "done"},
+        headers={"If-Match": etag},
+    )
+    assert resp.status_code == 200
+    new_etag = resp.headers["etag"]
+    assert new_etag != etag
+    items = {i["id"]: i for i in resp.json()["checklist"]}
+    assert (items["c1"]["status"], items["c1"]["notes"]) == ("complete", "done")
+    assert items["c0"]["status"] == "not_started"
+
+    stale = client.patch(
+        "/api/clients/cas-client/flags/f1",
+        json={"resolution_notes": "ok"},
+        headers={"If-Match": etag},
+    )
+    assert stale.status_code == 409
+
+    resp = client.patch(
+        "/api/clients/cas-client/flags/f1",
+        json={"resolution_notes": "ok"},
+        headers={"If-Match": new_etag},
+    )
+    assert resp.status_code == 200
+    assert resp.json()["flags"][0]["resolved"] is True
+
+    missing = client.patch(
+        "/api/clients/cas-client/checklist/nope", json={"status": "complete"}
+    )
+    assert missing.status_code == 404
+    summary = next(
+        c
+        for c in client.get("/api/clients", params={"limit": 100}).json()["items"]
+        if c["id"] == "cas-client"
+    )
+    assert (summary["completed_items"], summary["total_items"]) == (1, 2)
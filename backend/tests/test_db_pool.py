@@ -0,0 +1,193 @@
+"""Tests for the pooled SQLite connections."""
+
+import asyncio
+
+from src.services.db import DatabasePool, get_db
+
+
+def test_pool_uses_wal_and_lets_reads_run_during_a_write() -> None:
+    async def _run() -> tuple[str, int, dict[str, dict[str, float]]]:
+        pool = DatabasePool()
+        await pool.open(readers=2)
+        try:
+            async with pool.reader() as db:
+                cursor = await db.execute("PRAGMA journal_mode")
+                journal_mode = (await cursor.fetchone())[0]
+
+            write_started = asyncio.Event()
+            release_write = asyncio.Event()
+
+            async def _slow_write() -> None:
+                async with pool.writer() as db:
+                    await db.execute(
+                        "INSERT OR REPLACE INTO clients (id, data) VALUES (?, ?)",
+                        ("pool-test", '{"id": "pool-test"}'),
+                    )
+                    write_started.set()
+                    await release_write.wait()
+                    await db.commit()
+
+            writer = asyncio.create_task(_slow_write())
+            await write_started.wait()
+            # Readers proceed while the write transaction is still open and
+            # do not see its uncommitted row.
+            async with pool.reader() as db:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) FROM clients WHERE id = 'pool-test'"
+                )
+                visible = (await cursor.fetchone())[0]
+            release_write.set()
+            await writer
+            return journal_mode, visible, pool.stats()
+        finally:
+            await pool.close()
+
+    journal_mode, visible, stats = asyncio.run(_run())
+    assert journal_mode == "wal"
+    assert visible == 0
+    assert stats["read"]["acquired"] == 2
+    assert stats["write"]["acquired"] == 1
+
+
+def test_writer_rolls_back_uncommitted_work_and_is_reusable() -> None:
+    async def _run() -> int:
+        pool = DatabasePool()
+        await pool.open(readers=1)
+        try:
+            try:
+                async with pool.writer() as db:
+                    await db.execute(
+                        "INSERT INTO clients (id, data) VALUES ('pool-rollback', '{}')"
+                    )
+                    raise RuntimeError("boom")
+            except RuntimeError:
+                pass
+            async with pool.writer() as db:
+                cursor = await db.execute(
+                    "SELECT COUNT(*) FROM clients WHERE id = 'pool-rollback'"
+                )
+                return (await cursor.fetchone())[0]
+        finally:
+            await pool.close()
+
+    assert asyncio.run(_run()) == 0
+
+
+def test_unopened_pool_falls_back_to_fresh_connections() -> None:
+    async def _run() -> int:
+        pool = DatabasePool()
+        async with pool.reader() as db:
+            cursor = await db.execute("SELECT 1")
+            return (await cursor.fetchone())[0]
+
+    assert asyncio.run(_run()) == 1
+
+
+def test_concurrent_writers_share_one_commit_and_failures_stay_isolated() -> None:
+    async def _run() -> tuple[set[str], dict[str, dict[str, float]]]:
+        pool = DatabasePool()
+        await pool.open(readers=1)
+        try:
+
+            async def _write(i: int) -> str:
+                async with pool.writer() as db:
+                    await db.execute(
+                        "INSERT OR REPLACE INTO clients (id, data) VALUES (?, '{}')",
+                        (f"group-{i}",),
+                    )
+                    if i == 3:
+                        raise RuntimeError("boom")
+                    await db.commit()
+                # Once the block exits the write is committed and readable.
+                async with pool.reader() as db:
+                    cursor = await db.execute(
+                        "SELECT id FROM clients WHERE id = ?", (f"group-{i}",)
+                    )
+                    row = await cursor.fetchone()
+                assert row is not None
+                return str(row[0])
+
+            results = await asyncio.gather(
+                *(_write(i) for i in range(6)), return_exceptions=True
+            )
+            async with pool.reader() as db:
+                cursor = await db.execute(
+                    "SELECT id FROM clients WHERE id LIKE 'group-%'"
+                )
+                stored = {row[0] for row in await cursor.fetchall()}
+            assert isinstance(results[3], RuntimeError)
+            assert [r for i, r in enumerate(results) if i != 3] == [
+                f"group-{i}" for i in (0, 1, 2, 4, 5)
+            ]
+            return stored, pool.stats()
+        finally:
+            await pool.close()
+
+    stored, stats = asyncio.run(_run())
+    assert stored == {f"group-{i}" for i in (0, 1, 2, 4, 5)}
+    assert stats["group_commit"]["ops"] == 5
+    assert stats["group_commit"]["commits"] < 5
+
+
+def test_rollback_inside_a_writer_only_undoes_that_block() -> None:
+    async def _run() -> set[str]:
+        pool = DatabasePool()
+        await pool.open(readers=1)
+        try:
+
+            async def _write(row_id: str, keep: bool) -> None:
+                async with pool.writer() as db:
+                    await db.execute(
+                        "INSERT OR REPLACE INTO clients (id, data) VALUES (?, '{}')",
+                        (row_id,),
+                    )
+                    if keep:
+                        await db.commit()
+                    else:
+                        await db.rollback()
+
+            await asyncio.gather(
+                _write("savepoint-kept", True), _write("savepoint-dropped", False)
+            )
+            async with pool.reader() as db:
+                cursor = await db.execute(
+                    "SELECT id FROM clients WHERE id LIKE 'savepoint-%'"
+                )
+                return {row[0] for row in await cursor.fetchall()}
+        finally:
+            await pool.close()
+
+    assert asyncio.run(_run()) == {"savepoint-kept"}
+
+
+def test_failed_writer_block_releases_the_database_write_lock() -> None:
+    async def _run() -> int:
+        pool = DatabasePool()
+        await pool.open(readers=1)
+        try:
+            try:
+                async with pool.writer() as db:
+                    await db.execute(
+                        "INSERT INTO clients (id, data) VALUES ('pool-raise', '{}')"
+                    )
+                    raise RuntimeError("conflict")
+            except RuntimeError:
+                pass
+            # Another connection (e.g. a second worker) can write right away.
+            other = await get_db()
+            try:
+                await other.execute("PRAGMA busy_timeout = 0")
+                await other.execute("BEGIN IMMEDIATE")
+                await other.rollback()
+                cursor = await other.execute(
+                    "SELECT COUNT(*) FROM clients WHERE id = 'pool-raise'"
+                )
+                row = await cursor.fetchone()
+                assert row is not None
+                return int(row[0])
+            finally:
+                await other.close()
+        finally:
+            await pool.close()
+
+    assert asyncio.run(_run()) == 0
@@ -1,7 +1,8 @@
-"""Tests for dependency injection (get_rag_service)."""
+"""Tests for dependency injection (get_rag_service, get_llm_clients)."""
 
 from unittest.mock import MagicMock
 
+from src.services.llm_clients import LLMClients, _default_clients, get_llm_clients
 from src.services.rag_service import RAGService, _default_instance, get_rag_service
 from starlette.datastructures import State
 from starlette.requests import Request
@@ -35,3 +36,20 @@ def test_get_rag_service_returns_instance_from_app_state() -> None:
     result = get_rag_service(request)
     assert result is custom
     assert result is not _default_instance
+
+
+def test_get_llm_clients_prefers_app_state() -> None:
+    """Shared LLM clients come from app.state, falling back to the default."""
+    assert get_llm_clients(_make_request(State())) is _default_clients
+
+    custom = LLMClients()
+    state = State()
+    state.llm_clients = custom
+    assert get_llm_clients(_make_request(state)) is custom
+
+
+def test_llm_clients_are_reused() -> None:
+    """The same pooled client is returned on every access."""
+    clients = LLMClients()
+    assert clients.anthropic is clients.anthropic
+    assert clients.openai is clients.openai
@@ -1,8 +1,19 @@
 """Tests for document upload, listing, and verification endpoints."""
 
+import asyncio
+import hashlib
 import io
+import json
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import pytest
 from fastapi.testclient import TestClient
+from src.config import settings
+from src.models.client import ClientDocument
+from src.services import document_store
+from src.services.document_text_store import extract_text
+from src.services.document_verifier import verify_document
 
 
 def _create_client(client: TestClient) -> str:
@@ -49,7 +60,7 @@ def test_list_documents(client: TestClient) -> None:
     _upload(client, client_id, "doc-a")
     resp = client.get(f"/api/client-documents/{client_id}")
     assert resp.status_code == 200
-    docs = resp.json()
+    docs = resp.json()["items"]
     assert len(docs) >= 1
     assert any(d["document_id"] == "doc-a" for d in docs)
 
@@ -87,3 +98,183 @@ def test_download_document(client: TestClient) -> None:
     resp = client.get(f"/api/client-documents/{client_id}/doc-dl/download")
     assert resp.status_code == 200
     assert resp.content == content
+
+
+def test_upload_caches_extracted_text(client: TestClient) -> None:
+    client_id = _create_client(client)
+    content = b"Organisational regulations, Section 3.2 delegation matrix."
+    data = _upload(client, client_id, "doc-text", content=content)
+
+    async def _read_text() -> str | None:
+        doc = await document_store.get_document(client_id, "doc-text")
+        assert doc is not None
+        assert doc.content_hash == hashlib.sha256(content).hexdigest()
+        doc_text = await document_store.get_document_text(doc)
+        return doc_text.text if doc_text else None
+
+    with patch(
+        "src.services.document_text_store.extract_text",
+        side_effect=AssertionError("text should come from the cache"),
+    ):
+        assert asyncio.run(_read_text()) == content.decode()
+    assert data["document_id"] == "doc-text"
+
+
+def test_extraction_cache_skips_failures_and_other_inputs(tmp_path: Path) -> None:
+    from src.services import document_text_store
+
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"Risk appetite statement.")
+
+    async def _run() -> None:
+        with patch(
+            "src.services.document_text_store.extract_text",
+            side_effect=OSError("disk hiccup"),
+        ):
+            failed = await document_text_store.extract_and_cache(
+                path, "text/plain", "hash-1"
+            )
+        assert failed.text == ""
+        assert await document_text_store.get_text("hash-1") is None
+
+        ok = await document_text_store.extract_and_cache(path, "text/plain", "hash-1")
+        assert ok.text == "Risk appetite statement."
+        assert await document_text_store.get_text("hash-1") is not None
+        assert (
+            await document_text_store.get_text("hash-1", content_type="text/csv")
+            is None
+        )
+        assert await document_text_store.get_text("hash-1", suffix=".pdf") is None
+
+    asyncio.run(_run())
+
+
+def test_extract_text_pdf_page_offsets(tmp_path: Path) -> None:
+    from src.services.demo_seeder import _make_pdf
+
+    path = tmp_path / "concept.pdf"
+    path.write_bytes(_make_pdf("Business Concept", "Deposit volumes for Year 1."))
+    text, offsets, metadata = extract_text(path, "application/pdf")
+    assert "Business Concept" in text
+    assert offsets == [0]
+    assert metadata["page_count"] == 1
+
+
+def test_upload_too_large_keeps_previous(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client_id = _create_client(client)
+    _upload(client, client_id, "doc-big", content=b"original")
+    monkeypatch.setattr("src.routes.client_documents.MAX_FILE_SIZE", 16)
+
+    resp = client.post(
+        f"/api/client-documents/{client_id}/upload?document_id=doc-big",
+        files={"file": ("big.txt", io.BytesIO(b"x" * 64), "text/plain")},
+    )
+    assert resp.status_code == 413
+
+    resp = client.get(f"/api/client-documents/{client_id}/doc-big/download")
+    assert resp.content == b"original"
+
+
+def test_oversized_body_is_refused_before_it_is_read(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    client_id = _create_client(client)
+    monkeypatch.setattr(settings, "max_request_body_bytes", 1024)
+    url = f"/api/client-documents/{client_id}/upload?document_id=doc-huge"
+
+    resp = client.post(
+        url, files={"file": ("huge.txt", io.BytesIO(b"x" * 4096), "text/plain")}
+    )
+    assert resp.status_code == 413
+    assert "too large" in resp.json()["detail"]
+
+    # Without a Content-Length the body is counted as it arrives.
+    head = (
+        b"--b\r\nContent-Disposition: form-data; name=file; filename=huge.txt\r\n\r\n"
+    )
+    resp = client.post(
+        url,
+        content=iter([head, *[b"x" * 512] * 8, b"\r\n--b--\r\n"]),
+        headers={"Content-Type": "multipart/form-data; boundary=b"},
+    )
+    assert resp.status_code == 413
+    assert client.get(f"/api/client-documents/{client_id}/doc-huge").status_code == 404
+
+
+def test_failed_reupload_keeps_previous(client: TestClient) -> None:
+    client_id = _create_client(client)
+    _upload(client, client_id, "doc-keep", content=b"original")
+
+    with (
+        patch.object(
+            document_store, "save_document", AsyncMock(side_effect=OSError("full"))
+        ),
+        pytest.raises(OSError, match="full"),
+    ):
+        _upload(client, client_id, "doc-keep", content=b"replacement")
+
+    resp = client.get(f"/api/client-documents/{client_id}/doc-keep/download")
+    assert resp.content == b"original"
+    upload_dir = document_store.UPLOAD_DIR / client_id
+    assert [p.read_bytes() for p in upload_dir.iterdir()] == [b"original"]
+
+
+def test_verify_all_streams_results_and_summary(client: TestClient) -> None:
+    client_id = _create_client(client)
+    for doc_id in ("doc-v1", "doc-v2", "doc-v3"):
+        _upload(client, client_id, doc_id, content=f"{doc_id} content".encode())
+
+    async def fake_verify(
+        doc: ClientDocument, expected_name: str, **kwargs: object
+    ) -> tuple[ClientDocument, bool]:
+        await asyncio.sleep(0)
+        status = "rejected" if doc.document_id == "doc-v2" else "verified"
+        return doc.model_copy(update={"status": status}), doc.document_id == "doc-v3"
+
+    with patch(
+        "src.services.document_verifier.verify_document", side_effect=fake_verify
+    ):
+        resp = client.post(f"/api/client-documents/{client_id}/verify-all")
+    assert resp.status_code == 200
+
+    events = [
+        json.loads(line[len("data: ") :])
+        for line in resp.text.splitlines()
+        if line.startswith("data: ")
+    ]
+    assert events[0] == {"type": "start", "total": 3}
+    docs = [e["document"] for e in events if e["type"] == "document"]
+    assert {d["document_id"] for d in docs} == {"doc-v1", "doc-v2", "doc-v3"}
+    summary = events[-1]
+    assert summary["type"] == "summary"
+    assert (summary["verified"], summary["rejected"]) == (2, 1)
+    assert summary["cache_hits"] == 1
+
+
+def test_verify_document_uses_llm_cache(client: TestClient) -> None:
+    client_id = _create_client(client)
+    _upload(client, client_id, "doc-cache", content=b"A complete business plan text.")
+
+    message = MagicMock()
+    message.content = [MagicMock(text='{"status": "verified", "reason": "Looks good"}')]
+    api = MagicMock()
+    api.messages.create = AsyncMock(return_value=message)
+
+    async def _verify(use_cache: bool = True) -> tuple[ClientDocument, bool]:
+        doc = await document_store.get_document(client_id, "doc-cache")
+        assert doc is not None
+        return await verify_document(
+            doc, "Business plan", use_cache=use_cache, api_client=api
+        )
+
+    first, first_cached = asyncio.run(_verify())
+    second, second_cached = asyncio.run(_verify())
+    _, refreshed_cached = asyncio.run(_verify(use_cache=False))
+
+    assert (first.status, first_cached) == ("verified", False)
+    assert (second.status, second.verification_result) == ("verified", "Looks good")
+    assert second_cached is True
+    assert refreshed_cached is False
+    assert api.messages.create.await_count == 2
@@ -90,3 +90,21 @@ def test_toggle_resolve(client: TestClient) -> None:
 def test_toggle_resolve_not_found(client: TestClient) -> None:
     resp = client.patch("/api/ehp/nonexistent/resolve")
     assert resp.status_code == 404
+
+
+def test_generate_refresh_gets_its_own_job(client: TestClient) -> None:
+    client_id = _create_client(client)
+    url = f"/api/ehp/{client_id}/banking-1-1/generate"
+    job = client.post(url, json={}).json()
+    assert client.post(url, json={}).json()["id"] == job["id"]
+
+    fresh = client.post(url, json={"refresh": True}).json()
+    assert fresh["id"] != job["id"]
+    assert fresh["payload"]["refresh"] is True
+
+    # Different request inputs get their own job as well.
+    described = client.post(
+        url, json={"document_description": "Board rules, revised"}
+    ).json()
+    assert described["id"] not in (job["id"], fresh["id"])
+    assert described["payload"]["document_description"] == "Board rules, revised"
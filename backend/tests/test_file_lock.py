@@ -0,0 +1,38 @@
+"""Tests for the cross-process startup locks."""
+
+import asyncio
+from pathlib import Path
+
+from src.services.file_lock import FileLock
+
+
+def test_only_one_holder_until_released(tmp_path: Path) -> None:
+    path = tmp_path / "startup.lock"
+    first, second = FileLock(path), FileLock(path)
+
+    assert first.try_acquire()
+    assert not second.try_acquire()
+    assert not second.held
+
+    first.release()
+    assert second.try_acquire()
+    second.release()
+
+
+def test_acquire_waits_for_the_holder(tmp_path: Path) -> None:
+    path = tmp_path / "migrate.lock"
+    holder = FileLock(path)
+    assert holder.try_acquire()
+
+    async def _run() -> bool:
+        waiter = FileLock(path)
+        task = asyncio.create_task(waiter.acquire())
+        await asyncio.sleep(0.05)
+        blocked = not task.done()
+        holder.release()
+        await asyncio.wait_for(task, timeout=5)
+        acquired = waiter.held
+        waiter.release()
+        return blocked and acquired
+
+    assert asyncio.run(_run())
@@ -1,6 +1,12 @@
 """Tests for the gap analysis service."""
 
+import asyncio
+from datetime import date
+
+from fastapi.testclient import TestClient
 from src.models.client import ChecklistItem, Client, FlaggedItem
+from src.services import client_store, gap_store
+from src.services.checklist_graph import ChecklistGraph
 from src.services.gap_analyzer import (
     _check_capital,
     _check_checklist,
@@ -231,6 +237,65 @@ def test_next_steps_for_bare_client() -> None:
     assert steps[0].priority == 1
 
 
+def _item(
+    item_id: str, days: int, *deps: str, status: str = "not_started"
+) -> ChecklistItem:
+    return ChecklistItem.model_validate(
+        {
+            "id": item_id,
+            "category": "compliance",
+            "item": f"Item {item_id}",
+            "status": status,
+            "required_for": "finma",
+            "estimated_days": days,
+            "depends_on": list(deps),
+        }
+    )
+
+
+def test_next_steps_look_past_blocked_items() -> None:
+    # The first five not-started items all wait on "gate"; the ready ones
+    # come after them and must still be suggested.
+    checklist = [_item("gate", 10), *(_item(f"w{i}", 1, "gate") for i in range(5))]
+    checklist += [_item("free-1", 2), _item("free-2", 3)]
+    client = _make_client(checklist=checklist)
+    steps = _generate_next_steps(client, "finma_banking")
+    assert [s.action for s in steps] == ["Item gate", "Item free-2", "Item free-1"]
+
+
+# --- ChecklistGraph ---
+
+
+def test_graph_orders_and_finds_the_critical_path() -> None:
+    graph = ChecklistGraph(
+        [
+            _item("report", 5, "policy", "auditor"),
+            _item("policy", 20, "officer"),
+            _item("officer", 10, status="complete"),
+            _item("auditor", 14),
+            _item("vendor", 3),
+        ]
+    )
+    order = graph.order
+    assert order.index("officer") < order.index("policy") < order.index("report")
+    assert graph.dependents["policy"] == ["report"]
+    # officer is done, so policy (20) gates report (5): 25 days in total.
+    assert graph.remaining_days == 25
+    assert graph.critical_path == ["policy", "report"]
+    assert graph.slack["auditor"] == 6
+    assert [i.id for i in graph.ready()] == ["policy", "auditor", "vendor"]
+
+
+def test_graph_tolerates_cycles_and_unknown_dependencies() -> None:
+    graph = ChecklistGraph(
+        [_item("a", 1, "b"), _item("b", 1, "a"), _item("c", 2, "ghost"), _item("d", 4)]
+    )
+    assert sorted(graph.cyclic) == ["a", "b"]
+    assert graph.remaining_days == 4
+    # c waits on an item that does not exist, so it is never ready.
+    assert [i.id for i in graph.ready()] == ["d"]
+
+
 # --- Full analyze_gaps ---
 
 
@@ -249,6 +314,15 @@ def test_analyze_gaps_ready_client() -> None:
     assert result.critical_blockers == []
 
 
+def test_analyze_gaps_includes_checklist_timeline() -> None:
+    client = _make_client(checklist=[_item("policy", 20), _item("report", 5, "policy")])
+    timeline = analyze_gaps(client, today=date(2026, 1, 1)).timeline
+    assert timeline.remaining_days == 25
+    assert timeline.earliest_completion == date(2026, 1, 26)
+    assert timeline.critical_path == ["policy", "report"]
+    assert timeline.unblocked == ["policy"]
+
+
 def test_analyze_gaps_empty_client() -> None:
     client = Client(id="empty")
     result = analyze_gaps(client)
@@ -256,3 +330,64 @@ def test_analyze_gaps_empty_client() -> None:
     assert len(result.gaps) > 0
     assert len(result.critical_blockers) > 0
     assert result.readiness_score == 0.0
+
+
+# --- portfolio endpoint ---
+
+
+def test_portfolio_gaps_filters_and_recomputes_only_changed_clients(
+    client: TestClient,
+) -> None:
+    ready = _make_client(
+        id="portfolio-ready", pathway="finma_securities", status="in_progress"
+    )
+    blocked = _make_client(
+        id="portfolio-blocked",
+        pathway="finma_securities",
+        has_swiss_office=False,
+        has_swiss_director=False,
+    )
+
+    async def _seed() -> int:
+        await client_store.save_client(ready)
+        await client_store.save_client(blocked)
+        await gap_store.refresh()
+        return await gap_store.refresh()
+
+    assert asyncio.run(_seed()) == 0
+
+    params: dict[str, str | int] = {"pathway": "finma_securities", "limit": 1}
+    first = client.get("/api/consult/portfolio/gaps", params=params).json()
+    assert first["total"] == 2
+    assert first["next_cursor"] is not None
+    second = client.get(
+        "/api/consult/portfolio/gaps",
+        params={**params, "cursor": first["next_cursor"]},
+    ).json()
+    ids = {first["items"][0]["client_id"], second["items"][0]["client_id"]}
+    assert ids == {"portfolio-ready", "portfolio-blocked"}
+
+    blockers = client.get(
+        "/api/consult/portfolio/gaps",
+        params={"pathway": "finma_securities", "min_blockers": 2},
+    ).json()
+    assert [a["client_id"] for a in blockers["items"]] == ["portfolio-blocked"]
+    by_status = client.get(
+        "/api/consult/portfolio/gaps",
+        params={"pathway": "finma_securities", "status": "in_progress"},
+    ).json()
+    assert [a["client_id"] for a in by_status["items"]] == ["portfolio-ready"]
+
+    async def _fix_blocked() -> int:
+        await client_store.update_client(
+            "portfolio-blocked",
+            {"has_swiss_office": True, "has_swiss_director": True},
+        )
+        return await gap_store.refresh()
+
+    assert asyncio.run(_fix_blocked()) == 1
+    blockers = client.get(
+        "/api/consult/portfolio/gaps",
+        params={"pathway": "finma_securities", "min_blockers": 2},
+    ).json()
+    assert blockers["items"] == []
@@ -0,0 +1,161 @@
+"""Tests for token-budgeted history replay and rolling summaries."""
+
+import asyncio
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from src.config import settings
+from src.models.client import Client
+from src.services import chat_store, client_store, history_manager
+
+
+def _history(n: int, size: int = 10) -> list[dict[str, str]]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"{i}" * size}
+        for i in range(n)
+    ]
+
+
+def test_build_replay_skips_summarized_messages() -> None:
+    replay = history_manager.build_replay(_history(10), summarized=4)
+    assert replay == _history(10)[4:]
+
+
+def test_build_replay_enforces_token_budget_and_starts_with_user(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setitem(history_manager.MODEL_HISTORY_BUDGETS, "tiny-model", 30)
+    history = _history(10, size=40)  # ~11 tokens per message
+
+    replay = history_manager.build_replay(history, model="tiny-model")
+
+    assert replay == history[-2:]
+    assert replay[0]["role"] == "user"
+
+    # A window that would open on an assistant message is trimmed to a user one
+    assert history_manager.build_replay(history[:-1], model="tiny-model") == [
+        history[8]
+    ]
+
+
+def test_build_replay_keeps_latest_message_even_over_budget(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setitem(history_manager.MODEL_HISTORY_BUDGETS, "tiny-model", 1)
+    history = [{"role": "user", "content": "x" * 1000}]
+    assert history_manager.build_replay(history, model="tiny-model") == history
+
+
+def test_client_profile_context_lists_saved_facts_only() -> None:
+    client = Client(
+        id="c1",
+        company_name="Alpine AG",
+        services=["payments", "custody"],
+        conversation_history=[{"role": "user", "content": "hello"}],
+        conversation_summary="earlier",
+    )
+    profile = history_manager.client_profile_context(client)
+    assert "- company_name: Alpine AG" in profile
+    assert "- services: payments, custody" in profile
+    assert "conversation" not in profile
+    assert "summary" not in profile
+
+
+def test_refresh_session_summary_folds_older_turns(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "history_keep_recent", 4)
+    messages = _history(10)
+
+    async def _run() -> tuple[int, int]:
+        session = await chat_store.create_session()
+        await chat_store.update_session(session.id, messages=messages)
+        with patch.object(
+            history_manager, "summarize", AsyncMock(return_value="Summary v1")
+        ) as summarize:
+            folded = await history_manager.refresh_session_summary(session.id)
+            again = await history_manager.refresh_session_summary(session.id)
+        assert summarize.await_args.args[1] == messages[:6]
+        updated = await chat_store.get_session(session.id)
+        assert updated is not None
+        assert updated.summary == "Summary v1"
+        assert updated.summarized_messages == 6
+        return folded, again
+
+    assert asyncio.run(_run()) == (6, 0)
+    assert history_manager.needs_summary(30, 6)
+    assert not history_manager.needs_summary(10, 6)
+
+
+def test_refresh_client_summary_keeps_concurrent_turns(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "history_keep_recent", 4)
+    save_client = client_store.save_client
+    interfered = False
+
+    async def save_after_a_turn(target: Client, **kwargs: Any) -> None:
+        # A turn commits between the summary run's re-read and its save.
+        nonlocal interfered
+        if not interfered:
+            interfered = True
+            turn = await client_store.get_client(target.id)
+            assert turn is not None
+            turn.contact_name = "Set during the summary"
+            turn.conversation_history.append({"role": "user", "content": "more"})
+            await save_client(turn, check_version=True)
+        await save_client(target, **kwargs)
+
+    async def _run() -> Client | None:
+        stored = Client(
+            id="summary-ag",
+            company_name="Summary AG",
+            conversation_history=_history(10),
+        )
+        await client_store.save_client(stored)
+        with (
+            patch.object(
+                history_manager, "summarize", AsyncMock(return_value="Summary v1")
+            ),
+            patch.object(client_store, "save_client", save_after_a_turn),
+        ):
+            assert await history_manager.refresh_client_summary(stored.id) == 6
+        return await client_store.get_client(stored.id)
+
+    updated = asyncio.run(_run())
+    assert updated is not None
+    assert updated.conversation_summary == "Summary v1"
+    assert updated.summarized_messages == 6
+    assert updated.contact_name == "Set during the summary"
+    assert len(updated.conversation_history) == 11
+
+
+def test_refresh_client_summary_drops_a_stale_run(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(settings, "history_keep_recent", 4)
+
+    async def _run() -> Client | None:
+        stored = Client(
+            id="stale-ag", company_name="Stale AG", conversation_history=_history(10)
+        )
+        await client_store.save_client(stored)
+
+        async def slow_summary(*args: Any, **kwargs: Any) -> str:
+            # Another run folds further while this one waits on Claude.
+            await client_store.update_client(
+                stored.id,
+                {"conversation_summary": "Newer", "summarized_messages": 8},
+            )
+            return "Older"
+
+        with patch.object(history_manager, "summarize", slow_summary):
+            assert await history_manager.refresh_client_summary(stored.id) == 0
+        return await client_store.get_client(stored.id)
+
+    updated = asyncio.run(_run())
+    assert updated is not None
+    assert updated.conversation_summary == "Newer"
+    assert updated.summarized_messages == 8
@@ -0,0 +1,224 @@
+"""Tests for the background job queue and job status endpoints."""
+
+import asyncio
+import io
+import sqlite3
+from typing import Any, cast
+
+import pytest
+from fastapi.testclient import TestClient
+from src.config import settings
+from src.models.job import Job
+from src.services.db import db_writer
+from src.services.job_queue import JobQueue, ProgressCallback
+
+
+def _upload(client: TestClient) -> tuple[str, dict[str, Any]]:
+    client_id = client.post("/api/clients", json={"company_name": "Jobs AG"}).json()[
+        "id"
+    ]
+    resp = client.post(
+        f"/api/client-documents/{client_id}/upload?document_id=banking-2-1",
+        files={"file": ("plan.txt", io.BytesIO(b"Business plan"), "text/plain")},
+    )
+    assert resp.status_code == 200, resp.text
+    return client_id, resp.json()
+
+
+def test_upload_queues_ingestion(client: TestClient) -> None:
+    client_id, data = _upload(client)
+    assert data["ingest_job_id"]
+
+    resp = client.get(f"/api/jobs/{data['ingest_job_id']}")
+    assert resp.status_code == 200
+    job = resp.json()
+    assert job["kind"] == "ingest_document"
+    assert job["client_id"] == client_id
+
+
+def test_verify_returns_job_immediately(client: TestClient) -> None:
+    client_id, _ = _upload(client)
+    resp = client.post(f"/api/client-documents/{client_id}/banking-2-1/verify")
+    assert resp.status_code == 202
+    job = resp.json()
+    assert job["kind"] == "verify_document"
+    assert job["status"] == "queued"
+
+    # Same pending work is deduplicated by its idempotency key
+    again = client.post(f"/api/client-documents/{client_id}/banking-2-1/verify")
+    assert again.json()["id"] == job["id"]
+
+    # ...but a refresh is not folded into the queued cached run.
+    fresh = client.post(
+        f"/api/client-documents/{client_id}/banking-2-1/verify?refresh=true"
+    ).json()
+    assert fresh["id"] != job["id"]
+    assert fresh["payload"]["refresh"] is True
+
+    listed = client.get(f"/api/jobs?client_id={client_id}&status=queued")
+    assert job["id"] in {j["id"] for j in listed.json()}
+
+
+def test_verify_missing_document(client: TestClient) -> None:
+    resp = client.post("/api/client-documents/nobody/nothing/verify")
+    assert resp.status_code == 404
+
+
+def test_get_job_not_found(client: TestClient) -> None:
+    resp = client.get("/api/jobs/nonexistent")
+    assert resp.status_code == 404
+
+
+def test_worker_retries_then_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "job_retry_base_delay", 0.0)
+    monkeypatch.setattr(settings, "job_poll_interval", 0.01)
+    calls: list[int] = []
+
+    async def flaky(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+        calls.append(job.attempts)
+        await progress(0.5, "halfway")
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return {"value": job.payload["n"] * 2}
+
+    async def _run() -> Job | None:
+        queue = JobQueue()
+        queue.register("flaky", flaky)
+        await queue.start(workers=2)
+        try:
+            job = await queue.enqueue("flaky", {"n": 21})
+            for _ in range(200):
+                current = await queue.get_job(job.id)
+                if current and current.status in ("succeeded", "failed"):
+                    return current
+                await asyncio.sleep(0.01)
+            return await queue.get_job(job.id)
+        finally:
+            await queue.stop()
+
+    done = asyncio.run(_run())
+    assert done is not None
+    assert done.status == "succeeded"
+    assert done.result == {"value": 42}
+    assert done.attempts == 2
+    assert calls == [1, 2]
+
+
+def test_worker_survives_a_failed_claim(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "job_poll_interval", 0.01)
+
+    async def ok(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+        return {"ok": True}
+
+    async def _run() -> Job | None:
+        queue = JobQueue()
+        queue.register("claim-flaky", ok)
+        claim = queue._claim  # noqa: SLF001
+        failures = [sqlite3.OperationalError("database is locked")]
+
+        async def flaky_claim(lock: asyncio.Lock) -> Job | None:
+            if failures:
+                raise failures.pop()
+            return await claim(lock)
+
+        monkeypatch.setattr(queue, "_claim", flaky_claim)
+        await queue.start(workers=1)
+        try:
+            job = await queue.enqueue("claim-flaky", {})
+            for _ in range(200):
+                current = await queue.get_job(job.id)
+                if current and current.status == "succeeded":
+                    return current
+                await asyncio.sleep(0.01)
+            return await queue.get_job(job.id)
+        finally:
+            await queue.stop()
+
+    done = asyncio.run(_run())
+    assert done is not None
+    assert done.status == "succeeded"
+
+
+def test_starting_a_sibling_does_not_requeue_live_jobs(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(settings, "job_poll_interval", 0.01)
+    started = asyncio.Event()
+
+    async def slow(job: Job, progress: ProgressCallback) -> dict[str, Any]:
+        started.set()
+        await asyncio.sleep(60)
+        return {}
+
+    async def _run() -> tuple[str, str, int]:
+        first, second = JobQueue(), JobQueue()
+        first.register("lease-slow", slow)
+        second.register("lease-slow", slow)
+        await first.start(workers=1)
+        try:
+            job = await first.enqueue("lease-slow", {})
+            await asyncio.wait_for(started.wait(), timeout=5)
+            # A second worker process starting up leaves the live job alone.
+            await second.start(workers=1)
+            await second.stop()
+            live = await first.get_job(job.id)
+            assert live is not None
+
+            # Once the owner stops renewing (it died), the lease lapses.
+            async with db_writer() as db:
+                await db.execute(
+                    "UPDATE jobs SET lease_owner = 'dead', lease_expires = ?"
+                    " WHERE id = ?",
+                    ("2000-01-01T00:00:00+00:00", job.id),
+                )
+                await db.commit()
+            requeued = await second._requeue_expired()  # noqa: SLF001
+            orphan = await first.get_job(job.id)
+            assert orphan is not None
+            return live.status, orphan.status, requeued
+        finally:
+            await first.stop()
+
+    live, orphan, requeued = asyncio.run(_run())
+    assert live == "running"
+    assert (orphan, requeued) == ("queued", 1)
+
+
+def test_verify_job_leaves_api_errors_to_the_queue(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import anthropic
+    import httpx
+    from src.services import document_store, job_handlers
+
+    client_id, _ = _upload(client)
+
+    async def _unavailable(*args: Any, **kwargs: Any) -> Any:
+        request = httpx.Request("POST", "https://api.anthropic.com/v1/messages")
+        raise anthropic.APIConnectionError(request=cast(Any, request))
+
+    monkeypatch.setattr(job_handlers, "verify_document", _unavailable)
+
+    async def _attempt(attempts: int) -> str:
+        job = Job.model_validate(
+            {
+                "id": f"verify-attempt-{attempts}",
+                "kind": job_handlers.VERIFY_DOCUMENT,
+                "payload": {"client_id": client_id, "document_id": "banking-2-1"},
+                "attempts": attempts,
+                "max_attempts": 3,
+            }
+        )
+
+        async def _progress(fraction: float, message: str | None = None) -> None:
+            pass
+
+        with pytest.raises(anthropic.APIConnectionError):
+            await job_handlers._verify_document(job, _progress)  # noqa: SLF001
+        doc = await document_store.get_document(client_id, "banking-2-1")
+        assert doc is not None
+        return doc.status
+
+    # Earlier attempts raise for a retry without touching the document.
+    assert asyncio.run(_attempt(1)) == "pending"
+    assert asyncio.run(_attempt(3)) == "error"
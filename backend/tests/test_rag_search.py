@@ -21,9 +21,9 @@ class TestRAGServiceConstructor:
         assert svc._qdrant is None  # noqa: SLF001
         assert svc._openai is None  # noqa: SLF001
 
-    def test_init_has_empty_bm25_corpus(self) -> None:
+    def test_lexical_index_is_shared_not_per_instance(self) -> None:
         svc = RAGService()
-        assert svc._bm25_corpus == []  # noqa: SLF001
+        assert not hasattr(svc, "_bm25_corpus")
 
 
 class TestRequireClients:
@@ -145,12 +145,16 @@ def test_search_kb_empty_results(client: TestClient) -> None:
 def test_list_kb_documents(client: TestClient) -> None:
     with patch.object(
         _get_default_instance(),
-        "list_documents",
+        "list_documents_page",
         new_callable=AsyncMock,
-        return_value=[
-            {"doc_id": "d1", "title": "Doc One", "source": "src1"},
-            {"doc_id": "d2", "title": "Doc Two", "source": "src2"},
-        ],
+        return_value=(
+            [
+                {"doc_id": "d1", "title": "Doc One", "source": "src1"},
+                {"doc_id": "d2", "title": "Doc Two", "source": "src2"},
+            ],
+            2,
+            None,
+        ),
     ):
         resp = client.get("/api/kb/documents")
     assert resp.status_code == 200
@@ -163,3 +167,71 @@ def _get_default_instance() -> Any:
     from src.services.rag_service import _default_instance
 
     return _default_instance
+
+
+def test_kb_registry_reconcile_keeps_order_and_drops_missing() -> None:
+    import asyncio
+
+    from src.services import kb_document_store
+
+    async def _run() -> tuple[list[str], list[str], str | None]:
+        await kb_document_store.reconcile([])
+        for doc_id in ("r1", "r2", "r3"):
+            await kb_document_store.upsert_document(doc_id, doc_id, "s", None, 1)
+        await kb_document_store.reconcile(
+            [
+                {"doc_id": d, "title": d.upper(), "source": "s", "chunks": 2}
+                for d in ("r1", "r2", "r4")
+            ]
+        )
+        first, total, cursor = await kb_document_store.list_documents(limit=2)
+        assert total == 3
+        rest, _, end = await kb_document_store.list_documents(limit=2, cursor=cursor)
+        return [d["doc_id"] for d in first], [d["doc_id"] for d in rest], end
+
+    first, rest, end = asyncio.run(_run())
+    # r4 is new (newest); r1 and r2 keep their original indexing order.
+    assert first == ["r4", "r2"]
+    assert rest == ["r1"]
+    assert end is None
+
+
+def test_lexical_index_follows_ingest_delete_and_reconcile() -> None:
+    import asyncio
+
+    from src.services import kb_document_store
+
+    async def _run() -> list[list[str]]:
+        await kb_document_store.upsert_document(
+            "lex-1",
+            "Lex 1",
+            "s",
+            None,
+            2,
+            texts=[
+                ("p1", "lex-1", "Minimum capital for a fintech licence"),
+                ("p2", "lex-1", "Segregation of client deposits"),
+            ],
+        )
+        await kb_document_store.upsert_document(
+            "lex-2", "Lex 2", "s", None, 1, texts=[("p3", "lex-2", "Capital buffers")]
+        )
+        hits = []
+        hits.append([p for p, _ in await kb_document_store.search_chunks("capital")])
+        await kb_document_store.delete_document("lex-2")
+        hits.append([p for p, _ in await kb_document_store.search_chunks("capital")])
+        await kb_document_store.reconcile(
+            [{"doc_id": "lex-1", "title": "Lex 1", "source": "s", "chunks": 1}],
+            [("p2", "lex-1", "Segregation of client deposits")],
+        )
+        hits.append([p for p, _ in await kb_document_store.search_chunks("capital")])
+        hits.append(
+            [p for p, _ in await kb_document_store.search_chunks("licence deposits")]
+        )
+        return hits
+
+    with_both, after_delete, after_reconcile, any_term = asyncio.run(_run())
+    assert sorted(with_both) == ["p1", "p3"]
+    assert after_delete == ["p1"]
+    assert after_reconcile == []
+    assert any_term == ["p2"]
@@ -0,0 +1,157 @@
+"""Tests for FTS5 full-text search."""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+from src.models.client import ClientDocument, DocumentText
+from src.models.ehp import EHPComment
+from src.services import chat_store, document_store, document_text_store, ehp_store
+from src.services.full_text_search import build_match_query
+
+
+def test_build_match_query_quotes_every_term() -> None:
+    assert build_match_query('"Art. 1b BankA" licence') == '"Art. 1b BankA" "licence"'
+    assert build_match_query("Art. 1b") == '"Art." "1b"'
+    assert build_match_query('say "hi') == '"say" """hi"'
+    assert build_match_query("   ") == ""
+
+
+def _seed() -> str:
+    async def _run() -> str:
+        session = await chat_store.create_session("fts-client")
+        await chat_store.append_messages(
+            session.id,
+            [
+                {
+                    "role": "user",
+                    "content": "Does the fintech licence under "
+                    "Art. 1b BankA cap public deposits?",
+                },
+                {"role": "assistant", "content": "Yes, at CHF 100 million."},
+            ],
+            title="Fintech licence",
+        )
+        other = await chat_store.create_session("fts-other")
+        await chat_store.append_messages(
+            other.id, [{"role": "user", "content": "Art. 1b BankA again"}]
+        )
+        await ehp_store.save_comment(
+            EHPComment(
+                id="fts-comment",
+                client_id="fts-client",
+                document_id="aml-policy",
+                author="Reviewer",
+                role="finma-reviewer",
+                content="The KYC section must reference the Geldwäschereigesetz.",
+            )
+        )
+        await document_text_store.save_text(
+            DocumentText(content_hash="fts-hash", text="Our sanctions screening vendor")
+        )
+        await document_store.save_document(
+            ClientDocument(
+                id="fts-doc",
+                client_id="fts-client",
+                document_id="aml-manual",
+                file_name="aml_manual.pdf",
+                file_path="/tmp/aml_manual.pdf",
+                content_hash="fts-hash",
+            )
+        )
+        return session.id
+
+    return asyncio.run(_run())
+
+
+def test_search_finds_phrases_across_sources_with_client_scope(
+    client: TestClient,
+) -> None:
+    session_id = _seed()
+
+    resp = client.get("/api/search", params={"q": '"Art. 1b BankA"'})
+    assert resp.status_code == 200
+    assert {h["client_id"] for h in resp.json()} >= {"fts-client", "fts-other"}
+
+    scoped = client.get(
+        "/api/search", params={"q": '"Art. 1b BankA"', "client_id": "fts-client"}
+    ).json()
+    assert len(scoped) == 1
+    hit = scoped[0]
+    assert (hit["kind"], hit["id"], hit["seq"]) == ("chat", session_id, 0)
+    assert "**Art. 1b BankA**" in hit["snippet"]
+
+    # Diacritics are folded, and kinds can be filtered.
+    ehp = client.get(
+        "/api/search", params={"q": "geldwaschereigesetz", "kind": "ehp_comment"}
+    ).json()
+    assert [h["id"] for h in ehp] == ["fts-comment"]
+    docs = client.get(
+        "/api/search", params={"q": "sanctions screening", "client_id": "fts-client"}
+    ).json()
+    assert [(h["kind"], h["title"]) for h in docs] == [("document", "aml_manual.pdf")]
+
+
+def test_search_index_follows_deletes_and_rewrites(client: TestClient) -> None:
+    async def _run() -> str:
+        session = await chat_store.create_session("fts-edit")
+        await chat_store.append_messages(
+            session.id, [{"role": "user", "content": "zebracorn onboarding"}]
+        )
+        return session.id
+
+    session_id = asyncio.run(_run())
+    params = {"q": "zebracorn", "client_id": "fts-edit"}
+    assert len(client.get("/api/search", params=params).json()) == 1
+
+    asyncio.run(
+        chat_store.update_session(
+            session_id, messages=[{"role": "user", "content": "unicornzebra"}]
+        )
+    )
+    assert client.get("/api/search", params=params).json() == []
+
+    params["q"] = "unicornzebra"
+    assert len(client.get("/api/search", params=params).json()) == 1
+    asyncio.run(chat_store.delete_session(session_id))
+    assert client.get("/api/search", params=params).json() == []
+
+
+def test_search_index_survives_vacuum(client: TestClient) -> None:
+    from src.services.db import get_db
+
+    async def _run() -> None:
+        db = await get_db()
+        try:
+            # Indexed tables carry an explicit INTEGER PRIMARY KEY, which
+            # VACUUM keeps; implicit rowids it may renumber.
+            for table in ("chat_messages", "ehp_comments", "document_texts"):
+                cursor = await db.execute(f"PRAGMA table_info({table})")
+                keys = [(r["type"], r["pk"]) for r in await cursor.fetchall()]
+                assert ("INTEGER", 1) in keys, table
+        finally:
+            await db.close()
+        for n in range(3):
+            await ehp_store.save_comment(
+                EHPComment(
+                    id=f"vacuum-{n}",
+                    client_id="fts-vacuum",
+                    document_id="aml-policy",
+                    author="Reviewer",
+                    role="finma-reviewer",
+                    content=f"vacuumword{n} placeholder",
+                )
+            )
+        db = await get_db()
+        try:
+            await db.execute("DELETE FROM ehp_comments WHERE id = 'vacuum-0'")
+            await db.commit()
+            await db.execute("VACUUM")
+        finally:
+            await db.close()
+
+    asyncio.run(_run())
+    hits = client.get(
+        "/api/search", params={"q": "vacuumword2", "client_id": "fts-vacuum"}
+    ).json()
+    assert [h["id"] for h in hits] == ["vacuum-2"]
+    assert "vacuumword2" in hits[0]["snippet"]
@@ -0,0 +1,144 @@
+"""Tests for turn-scoped memoization of agent tool calls."""
+
+import asyncio
+import contextlib
+from typing import Any
+
+from src.services.tool_memo import TurnMemo
+
+
+class _CountingExecutor:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def __call__(self, tool_name: str, tool_input: dict[str, Any]) -> str:
+        self.calls.append((tool_name, tool_input))
+        await asyncio.sleep(0)
+        return f"{tool_name}#{len(self.calls)}"
+
+
+def test_repeated_and_near_identical_reads_run_once() -> None:
+    executor = _CountingExecutor()
+    memo = TurnMemo({"update_client_field"}, {"search_knowledge_base"})
+    execute = memo.wrap(executor)
+
+    async def _run() -> list[str]:
+        return [
+            await execute("search_knowledge_base", {"query": "Phase I ESA"}),
+            await execute("search_knowledge_base", {"query": "  phase i  ESA? "}),
+            await execute("get_client_info", {"client_id": "c1"}),
+            await execute("get_client_info", {"client_id": "c1"}),
+        ]
+
+    results = asyncio.run(_run())
+    assert results == [
+        "search_knowledge_base#1",
+        "search_knowledge_base#1",
+        "get_client_info#2",
+        "get_client_info#2",
+    ]
+    assert len(executor.calls) == 2
+    assert memo.hits == 2
+
+
+def test_write_invalidates_only_that_clients_reads() -> None:
+    executor = _CountingExecutor()
+    memo = TurnMemo({"update_client_field"}, {"search_knowledge_base"})
+    execute = memo.wrap(executor)
+
+    async def _run() -> None:
+        await execute("search_knowledge_base", {"query": "wetlands"})
+        await execute("get_client_info", {"client_id": "c1"})
+        await execute("get_client_info", {"client_id": "c2"})
+        await execute("update_client_field", {"client_id": "c1", "field": "x"})
+        await execute("search_knowledge_base", {"query": "wetlands"})
+        await execute("get_client_info", {"client_id": "c1"})
+        await execute("get_client_info", {"client_id": "c2"})
+
+    asyncio.run(_run())
+    names = [(name, args.get("client_id")) for name, args in executor.calls]
+    assert names == [
+        ("search_knowledge_base", None),
+        ("get_client_info", "c1"),
+        ("get_client_info", "c2"),
+        ("update_client_field", "c1"),
+        ("get_client_info", "c1"),
+    ]
+
+
+def test_concurrent_identical_reads_share_one_call() -> None:
+    executor = _CountingExecutor()
+    execute = TurnMemo(set()).wrap(executor)
+
+    async def _run() -> list[str]:
+        return list(
+            await asyncio.gather(
+                *(execute("get_portfolio_overview", {}) for _ in range(3))
+            )
+        )
+
+    assert asyncio.run(_run()) == ["get_portfolio_overview#1"] * 3
+    assert len(executor.calls) == 1
+
+
+def test_failed_read_is_not_memoized() -> None:
+    attempts = 0
+
+    async def flaky(tool_name: str, tool_input: dict[str, Any]) -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise RuntimeError("boom")
+        return "ok"
+
+    execute = TurnMemo(set()).wrap(flaky)
+
+    async def _run() -> str:
+        with contextlib.suppress(RuntimeError):
+            await execute("get_client_info", {"client_id": "c1"})
+        return await execute("get_client_info", {"client_id": "c1"})
+
+    assert asyncio.run(_run()) == "ok"
+    assert attempts == 2
+
+
+def test_only_free_text_inputs_are_normalized() -> None:
+    executor = _CountingExecutor()
+    execute = TurnMemo(set()).wrap(executor)
+
+    async def _run() -> None:
+        await execute("get_client_document", {"client_id": "c1", "document_id": "AoA"})
+        await execute("get_client_document", {"client_id": "c1", "document_id": "aoa"})
+        await execute("get_client_document", {"client_id": "c1", "document_id": "AoA."})
+
+    asyncio.run(_run())
+    assert [args["document_id"] for _, args in executor.calls] == [
+        "AoA",
+        "aoa",
+        "AoA.",
+    ]
+
+
+def test_error_results_are_not_memoized() -> None:
+    results = iter(["Knowledge base search failed: timeout", "3 results"])
+    calls = 0
+
+    async def search(tool_name: str, tool_input: dict[str, Any]) -> str:
+        nonlocal calls
+        calls += 1
+        return next(results)
+
+    execute = TurnMemo(set(), {"search_knowledge_base"}).wrap(search)
+
+    async def _run() -> list[str]:
+        return [
+            await execute("search_knowledge_base", {"query": "capital"})
+            for _ in range(3)
+        ]
+
+    assert asyncio.run(_run()) == [
+        "Knowledge base search failed: timeout",
+        "3 results",
+        "3 results",
+    ]
+    assert calls == 2
@@ -0,0 +1,122 @@
+"""Tests for the LLM usage ledger and the aggregate usage endpoint."""
+
+import asyncio
+from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.testclient import TestClient
+from src.services import usage_ledger
+from src.services.db import db_writer
+from src.services.rag_service import RAGService
+
+
+def _record_calls(client_id: str) -> None:
+    async def _run() -> None:
+        usage_ledger.new_context(endpoint="POST /api/consult/chat")
+        usage_ledger.bind(client_id=client_id)
+        for latency in range(10, 110, 10):  # 10..100 ms
+            usage_ledger.record_anthropic(
+                "consultant_turn",
+                "claude-test",
+                None,
+                latency_ms=latency,
+            )
+        usage_ledger.set_tool("search_knowledge_base")
+        usage_ledger.record(
+            provider="openai",
+            model="embed-test",
+            operation="embedding",
+            input_tokens=7,
+            latency_ms=5,
+            retries=1,
+            success=False,
+        )
+
+    asyncio.run(_run())
+
+
+def test_usage_aggregates_by_endpoint_with_percentiles(client: TestClient) -> None:
+    _record_calls("usage-client-1")
+
+    resp = client.get("/api/usage?group_by=endpoint&client_id=usage-client-1")
+    assert resp.status_code == 200
+    [row] = resp.json()
+    assert row["key"] == "POST /api/consult/chat"
+    assert row["calls"] == 11
+    assert row["errors"] == 1
+    assert row["retries"] == 1
+    assert row["input_tokens"] == 7
+    assert row["latency_p50_ms"] == 50
+    assert row["latency_p95_ms"] == 100
+
+
+def test_usage_groups_by_tool_and_window(client: TestClient) -> None:
+    _record_calls("usage-client-2")
+
+    resp = client.get("/api/usage?group_by=tool&client_id=usage-client-2")
+    by_tool = {row["key"]: row["calls"] for row in resp.json()}
+    assert by_tool == {None: 10, "search_knowledge_base": 1}
+
+    resp = client.get("/api/usage?client_id=usage-client-2&since=2999-01-01T00:00:00Z")
+    assert resp.json() == []
+
+
+def test_usage_rejects_unknown_grouping(client: TestClient) -> None:
+    resp = client.get("/api/usage?group_by=planet")
+    assert resp.status_code == 422
+
+
+def test_usage_defaults_to_a_recent_window(client: TestClient) -> None:
+    _record_calls("usage-client-3")
+    old = (datetime.now(UTC) - timedelta(days=400)).isoformat()
+
+    async def _insert_old() -> None:
+        async with db_writer() as db:
+            await db.execute(
+                """INSERT INTO llm_usage
+                   (created_at, provider, model, operation, client_id, latency_ms)
+                   VALUES (?, 'anthropic', 'claude-test', 'old_turn', ?, 9000)""",
+                (old, "usage-client-3"),
+            )
+            await db.commit()
+
+    asyncio.run(_insert_old())
+
+    resp = client.get("/api/usage?group_by=operation&client_id=usage-client-3")
+    assert "old_turn" not in {row["key"] for row in resp.json()}
+
+    resp = client.get(
+        "/api/usage?group_by=operation&client_id=usage-client-3"
+        "&since=2000-01-01T00:00:00"
+    )
+    [old_row] = [row for row in resp.json() if row["key"] == "old_turn"]
+    assert old_row["latency_p50_ms"] == 9000
+
+
+def test_embedding_retries_are_recorded(client: TestClient) -> None:
+    openai = MagicMock()
+    openai.embeddings.create = AsyncMock(
+        side_effect=[
+            RuntimeError("rate limited"),
+            SimpleNamespace(
+                usage=SimpleNamespace(prompt_tokens=3),
+                data=[SimpleNamespace(embedding=[0.1, 0.2])],
+            ),
+        ]
+    )
+    svc = RAGService()
+    svc._openai = openai  # noqa: SLF001
+
+    async def _run() -> list[float]:
+        usage_ledger.new_context(endpoint="job:embed-retry-test")
+        with patch("asyncio.sleep", new=AsyncMock()):
+            return await svc.embed("capital adequacy")
+
+    assert asyncio.run(_run()) == [0.1, 0.2]
+
+    resp = client.get("/api/usage?endpoint=job:embed-retry-test")
+    [row] = resp.json()
+    assert row["calls"] == 2
+    assert row["errors"] == 1
+    assert row["retries"] == 1
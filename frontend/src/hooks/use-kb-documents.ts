@@ -14,7 +14,7 @@ export function useKBDocuments() {
     async function fetchDocs() {
       setKbLoading(true)
       try {
-        const result = await listDocuments(0, 100)
+        const result = await listDocuments(100)
         if (!cancelled) setKbDocs(result.items)
       } catch (err) {
         console.error('Failed to fetch KB documents:', err)
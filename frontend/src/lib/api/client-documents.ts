@@ -1,4 +1,6 @@
+import { type BackendJob, waitForJob } from './jobs'
 import { resolveUrl } from './sse-client'
+import type { PaginatedResponse } from './types'
 
 export interface BackendDocument {
   id: string
@@ -33,10 +35,11 @@ export async function uploadDocument(
 }
 
 export async function listDocuments(clientId: string): Promise<BackendDocument[]> {
-  const url = resolveUrl(`/api/client-documents/${clientId}`)
+  const url = resolveUrl(`/api/client-documents/${clientId}?limit=100`)
   const res = await fetch(url)
   if (!res.ok) throw new Error(`List failed: ${res.status}`)
-  return res.json()
+  const page = (await res.json()) as PaginatedResponse<BackendDocument>
+  return page.items
 }
 
 export async function deleteDocument(
@@ -65,5 +68,10 @@ export async function verifyDocument(
   const url = resolveUrl(`/api/client-documents/${clientId}/${documentId}/verify`)
   const res = await fetch(url, { method: 'POST' })
   if (!res.ok) throw new Error(`Verify failed: ${res.status}`)
-  return res.json()
+  // Verification runs as a background job; wait for it, then re-read the document
+  const job: BackendJob = await res.json()
+  await waitForJob(job)
+  const docRes = await fetch(resolveUrl(`/api/client-documents/${clientId}/${documentId}`))
+  if (!docRes.ok) throw new Error(`Verify failed: ${docRes.status}`)
+  return docRes.json()
 }
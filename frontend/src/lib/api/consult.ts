@@ -1,7 +1,7 @@
 import type { ChatSession } from '@/types/assistant'
 
 import { type SSECallbacks, resolveUrl, streamSSE } from './sse-client'
-import type { GapAnalysis, NextStep } from './types'
+import type { GapAnalysis, NextStep, PaginatedResponse } from './types'
 
 const API_URL = process.env.NEXT_PUBLIC_API_URL
 
@@ -23,28 +23,23 @@ export async function listChatSessions(
   clientId?: string,
 ): Promise<ChatSession[]> {
   const url = clientId
-    ? `/api/consult/sessions?client_id=${clientId}`
-    : '/api/consult/sessions'
+    ? `/api/consult/sessions?client_id=${clientId}&limit=100`
+    : '/api/consult/sessions?limit=100'
   const res = await fetch(resolveUrl(url))
   if (!res.ok) return []
-  const data = (await res.json()) as Array<{
+  const page = (await res.json()) as PaginatedResponse<{
     id: string
     client_id: string | null
     title: string
-    messages: Array<{ role: string; content: string }>
+    message_count: number
     created_at: string
     updated_at: string
   }>
-  return data.map((s) => ({
+  // Listings carry no transcripts; load one with getChatSession.
+  return page.items.map((s) => ({
     id: s.id,
     title: s.title,
-    messages: s.messages.map((m) => ({
-      id: crypto.randomUUID(),
-      role: m.role as 'user' | 'assistant',
-      content: m.content,
-      citations: [],
-      timestamp: new Date(s.updated_at),
-    })),
+    messages: [],
     createdAt: new Date(s.created_at),
     updatedAt: new Date(s.updated_at),
   }))
@@ -98,6 +93,13 @@ export async function analyzeGaps(clientId: string): Promise<GapAnalysis> {
       gaps: [],
       next_steps: [],
       critical_blockers: [],
+      timeline: {
+        remaining_days: 0,
+        earliest_completion: new Date().toISOString().slice(0, 10),
+        critical_path: [],
+        unblocked: [],
+        unschedulable: [],
+      },
     }
   }
   const res = await fetch(resolveUrl(`/api/consult/analyze-gaps/${clientId}`), {
@@ -1,5 +1,6 @@
 import type { EHPComment } from '@/types'
 
+import { type BackendJob, waitForJob } from './jobs'
 import { resolveUrl } from './sse-client'
 
 export async function listComments(
@@ -59,5 +60,11 @@ export async function generateComments(
     },
   )
   if (!res.ok) return []
-  return res.json()
+  // Generation runs as a background job; its result carries the new comments
+  try {
+    const job = await waitForJob((await res.json()) as BackendJob)
+    return (job.result?.comments as EHPComment[] | undefined) ?? []
+  } catch {
+    return []
+  }
 }
@@ -0,0 +1,36 @@
+import { resolveUrl } from './sse-client'
+
+export interface BackendJob {
+  id: string
+  kind: string
+  status: 'queued' | 'running' | 'succeeded' | 'failed'
+  client_id: string | null
+  progress: number
+  progress_message: string | null
+  result: Record<string, unknown> | null
+  error: string | null
+}
+
+export async function getJob(jobId: string): Promise<BackendJob> {
+  const res = await fetch(resolveUrl(`/api/jobs/${jobId}`))
+  if (!res.ok) throw new Error(`Job lookup failed: ${res.status}`)
+  return res.json()
+}
+
+/** Poll a background job until it succeeds or fails. */
+export async function waitForJob(
+  job: BackendJob,
+  { intervalMs = 1000, timeoutMs = 180_000 } = {}
+): Promise<BackendJob> {
+  const deadline = Date.now() + timeoutMs
+  let current = job
+  while (current.status === 'queued' || current.status === 'running') {
+    if (Date.now() > deadline) throw new Error(`Job ${job.id} timed out`)
+    await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    current = await getJob(job.id)
+  }
+  if (current.status === 'failed') {
+    throw new Error(current.error ?? `Job ${job.id} failed`)
+  }
+  return current
+}
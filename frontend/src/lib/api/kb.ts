@@ -39,12 +39,17 @@ export async function searchKB(query: string, topK = 5): Promise<KBSearchResult[
   return res.json()
 }
 
-export async function listDocuments(skip = 0, limit = 20): Promise<PaginatedResponse<KBDocument>> {
+export async function listDocuments(
+  limit = 20,
+  cursor?: string,
+): Promise<PaginatedResponse<KBDocument>> {
   if (!API_URL) {
-    const items = MOCK_KB_DOCUMENTS.slice(skip, skip + limit)
-    return { items, total: MOCK_KB_DOCUMENTS.length, skip, limit }
+    const items = MOCK_KB_DOCUMENTS.slice(0, limit)
+    return { items, total: MOCK_KB_DOCUMENTS.length, limit, next_cursor: null }
   }
-  const url = `${resolveUrl('/api/kb/documents')}?skip=${skip}&limit=${limit}`
+  const params = new URLSearchParams({ limit: String(limit) })
+  if (cursor) params.set('cursor', cursor)
+  const url = `${resolveUrl('/api/kb/documents')}?${params}`
   const res = await fetch(url)
   if (!res.ok) throw new Error('Failed to list documents')
   return res.json()
@@ -61,8 +61,8 @@ export interface ApiClient {
 export interface PaginatedResponse<T> {
   items: T[]
   total: number
-  skip: number
   limit: number
+  next_cursor: string | null
 }
 
 // --- Gap Analysis (matching backend client.py GapAnalysis) ---
@@ -83,6 +83,14 @@ export interface NextStep {
   regulatory_reference: string | null
 }
 
+export interface ChecklistTimeline {
+  remaining_days: number
+  earliest_completion: string
+  critical_path: string[]
+  unblocked: string[]
+  unschedulable: string[]
+}
+
 export interface GapAnalysis {
   client_id: string
   pathway: string
@@ -92,6 +100,7 @@ export interface GapAnalysis {
   gaps: Gap[]
   next_steps: NextStep[]
   critical_blockers: string[]
+  timeline: ChecklistTimeline
 }
 
 // --- Chat Messages ---